@@ -10,6 +10,7 @@ setup(
     install_requires=[
         "selenium>=4.9.0",
         "pandas>=2.0.0",
+        "pyarrow>=12.0.0",
         "google-cloud-bigquery>=3.11.0",
         "pandas-gbq>=0.19.0",
         "python-dotenv>=1.0.0",
@@ -17,5 +18,20 @@ setup(
         "pyyaml>=6.0",
         "requests>=2.31.0",
     ],
+    extras_require={
+        "ocr": [
+            "pytesseract>=0.3.10",
+            "Pillow>=10.0.0",
+        ],
+        "watch": [
+            "watchdog>=3.0.0",
+        ],
+        "storage-write": [
+            "google-cloud-bigquery-storage>=2.20.0",
+        ],
+        "fast-json": [
+            "orjson>=3.9.0",
+        ],
+    },
     python_requires=">=3.9",
 )
@@ -6,10 +6,11 @@ Modules for handling authentication challenges, like MFA and CAPTCHA
 
 from src.auth.mfa_handler import MFAHandler
 from src.auth.captcha_solver import CaptchaSolver
-from src.auth.otp_reader import OTPReader
+from src.auth.otp_reader import OTPReader, get_shared_otp_reader
 
 __all__ = [
     'MFAHandler',
     'CaptchaSolver',
     'OTPReader',
+    'get_shared_otp_reader',
 ]
@@ -6,18 +6,44 @@ browser automation. Includes manual method for
 integration with solving services
 """
 
+import io
 import os
+import re
 import time
-import base64
+import string
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, Union
 
-import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from src.utils.logger import get_logger
+from src.utils.dom import detect_first_match, has_blocking_page_load, snapshot_text
+from src.utils.prompt import prompt_lock, prompt_with_timeout
+
+# Seconds to wait for the user during manual fallback
+MANUAL_PROMPT_TIMEOUT = 120
+
+_MATH_RE = re.compile(r"(\d+)\s*([+\-*/])\s*(\d+)")
+
+_MATH_OPS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a // b if b != 0 else None,
+}
+
+_OCR_CHAR_WHITELIST = string.ascii_letters + string.digits
+
+# Characters OCR may produce for each answer field type it can fill in
+_OCR_INPUT_WHITELISTS = {
+    "text": _OCR_CHAR_WHITELIST,
+    "tel": string.digits,
+    "number": string.digits,
+}
 
 
 class CaptchaSolver:
@@ -28,14 +54,42 @@ class CaptchaSolver:
     challenges, like image-based CAPTCHAs, audio CAPTCHAs, and reCAPTCHA
     """
     
-    def __init__(self, service_key: Optional[str] = None):
+    _CAPTCHA_DETECTORS = (
+        ("recaptcha", (
+            "iframe[src*='recaptcha']",
+            "iframe[src*='captcha']",
+            "div.g-recaptcha",
+            "div[data-sitekey]"
+        )),
+        ("image_captcha", (
+            "img[src*='captcha']",
+            "img[alt*='CAPTCHA']",
+            "img[alt*='captcha']"
+        )),
+        ("text_captcha", (
+            "input[name*='captcha']",
+            "input[id*='captcha']",
+            "label[for*='captcha']"
+        )),
+    )
+    
+    _ERROR_MESSAGE_LOCATOR = (By.XPATH, "//div[contains(@class, 'error') or contains(@class, 'alert')]")
+    
+    def __init__(self, service_key: Optional[str] = None, bank_id: Optional[str] = None):
         """
         Initialize CAPTCHA solver
         
+        Drivers passed to this solver should use the 'eager' or 'none'
+        page load strategy so detection doesn't wait on full page loads
+        
         :param service_key: Optional API key for external CAPTCHA solving service
+        :param bank_id: Optional identifier for the bank, named in manual prompts
         """
         self.logger = get_logger("captcha_solver")
+        self.bank_id = bank_id
         self.service_key = service_key or os.environ.get("CAPTCHA_SERVICE_KEY")
+        self._screenshot_executor = ThreadPoolExecutor(max_workers=1)
+        self._page_load_checked = False
     
     def solve_captcha(self, driver: webdriver.Chrome) -> bool:
         """
@@ -44,7 +98,10 @@ class CaptchaSolver:
         :param driver: Selenium WebDriver instance
         :return: Boolean indicating success or failure
         """
+        self._check_page_load_strategy(driver)
+        
         try:
+            # One round trip, which also answers the common no-CAPTCHA case
             captcha_type = self._detect_captcha_type(driver)
             
             if not captcha_type:
@@ -68,6 +125,22 @@ class CaptchaSolver:
             self.logger.error(f"Error solving CAPTCHA: {str(e)}")
             return False
     
+    def _check_page_load_strategy(self, driver: webdriver.Chrome) -> None:
+        """
+        Warn once if the driver blocks commands on full page loads
+        
+        :param driver: Selenium WebDriver instance
+        """
+        if self._page_load_checked:
+            return
+        
+        self._page_load_checked = True
+        if has_blocking_page_load(driver):
+            self.logger.warning(
+                "WebDriver uses the 'normal' page load strategy, CAPTCHA detection may stall "
+                "on slow page resources. Use 'eager' or 'none' instead"
+            )
+    
     def _detect_captcha_type(self, driver: webdriver.Chrome) -> Optional[str]:
         """
         Detect the type of CAPTCHA
@@ -75,38 +148,7 @@ class CaptchaSolver:
         :param driver: Selenium WebDriver instance
         :return: String identifier for CAPTCHA type
         """
-        recaptcha_indicators = [
-            "iframe[src*='recaptcha']",
-            "iframe[src*='captcha']",
-            "div.g-recaptcha",
-            "div[data-sitekey]"
-        ]
-        
-        for indicator in recaptcha_indicators:
-            if len(driver.find_elements(By.CSS_SELECTOR, indicator)) > 0:
-                return "recaptcha"
-        
-        image_captcha_indicators = [
-            "img[src*='captcha']",
-            "img[alt*='CAPTCHA']",
-            "img[alt*='captcha']"
-        ]
-        
-        for indicator in image_captcha_indicators:
-            if len(driver.find_elements(By.CSS_SELECTOR, indicator)) > 0:
-                return "image_captcha"
-        
-        text_captcha_indicators = [
-            "input[name*='captcha']",
-            "input[id*='captcha']",
-            "label[for*='captcha']"
-        ]
-        
-        for indicator in text_captcha_indicators:
-            if len(driver.find_elements(By.CSS_SELECTOR, indicator)) > 0:
-                return "text_captcha"
-        
-        return None
+        return detect_first_match(driver, self._CAPTCHA_DETECTORS)
     
     def _solve_recaptcha(self, driver: webdriver.Chrome) -> bool:
         """
@@ -161,29 +203,21 @@ class CaptchaSolver:
             # Find CAPTCHA image
             captcha_img = driver.find_element(By.CSS_SELECTOR, "img[src*='captcha']")
             
-            if not captcha_img:
-                self.logger.error("CAPTCHA image not found")
-                return False
-            
             # Get image source
             img_src = captcha_img.get_attribute("src")
             
             # If have a service key, try using external service
             if self.service_key:
                 solution = self._solve_image_with_service(img_src)
-                if solution:
-                    # Find input field
-                    input_field = driver.find_element(By.CSS_SELECTOR, "input[name*='captcha']")
-                    if input_field:
-                        input_field.clear()
-                        input_field.send_keys(solution)
-                        
-                        # Submit form
-                        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        if submit_button:
-                            submit_button.click()
-                            time.sleep(2) 
-                            return True
+                if solution and self._submit_solution(driver, solution):
+                    return True
+            
+            # Try local OCR before asking the user, if the answer field takes letters or digits
+            whitelist = self._ocr_whitelist(driver)
+            if whitelist:
+                solution = self._solve_image_locally(captcha_img.screenshot_as_png, whitelist)
+                if solution and self._submit_solution(driver, solution):
+                    return True
             
             return self._solve_manually(driver)
             
@@ -201,6 +235,60 @@ class CaptchaSolver:
         self.logger.info("External image CAPTCHA solving not implemented")
         return None
     
+    def _ocr_whitelist(self, driver: webdriver.Chrome) -> Optional[str]:
+        """
+        Get the characters OCR may produce for the CAPTCHA answer field
+        
+        :param driver: Selenium WebDriver instance
+        :return: Allowed characters, or None if the field doesn't take plain letters or digits
+        """
+        input_fields = driver.find_elements(By.CSS_SELECTOR, "input[name*='captcha']")
+        if not input_fields:
+            return None
+        
+        input_type = (input_fields[0].get_attribute("type") or "text").lower()
+        whitelist = _OCR_INPUT_WHITELISTS.get(input_type)
+        if whitelist and input_fields[0].get_attribute("inputmode") == "numeric":
+            return string.digits
+        
+        return whitelist
+    
+    def _solve_image_locally(self, image_png: bytes, 
+                             whitelist: str = _OCR_CHAR_WHITELIST) -> Optional[str]:
+        """
+        Solve a simple image CAPTCHA with local OCR
+        
+        Requires the optional pytesseract and Pillow packages
+        (pip install -e .[ocr]) and a Tesseract binary on the PATH
+        
+        :param image_png: PNG bytes of the CAPTCHA image
+        :param whitelist: Characters the solution may contain
+        :return: Solution string or None if failed
+        """
+        try:
+            import pytesseract
+            from PIL import Image
+        except ImportError:
+            self.logger.debug("pytesseract/Pillow not installed, skipping local OCR")
+            return None
+        
+        try:
+            # Treat the image as a single line of letters and digits
+            text = pytesseract.image_to_string(
+                Image.open(io.BytesIO(image_png)),
+                config=f"--psm 7 -c tessedit_char_whitelist={whitelist}"
+            )
+        except Exception as e:
+            self.logger.warning(f"Local OCR failed: {str(e)}")
+            return None
+        
+        solution = "".join(text.split())
+        if not solution:
+            return None
+        
+        self.logger.debug(f"OCR CAPTCHA solution: {solution}")
+        return solution
+    
     def _solve_text_captcha(self, driver: webdriver.Chrome) -> bool:
         """
         Solve a text-based CAPTCHA
@@ -211,33 +299,20 @@ class CaptchaSolver:
         try:
             self.logger.info("Attempting to solve text CAPTCHA")
             
-            # Find the CAPTCHA question
-            captcha_label = driver.find_element(By.CSS_SELECTOR, "label[for*='captcha']")
+            # Get CAPTCHA question text
+            question = snapshot_text(driver, {"question": "label[for*='captcha']"}).get("question")
             
-            if not captcha_label:
+            if question is None:
                 self.logger.error("CAPTCHA prompt not found")
-                return False
+                return self._solve_manually(driver)
             
-            # Get question text
-            question = captcha_label.text
             self.logger.debug(f"CAPTCHA question: {question}")
             
             # Try to solve simple math problems
             solution = self._solve_math_captcha(question)
             
-            if solution:
-                # Find input field
-                input_field = driver.find_element(By.CSS_SELECTOR, "input[name*='captcha']")
-                if input_field:
-                    input_field.clear()
-                    input_field.send_keys(solution)
-                    
-                    # Submit form
-                    submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                    if submit_button:
-                        submit_button.click()
-                        time.sleep(2)
-                        return True
+            if solution and self._submit_solution(driver, solution):
+                return True
 
             return self._solve_manually(driver)
             
@@ -252,26 +327,63 @@ class CaptchaSolver:
         :param question: The CAPTCHA question text
         :return: Solution string or None if not math problem
         """
-        import re
+        match = _MATH_RE.search(question)
+        if not match:
+            return None
         
-        math_pattern = r"(\d+)\s*([\+\-\*\/])\s*(\d+)"
-        match = re.search(math_pattern, question)
+        result = _MATH_OPS[match.group(2)](int(match.group(1)), int(match.group(3)))
+        return None if result is None else str(result)
+    
+    def _submit_solution(self, driver: webdriver.Chrome, solution: str) -> bool:
+        """
+        Enter a CAPTCHA solution and submit the form
         
-        if match:
-            num1 = int(match.group(1))
-            operator = match.group(2)
-            num2 = int(match.group(3))
-            
-            if operator == "+":
-                return str(num1 + num2)
-            elif operator == "-":
-                return str(num1 - num2)
-            elif operator == "*":
-                return str(num1 * num2)
-            elif operator == "/" and num2 != 0:
-                return str(num1 // num2)
+        :param driver: Selenium WebDriver instance
+        :param solution: CAPTCHA solution text
+        :return: Boolean indicating whether the solution was submitted and accepted
+        """
+        try:
+            input_field = driver.find_element(By.CSS_SELECTOR, "input[name*='captcha']")
+            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+        except NoSuchElementException:
+            self.logger.warning("CAPTCHA input field or submit button not found")
+            return False
         
-        return None
+        input_field.clear()
+        input_field.send_keys(solution)
+        
+        current_url = driver.current_url
+        submit_button.click()
+        if self._wait_for_submit_result(driver, current_url):
+            return True
+        
+        self.logger.info("CAPTCHA solution was rejected")
+        return False
+    
+    def _wait_for_submit_result(self, driver: webdriver.Chrome, current_url: str,
+                                timeout: int = 10) -> bool:
+        """
+        Wait for the page to react to a submitted CAPTCHA solution
+        
+        :param driver: Selenium WebDriver instance
+        :param current_url: URL of the page before submitting
+        :param timeout: Maximum time to wait in seconds
+        :return: False if an error message appeared, True otherwise
+        """
+        try:
+            # any_of returns the first truthy result: True for the URL change,
+            # the element for the error message
+            outcome = WebDriverWait(driver, timeout).until(
+                EC.any_of(
+                    EC.url_changes(current_url),
+                    EC.presence_of_element_located(self._ERROR_MESSAGE_LOCATOR)
+                )
+            )
+        except TimeoutException:
+            self.logger.debug("No response detected after CAPTCHA submit, continuing")
+            return True
+        
+        return outcome is True
     
     def _solve_manually(self, driver: webdriver.Chrome) -> bool:
         """
@@ -283,13 +395,31 @@ class CaptchaSolver:
         self.logger.info("Falling back to manual CAPTCHA solution")
         
         try:
-            # Screenshot to show CAPTCHA
-            screenshot_path = os.path.join(os.getcwd(), "captcha_screenshot.png")
-            driver.save_screenshot(screenshot_path)
+            # Screenshot to show CAPTCHA, taken in the background
+            suffix = f"_{self.bank_id}" if self.bank_id else ""
+            screenshot_path = os.path.join(os.getcwd(), f"captcha_screenshot{suffix}.png")
+            screenshot_future = self._screenshot_executor.submit(driver.save_screenshot, screenshot_path)
+            self.logger.info(f"Manual CAPTCHA solution required, saving screenshot to {screenshot_path}")
             
-            # Prompt for solution
-            self.logger.info(f"CAPTCHA screenshot saved to {screenshot_path}")
-            solution = input("Please solve the CAPTCHA and enter the solution: ")
+            with prompt_lock:
+                # Show the prompt while the screenshot is taken; anything typed meanwhile waits in the terminal
+                bank_str = f" for {self.bank_id}" if self.bank_id else ""
+                print(f"Please solve the CAPTCHA{bank_str} and enter the solution: ", end="", flush=True)
+                
+                # Driver is not thread-safe, so let the screenshot finish before using it again.
+                # Not bounded here: a timed-out wait would leave the worker using the driver,
+                # and the command is already bounded by the driver's own timeout
+                try:
+                    screenshot_future.result()
+                except Exception as e:
+                    self.logger.warning(f"Could not save CAPTCHA screenshot: {str(e)}")
+                
+                # Read solution
+                solution = prompt_with_timeout("", MANUAL_PROMPT_TIMEOUT)
+            
+            if solution is None:
+                self.logger.error(f"No CAPTCHA solution entered within {MANUAL_PROMPT_TIMEOUT} seconds")
+                return False
             
             # Find input field
             input_fields = driver.find_elements(By.CSS_SELECTOR, "input[name*='captcha'], input[id*='captcha']")
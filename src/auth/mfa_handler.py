@@ -8,15 +8,25 @@ OTP readers and other authentication methods
 
 import os
 import time
-from typing import Optional, Dict, Any, Callable
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Sequence, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 
-from src.auth.otp_reader import OTPReader
+from src.auth.otp_reader import get_shared_otp_reader
 from src.utils.logger import get_logger
+from src.utils.dom import detect_first_match, has_blocking_page_load, snapshot_text
+from src.utils.prompt import prompt_lock, prompt_user, prompt_with_timeout
+
+# Seconds to wait for the user during manual fallback
+MANUAL_PROMPT_TIMEOUT = 120
 
 
 class MFAHandler:
@@ -27,10 +37,85 @@ class MFAHandler:
     including OTP codes, push notifications, and security questions
     """
     
+    _OTP_INPUT_SELECTOR = (
+        "input[name*='otp'], input[id*='otp'], #otp, "
+        "input[placeholder*='code'], input[aria-label*='verification']"
+    )
+    _SUBMIT_BUTTON_SELECTOR = "button[type='submit'], input[type='submit']"
+    
+    # MFA challenge indicators, CSS or XPath (starting with '//')
+    _OTP_INDICATORS = (
+        "input[name*='otp']",
+        "input[id*='otp']",
+        "input[placeholder*='code']",
+        "input[aria-label*='verification']",
+        "#otp",
+        "//label[contains(text(), 'Verification Code')]",
+        "//label[contains(text(), 'Security Code')]"
+    )
+    _PUSH_INDICATORS = (
+        "//button[contains(text(), 'Send Push')]",
+        "//div[contains(text(), 'push notification')]"
+    )
+    _SECURITY_QUESTION_INDICATORS = (
+        "input[id*='securityAnswer']",
+        "//label[contains(text(), 'Security Question')]"
+    )
+    _MFA_DETECTORS = (
+        ("otp", _OTP_INDICATORS),
+        ("push", _PUSH_INDICATORS),
+        ("security_questions", _SECURITY_QUESTION_INDICATORS),
+    )
+    
+    # Returns "failed" if an error message mentions a failure keyword,
+    # "navigated" if the page URL changed, otherwise null
+    _SUBMIT_OUTCOME_SCRIPT = """
+        const [startUrl, keywords] = arguments;
+        for (const el of document.querySelectorAll("div[class*='error'], div[class*='alert']")) {
+            const text = el.innerText.toLowerCase();
+            if (keywords.some(keyword => text.includes(keyword))) {
+                return 'failed';
+            }
+        }
+        return window.location.href !== startUrl ? 'navigated' : null;
+    """
+    
+    # Push notification outcome indicators
+    _PUSH_SUCCESS_INDICATORS = (
+        "//div[contains(text(), 'successful')]",
+        "//div[contains(text(), 'verified')]",
+        "//h1[contains(text(), 'Welcome')]",
+        "//span[contains(text(), 'Account Summary')]"
+    )
+    _PUSH_FAILURE_INDICATORS = (
+        "//div[contains(text(), 'failed')]",
+        "//div[contains(text(), 'denied')]",
+        "//div[contains(text(), 'timed out')]"
+    )
+    _PUSH_OUTCOME_DETECTORS = (
+        ("approved", _PUSH_SUCCESS_INDICATORS),
+        ("failed", _PUSH_FAILURE_INDICATORS),
+    )
+    
+    # Indicators that we are still on an authentication page
+    _AUTH_PAGE_INDICATORS = (
+        "//div[contains(text(), 'authentication')]",
+        "//div[contains(text(), 'verification')]",
+        "//h1[contains(text(), 'Verify')]"
+    )
+    
     def __init__(self):
-        """Initialize MFA handler"""
+        """
+        Initialize MFA handler
+        
+        Drivers passed to this handler should use the 'eager' or 'none'
+        page load strategy so detection doesn't wait on full page loads
+        """
         self.logger = get_logger("mfa_handler")
-        self.otp_reader = OTPReader()
+        self.otp_reader = get_shared_otp_reader()
+        self._screenshot_executor = ThreadPoolExecutor(max_workers=1)
+        self._element_cache: Dict[str, Dict[str, WebElement]] = {}
+        self._page_load_checked = False
     
     def handle_mfa(self, driver: webdriver.Chrome, bank_id: str) -> bool:
         """
@@ -40,6 +125,8 @@ class MFAHandler:
         :param bank_id: Identifier for the bank
         :return: Boolean indicating success or failure
         """
+        self._check_page_load_strategy(driver)
+        
         try:
             # Detect MFA type
             mfa_type = self._detect_mfa_type(driver, bank_id)
@@ -59,12 +146,41 @@ class MFAHandler:
                 return self._handle_security_questions(driver, bank_id)
             else:
                 self.logger.warning(f"Unsupported MFA type: {mfa_type}")
-                return self._handle_manually(driver)
+                return self._handle_manually(driver, bank_id)
             
         except Exception as e:
             self.logger.error(f"Error handling MFA: {str(e)}")
             return False
     
+    def _check_page_load_strategy(self, driver: webdriver.Chrome) -> None:
+        """
+        Warn once if the driver blocks commands on full page loads
+        
+        :param driver: Selenium WebDriver instance
+        """
+        if self._page_load_checked:
+            return
+        
+        self._page_load_checked = True
+        if has_blocking_page_load(driver):
+            self.logger.warning(
+                "WebDriver uses the 'normal' page load strategy, MFA detection may stall "
+                "on slow page resources. Use 'eager' or 'none' instead"
+            )
+    
+    async def handle_mfa_async(self, driver: webdriver.Chrome, bank_id: str) -> bool:
+        """
+        Detect and handle MFA challenges without blocking the event loop
+        
+        Runs handle_mfa in a worker thread so several bank sessions, each
+        with its own driver, can wait on MFA at the same time
+        
+        :param driver: Selenium WebDriver instance
+        :param bank_id: Identifier for the bank
+        :return: Boolean indicating success or failure
+        """
+        return await asyncio.to_thread(self.handle_mfa, driver, bank_id)
+    
     def _detect_mfa_type(self, driver: webdriver.Chrome, bank_id: str) -> Optional[str]:
         """
         Detect type of MFA challenge
@@ -73,23 +189,8 @@ class MFAHandler:
         :param bank_id: Identifier for the bank
         :return: String identifier for MFA type
         """
-        # Check for OTP input field
-        otp_indicators = [
-            "input[name*='otp']",
-            "input[id*='otp']",
-            "input[placeholder*='code']",
-            "input[aria-label*='verification']",
-            "#otp",
-            "//label[contains(text(), 'Verification Code')]",
-            "//label[contains(text(), 'Security Code')]"
-        ]
-        
-        for indicator in otp_indicators:
-            by = By.XPATH if indicator.startswith("//") else By.CSS_SELECTOR
-            if len(driver.find_elements(by, indicator)) > 0:
-                return "security_questions"
-        
-        return None
+        # First matching challenge type wins
+        return detect_first_match(driver, self._MFA_DETECTORS)
     
     def _handle_otp(self, driver: webdriver.Chrome, bank_id: str) -> bool:
         """
@@ -102,18 +203,12 @@ class MFAHandler:
         try:
             self.logger.info(f"Handling OTP challenge for {bank_id}")
             
-            # Find OTP input field
-            otp_input = None
-            otp_selectors = [
-                "input[name*='otp']", "input[id*='otp']", "#otp",
-                "input[placeholder*='code']", "input[aria-label*='verification']"
-            ]
+            # Find OTP input field, reusing the element from a previous attempt
+            def find_otp_input() -> Optional[WebElement]:
+                elements = driver.find_elements(By.CSS_SELECTOR, self._OTP_INPUT_SELECTOR)
+                return elements[0] if elements else None
             
-            for selector in otp_selectors:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    otp_input = elements[0]
-                    break
+            otp_input = self._cached_find(bank_id, "otp_input", find_otp_input)
             
             if not otp_input:
                 self.logger.error("OTP input field not found")
@@ -128,43 +223,49 @@ class MFAHandler:
             if not otp_code:
                 # Prompt user if automated reading fails
                 self.logger.info("Automated OTP reading failed, prompting user...")
-                otp_code = input(f"Please enter the {bank_id} OTP code: ")
-            
-            # Enter OTP code
-            otp_input.clear()
-            otp_input.send_keys(otp_code)
+                otp_code = prompt_user(f"Please enter the {bank_id} OTP code: ")
+            
+            # Enter OTP code, looking the field up again if the cached one went stale
+            try:
+                otp_input.clear()
+                otp_input.send_keys(otp_code)
+            except StaleElementReferenceException:
+                self._invalidate_cached_elements(bank_id)
+                otp_input = self._cached_find(bank_id, "otp_input", find_otp_input)
+                if not otp_input:
+                    self.logger.error("OTP input field not found")
+                    return False
+                otp_input.clear()
+                otp_input.send_keys(otp_code)
             
             # Find and click submit button
-            submit_buttons = driver.find_elements(
-                By.XPATH, 
-                "//button[contains(text(), 'Submit') or contains(text(), 'Continue') or contains(text(), 'Verify')]"
-            )
-            
-            if not submit_buttons:
-                submit_buttons = driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "button[type='submit'], input[type='submit']"
+            submit_button = self._cached_find(
+                bank_id,
+                "otp_submit",
+                lambda: self._find_submit_button(
+                    driver,
+                    "//button[contains(text(), 'Submit') or contains(text(), 'Continue') or contains(text(), 'Verify')]"
                 )
+            )
             
-            if submit_buttons:
-                submit_buttons[0].click()
-                time.sleep(5)
+            if submit_button:
+                current_url = driver.current_url
+                try:
+                    submit_button.click()
+                except StaleElementReferenceException:
+                    self._invalidate_cached_elements(bank_id)
+                    raise
                 
-                # Check for error messages
-                error_messages = driver.find_elements(
-                    By.XPATH, 
-                    "//div[contains(@class, 'error') or contains(@class, 'alert')]"
+                outcome = self._wait_for_submit_outcome(
+                    driver, current_url, ("incorrect", "invalid", "failed"), timeout=10
                 )
                 
-                if error_messages and any(
-                    "incorrect" in msg.text.lower() or 
-                    "invalid" in msg.text.lower() or 
-                    "failed" in msg.text.lower() 
-                    for msg in error_messages
-                ):
+                if outcome == "failed":
+                    # Keep cached elements for a retry on the same page
                     self.logger.error("OTP verification failed")
                     return False
                 
+                self._invalidate_cached_elements(bank_id)
                 self.logger.info("OTP verification successful")
                 return True
             else:
@@ -200,43 +301,24 @@ class MFAHandler:
             print("Please approve the authentication request on your device")
             print("="*50 + "\n")
             
-            # Wait for approval
+            # Wait for approval or failure, classifying the outcome in one probe per poll
             max_wait_time = 60 
-            poll_interval = 2 
-            start_time = time.time()
-            
-            while time.time() - start_time < max_wait_time:
-                # Check for success
-                success_indicators = [
-                    "//div[contains(text(), 'successful')]",
-                    "//div[contains(text(), 'verified')]",
-                    "//h1[contains(text(), 'Welcome')]",
-                    "//span[contains(text(), 'Account Summary')]"
-                ]
-                
-                for indicator in success_indicators:
-                    elements = driver.find_elements(By.XPATH, indicator)
-                    if elements:
-                        self.logger.info("Push notification approved")
-                        return True
-                
-                # Check for failure
-                failure_indicators = [
-                    "//div[contains(text(), 'failed')]",
-                    "//div[contains(text(), 'denied')]",
-                    "//div[contains(text(), 'timed out')]"
-                ]
-                
-                for indicator in failure_indicators:
-                    elements = driver.find_elements(By.XPATH, indicator)
-                    if elements:
-                        self.logger.error("Push notification denied or timed out")
-                        return False
-                
-                time.sleep(poll_interval)
+            poll_interval = 1.0 
             
-            self.logger.error("Push notification verification timed out")
-            return False
+            try:
+                outcome = WebDriverWait(driver, max_wait_time, poll_frequency=poll_interval).until(
+                    lambda d: detect_first_match(d, self._PUSH_OUTCOME_DETECTORS)
+                )
+            except TimeoutException:
+                self.logger.error("Push notification verification timed out")
+                return False
+            
+            if outcome == "failed":
+                self.logger.error("Push notification denied or timed out")
+                return False
+            
+            self.logger.info("Push notification approved")
+            return True
             
         except Exception as e:
             self.logger.error(f"Error handling push notification: {str(e)}")
@@ -254,16 +336,14 @@ class MFAHandler:
             self.logger.info(f"Handling security questions for {bank_id}")
             
             # Get security question text
-            question_elements = driver.find_elements(
-                By.XPATH, 
-                "//label[contains(text(), 'Security Question') or contains(text(), 'Question')]"
-            )
+            question_text = snapshot_text(driver, {
+                "question": "//label[contains(text(), 'Security Question') or contains(text(), 'Question')]"
+            }).get("question")
             
-            if not question_elements:
+            if question_text is None:
                 self.logger.error("Security question not found")
                 return False
             
-            question_text = question_elements[0].text
             self.logger.info(f"Security question: {question_text}")
             
             # Load answers
@@ -272,19 +352,19 @@ class MFAHandler:
             if not answers:
                 # Prompt user for answer if not available
                 self.logger.info("No pre-configured answers, prompting user...")
-                answer = input(f"Please enter answer for security question: {question_text}\n")
+                answer = prompt_user(f"Please enter the {bank_id} answer for security question: {question_text}\n")
             else:
-                # Try to find matching answer
-                answer = None
-                for q_pattern, ans in answers.items():
-                    if q_pattern.lower() in question_text.lower():
-                        answer = ans
-                        break
+                # Try to find matching answer, patterns are already lowercase
+                question_lower = question_text.lower()
+                answer = next(
+                    (ans for q_pattern, ans in answers if q_pattern in question_lower),
+                    None
+                )
                 
                 if not answer:
                     # If no match found, prompt user
                     self.logger.info("No matching answer found, prompting user...")
-                    answer = input(f"Please enter answer for security question: {question_text}\n")
+                    answer = prompt_user(f"Please enter the {bank_id} answer for security question: {question_text}\n")
             
             # Find answer input field
             answer_input = driver.find_element(
@@ -297,32 +377,19 @@ class MFAHandler:
             answer_input.send_keys(answer)
             
             # Find and click submit button
-            submit_buttons = driver.find_elements(
-                By.XPATH, 
+            submit_button = self._find_submit_button(
+                driver,
                 "//button[contains(text(), 'Submit') or contains(text(), 'Continue') or contains(text(), 'Next')]"
             )
             
-            if not submit_buttons:
-                submit_buttons = driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "button[type='submit'], input[type='submit']"
-                )
-            
-            if submit_buttons:
-                submit_buttons[0].click()
-                time.sleep(3)
-                
-                # Check for error messages
-                error_messages = driver.find_elements(
-                    By.XPATH, 
-                    "//div[contains(@class, 'error') or contains(@class, 'alert')]"
+            if submit_button:
+                current_url = driver.current_url
+                submit_button.click()
+                outcome = self._wait_for_submit_outcome(
+                    driver, current_url, ("incorrect", "wrong"), timeout=10
                 )
                 
-                if error_messages and any(
-                    "incorrect" in msg.text.lower() or 
-                    "wrong" in msg.text.lower() 
-                    for msg in error_messages
-                ):
+                if outcome == "failed":
                     self.logger.error("Security question answer incorrect")
                     return False
                 
@@ -336,53 +403,140 @@ class MFAHandler:
             self.logger.error(f"Error handling security questions: {str(e)}")
             return False
     
-    def _load_security_answers(self, bank_id: str) -> Dict[str, str]:
+    def _find_submit_button(self, driver: webdriver.Chrome, label_xpath: str,
+                            timeout: int = 5) -> Optional[WebElement]:
+        """
+        Find a submit button, preferring one matched by its label
+        
+        :param driver: Selenium WebDriver instance
+        :param label_xpath: XPath matching buttons by their text
+        :param timeout: Maximum time to wait in seconds
+        :return: Submit button WebElement if found
+        """
+        try:
+            return WebDriverWait(driver, timeout).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, label_xpath)),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._SUBMIT_BUTTON_SELECTOR))
+                )
+            )
+        except TimeoutException:
+            return None
+    
+    def _wait_for_submit_outcome(self, driver: webdriver.Chrome, current_url: str,
+                                 failure_keywords: Sequence[str], timeout: int = 10) -> Optional[str]:
+        """
+        Wait for the page to react to a submitted challenge and classify the result
+        
+        Error text matching and the navigation check run in the browser
+        as a single script per poll
+        
+        :param driver: Selenium WebDriver instance
+        :param current_url: URL of the page before submitting
+        :param failure_keywords: Lowercase words in an error message that mean failure
+        :param timeout: Maximum time to wait in seconds
+        :return: "failed", "navigated", or None if the page did not react
+        """
+        try:
+            return WebDriverWait(driver, timeout).until(
+                lambda d: d.execute_script(
+                    self._SUBMIT_OUTCOME_SCRIPT, current_url, list(failure_keywords)
+                )
+            )
+        except TimeoutException:
+            self.logger.debug("No response detected after submit, continuing")
+            return None
+    
+    def _cached_find(self, bank_id: str, key: str,
+                     finder: Callable[[], Optional[WebElement]]) -> Optional[WebElement]:
+        """
+        Get an element from the per-bank cache, looking it up on a miss
+        
+        :param bank_id: Identifier for the bank
+        :param key: Name of the cached element
+        :param finder: Callable that looks up the element
+        :return: WebElement if found
+        """
+        elements = self._element_cache.setdefault(bank_id, {})
+        element = elements.get(key)
+        
+        if element is None:
+            element = finder()
+            if element is not None:
+                elements[key] = element
+        
+        return element
+    
+    def _invalidate_cached_elements(self, bank_id: str) -> None:
+        """
+        Drop cached elements for a bank after navigation or stale references
+        
+        :param bank_id: Identifier for the bank
+        """
+        self._element_cache.pop(bank_id, None)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _load_security_answers(bank_id: str) -> Tuple[Tuple[str, str], ...]:
         """
         Load security question answers from configuration
         
+        Cached per bank, so environment variables are read once
+        
         :param bank_id: Identifier for the bank
-        :return: Dictionary mapping question patterns to answers
+        :return: Tuple of (lowercase question pattern, answer) pairs
         """
-        return {
-            "first pet": os.environ.get(f"{bank_id.upper()}_PET_NAME", ""),
-            "mother maiden": os.environ.get(f"{bank_id.upper()}_MOTHER_MAIDEN", ""),
-            "high school": os.environ.get(f"{bank_id.upper()}_HIGH_SCHOOL", ""),
-            "first car": os.environ.get(f"{bank_id.upper()}_FIRST_CAR", ""),
-            "birth city": os.environ.get(f"{bank_id.upper()}_BIRTH_CITY", "")
-        }
+        prefix = bank_id.upper()
+        return (
+            ("first pet", os.environ.get(f"{prefix}_PET_NAME", "")),
+            ("mother maiden", os.environ.get(f"{prefix}_MOTHER_MAIDEN", "")),
+            ("high school", os.environ.get(f"{prefix}_HIGH_SCHOOL", "")),
+            ("first car", os.environ.get(f"{prefix}_FIRST_CAR", "")),
+            ("birth city", os.environ.get(f"{prefix}_BIRTH_CITY", ""))
+        )
     
-    def _handle_manually(self, driver: webdriver.Chrome) -> bool:
+    def _handle_manually(self, driver: webdriver.Chrome, bank_id: str) -> bool:
         """
         Fallback method for manual MFA handling
         
         :param driver: Selenium WebDriver instance
+        :param bank_id: Identifier for the bank
         :return: Boolean indicating success or failure
         """
         self.logger.info("Falling back to manual MFA handling")
         
         try:
-            # Take screenshot to show challenge
-            screenshot_path = os.path.join(os.getcwd(), "mfa_screenshot.png")
-            driver.save_screenshot(screenshot_path)
+            # Take screenshot to show challenge in the background
+            screenshot_path = os.path.join(os.getcwd(), f"mfa_screenshot_{bank_id}.png")
+            screenshot_future = self._screenshot_executor.submit(driver.save_screenshot, screenshot_path)
+            self.logger.info(f"Manual MFA handling required, saving screenshot to {screenshot_path}")
+            
+            with prompt_lock:
+                # Show the prompt while the screenshot is taken; anything typed meanwhile waits in the terminal
+                print(f"Please handle the {bank_id} authentication challenge manually in the browser, "
+                      "then press Enter to continue...", end="", flush=True)
+                
+                # Driver is not thread-safe, so let the screenshot finish before using it again.
+                # Not bounded here: a timed-out wait would leave the worker using the driver,
+                # and the command is already bounded by the driver's own timeout
+                try:
+                    screenshot_future.result()
+                except Exception as e:
+                    self.logger.warning(f"Could not save MFA screenshot: {str(e)}")
+                
+                # Wait for the user to confirm
+                response = prompt_with_timeout("", MANUAL_PROMPT_TIMEOUT)
             
-            # Prompt user to handle challenge
-            self.logger.info(f"MFA screenshot saved to {screenshot_path}")
-            input("Please handle the authentication challenge manually in the browser, then press Enter to continue...")
+            if response is None:
+                self.logger.error(f"Manual MFA not confirmed within {MANUAL_PROMPT_TIMEOUT} seconds")
+                return False
             
             time.sleep(5)
             
             # Check if we're still on authentication page
-            auth_indicators = [
-                "//div[contains(text(), 'authentication')]",
-                "//div[contains(text(), 'verification')]",
-                "//h1[contains(text(), 'Verify')]"
-            ]
-            
-            for indicator in auth_indicators:
-                elements = driver.find_elements(By.XPATH, indicator)
-                if elements:
-                    self.logger.warning("Still on authentication page, MFA may not be complete")
-                    return False
+            if detect_first_match(driver, [("auth_page", self._AUTH_PAGE_INDICATORS)]):
+                self.logger.warning("Still on authentication page, MFA may not be complete")
+                return False
             
             self.logger.info("Manual MFA handling appears successful")
             return True
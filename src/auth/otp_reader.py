@@ -9,10 +9,141 @@ reading and manual input fallbacks
 import os
 import re
 import time
+import atexit
+import select
+import string
+import functools
+import threading
+import sqlite3
 import subprocess
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 
+from src.utils.prompt import prompt_lock
+
+CHAT_DB_PATH = os.path.expanduser("~/Library/Messages/chat.db")
+CHAT_DB_WAL_PATH = CHAT_DB_PATH + "-wal"
+
+# Seconds between cheap checks for database changes while waiting for an OTP
+DB_CHANGE_POLL_INTERVAL = 0.5
+
+# Seconds between the Unix epoch and the Apple epoch (2001-01-01)
+APPLE_EPOCH_OFFSET = 978307200
+
+# Six digits not embedded in a longer number
+DEFAULT_OTP_REGEX = r"(?<!\d)(\d{6})(?!\d)"
+
+# Messages with fewer digits than the shortest OTP are skipped before the regex
+MIN_OTP_DIGITS = 4
+_DIGIT_TABLE = str.maketrans('', '', string.digits)
+
+# Marker echoed by the osascript helper after each script's output
+OSA_SENTINEL = "---END---"
+OSA_READ_TIMEOUT = 30
+OSA_READ_SIZE = 65536
+
+# Prompt and result markers `osascript -i` may print ahead of a result
+_OSA_PROMPT_RE = re.compile(r'^(?:(?:>>|=>|\?>)\s*)+')
+
+# Newest messages read from each chat by the AppleScript fallback; an OTP
+# is always among a chat's latest messages
+APPLESCRIPT_MESSAGES_PER_CHAT = 10
+
+# Emits the newest messages of every chat as "<age in seconds>\t<text>", one
+# per line. Date and provider filtering happen in Python: a `whose` clause on
+# dates is extremely slow under osascript, and appending to a text value
+# avoids AppleScript's quadratic list growth
+MESSAGES_APPLESCRIPT = f"""
+tell application "Messages"
+    set recentMessages to ""
+    set checkTime to current date
+    
+    repeat with chat in chats
+        set msgCount to count of messages of chat
+        if msgCount > 0 then
+            set firstIndex to msgCount - {APPLESCRIPT_MESSAGES_PER_CHAT} + 1
+            if firstIndex < 1 then set firstIndex to 1
+            
+            repeat with msg in (messages firstIndex thru msgCount of chat)
+                set msgAge to (checkTime - (date received of msg)) as integer
+                set recentMessages to recentMessages & (msgAge as text) & tab & (content of msg) & linefeed
+            end repeat
+        end if
+    end repeat
+    
+    return recentMessages
+end tell
+"""
+
+
+@functools.lru_cache(maxsize=16)
+def _compiled(pattern: str) -> re.Pattern:
+    """
+    Compile a case-insensitive regex once and reuse it across polls
+    
+    :param pattern: Regular expression pattern
+    :return: Compiled pattern
+    """
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _to_chatdb_time(moment: datetime) -> int:
+    """
+    Convert a time to chat.db's format, nanoseconds since 2001-01-01
+    
+    :param moment: Time to convert
+    :return: chat.db timestamp
+    """
+    return int((moment.timestamp() - APPLE_EPOCH_OFFSET) * 1e9)
+
+
+def _decode_attributed_body(blob: Optional[bytes]) -> Optional[str]:
+    """
+    Pull the plain text out of a message's attributedBody
+    
+    Newer macOS versions store many incoming messages only there, as a
+    typedstream-archived NSAttributedString, and leave the text column NULL
+    
+    :param blob: attributedBody column value
+    :return: Message text, or None if it can't be decoded
+    """
+    if not blob:
+        return None
+    
+    _, found, body = blob.partition(b"NSString")
+    # The class name is followed by 5 bytes of archive header, then the length
+    if not found or len(body) < 6:
+        return None
+    
+    body = body[5:]
+    # Lengths over 127 bytes are prefixed with 0x81 (16-bit) or 0x82 (32-bit), little-endian
+    if body[0] == 0x81:
+        length, start = int.from_bytes(body[1:3], "little"), 3
+    elif body[0] == 0x82:
+        length, start = int.from_bytes(body[1:5], "little"), 5
+    else:
+        length, start = body[0], 1
+    
+    return body[start:start + length].decode(errors='replace')
+
+
+def _detect_platform() -> str:
+    """
+    Detect the current operating system platform
+    
+    :return: String identifier for the platform ('macos', 'windows', 'linux')
+    """
+    if os.name == 'posix' and 'darwin' in os.uname().sysname.lower():
+        return 'macos'
+    elif os.name == 'nt':
+        return 'windows'
+    else:
+        return 'linux'
+
+
+# The platform can't change while running, so detect it once at import
+_PLATFORM = _detect_platform()
+
 
 class OTPReader:
     """
@@ -25,24 +156,30 @@ class OTPReader:
     
     def __init__(self):
         """Initialize OTP reader"""
-        self.platform = self._detect_platform()
+        self.platform = _PLATFORM
         self.last_check_time = datetime.now()
+        self._osa = None
+        self._osa_lock = threading.Lock()
     
-    def _detect_platform(self) -> str:
-        """
-        Detect the current operating system platform
+    def close(self) -> None:
+        """Terminate the persistent osascript helper, if running"""
+        if getattr(self, '_osa', None) is None:
+            return
         
-        :return: String identifier for the platform ('macos', 'windows', 'linux')
-        """
-        if os.name == 'posix' and 'darwin' in os.uname().sysname.lower():
-            return 'macos'
-        elif os.name == 'nt':
-            return 'windows'
-        else:
-            return 'linux'
+        try:
+            self._osa.stdin.close()
+            self._osa.terminate()
+            self._osa.wait(timeout=5)
+        except Exception:
+            self._osa.kill()
+        finally:
+            self._osa = None
+    
+    def __del__(self):
+        self.close()
     
     def get_latest_code(self, provider: str = None, timeout: int = 60, 
-                       regex: str = r"(\d{6})", check_interval: int = 5) -> Optional[str]:
+                       regex: str = DEFAULT_OTP_REGEX, check_interval: int = 5) -> Optional[str]:
         """
         Get the latest OTP code
         
@@ -60,7 +197,7 @@ class OTPReader:
     def _get_otp_from_macos_messages(self, provider: Optional[str], timeout: int, 
                                      regex: str, check_interval: int) -> Optional[str]:
         """
-        Get OTP code from macOS Messages using AppleScript
+        Get OTP code from macOS Messages
         
         :param provider: Name of the service provider
         :param timeout: Maximum time to wait for an OTP in seconds
@@ -71,88 +208,264 @@ class OTPReader:
         start_time = datetime.now()
         end_time = start_time + timedelta(seconds=timeout)
 
+        # start_time is passed down rather than read back from the instance,
+        # which is shared by extractors that may wait for codes concurrently
         self.last_check_time = start_time
+        since_ns = _to_chatdb_time(start_time)
+        pattern = _compiled(regex)
+        
+        last_mtime = None
+        errors = 0
         
         while datetime.now() < end_time:
+            # Skip the read entirely if the Messages database hasn't been written to
+            current_mtime = self._get_messages_db_mtime()
+            if current_mtime is not None and current_mtime == last_mtime:
+                time.sleep(DB_CHANGE_POLL_INTERVAL)
+                continue
+            
             try:
                 # Read recent messages
-                script = self._build_messages_applescript(provider)
-                result = subprocess.run(
-                    ['osascript', '-e', script], 
-                    capture_output=True, 
-                    text=True
-                )
+                messages = self._read_recent_messages(provider, start_time, since_ns)
                 
-                if result.returncode != 0:
-                    print(f"AppleScript error: {result.stderr}")
-                    time.sleep(check_interval)
+                if messages is None:
+                    errors += 1
+                    time.sleep(self._backoff_delay(errors, check_interval))
                     continue
                 
-                # Extract messages
-                messages = result.stdout.strip().split('\n')
+                errors = 0
+                last_mtime = current_mtime
                 
                 # Look for OTP code in each message
                 for message in messages:
-                    if not message:
+                    if not message or len(message) - len(message.translate(_DIGIT_TABLE)) < MIN_OTP_DIGITS:
                         continue
                     
-                    match = re.search(regex, message)
+                    match = pattern.search(message)
                     if match:
                         otp = match.group(1)
                         print(f"Found OTP code: {otp}")
                         return otp
                 
-                time.sleep(check_interval)
+                # Without a database to watch, fall back to fixed-interval polling
+                time.sleep(DB_CHANGE_POLL_INTERVAL if current_mtime is not None else check_interval)
                 
             except Exception as e:
                 print(f"Error reading messages: {str(e)}")
-                time.sleep(check_interval)
+                errors += 1
+                time.sleep(self._backoff_delay(errors, check_interval))
         
         print(f"OTP not found after waiting {timeout} seconds")
         return None
     
-    def _build_messages_applescript(self, provider: Optional[str]) -> str:
+    def _get_messages_db_mtime(self) -> Optional[float]:
         """
-        Build AppleScript to extract recent messages
+        Get the last modification time of the Messages database
+        
+        New messages land in the write-ahead log first, so its mtime changes
+        on every incoming message
+        
+        :return: Modification time, or None if the database can't be checked
+        """
+        for path in (CHAT_DB_WAL_PATH, CHAT_DB_PATH):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                continue
+        
+        return None
+    
+    def _backoff_delay(self, errors: int, check_interval: int) -> float:
+        """
+        Get the delay before retrying after consecutive read errors
+        
+        :param errors: Number of consecutive errors
+        :param check_interval: Upper bound for the delay in seconds
+        :return: Delay in seconds
+        """
+        return min(check_interval, DB_CHANGE_POLL_INTERVAL * 2 ** errors)
+    
+    def _read_recent_messages(self, provider: Optional[str], since: datetime, 
+                              since_ns: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Read messages received since the given time
+        
+        Reads the Messages database directly and only falls back to
+        AppleScript when the database can't be opened
         
         :param provider: Optional provider name to filter messages
-        :return: AppleScript code as string
+        :param since: Only messages received after this time are returned
+        :param since_ns: since already converted with _to_chatdb_time, to skip converting per poll
+        :return: List of message texts, or None if messages couldn't be read
         """
-        since_time = self.last_check_time.strftime('%Y-%m-%d %H:%M:%S')
+        if since_ns is None:
+            since_ns = _to_chatdb_time(since)
         
-        # Get messages from last hour
-        script = f"""
-        tell application "Messages"
-            set recentMessages to {{}}
-            set oneHourAgo to (current date) - 3600
-            
-            repeat with chat in chats
-                repeat with msg in (messages of chat whose date received > date "{since_time}")
-                    set msgText to content of msg
+        try:
+            return self._get_messages_from_chatdb(provider, since_ns)
+        except sqlite3.Error as e:
+            print(f"Could not read Messages database, falling back to AppleScript: {str(e)}")
+        
+        lines = self._run_applescript(MESSAGES_APPLESCRIPT)
+        
+        if lines is None:
+            return None
+        
+        return self._filter_applescript_messages(lines, provider, since)
+    
+    def _run_applescript(self, script: str) -> Optional[List[str]]:
         """
+        Run a script through a long-lived `osascript -i` helper
         
-        # Add provider filter
-        if provider:
-            provider_escaped = provider.replace('"', '\\"')
-            script += f"""
-                    if msgText contains "{provider_escaped}" then
-                        set end of recentMessages to msgText
-                    end if
-            """
-        else:
-            script += """
-                    set end of recentMessages to msgText
-            """
+        Starting osascript for every poll is slow, so one interactive
+        process is kept around and fed scripts over stdin
         
-        script += """
-                end repeat
-            end repeat
+        :param script: AppleScript source to run
+        :return: Output lines of the script, or None on error
+        """
+        # One helper serves every extractor sharing this reader
+        with self._osa_lock:
+            return self._run_applescript_locked(script)
+    
+    def _run_applescript_locked(self, script: str) -> Optional[List[str]]:
+        """
+        Run a script through the osascript helper while holding its lock
+        
+        :param script: AppleScript source to run
+        :return: Output lines of the script, or None on error
+        """
+        if self._osa is None or self._osa.poll() is not None:
+            self._osa = subprocess.Popen(
+                ['osascript', '-i'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        
+        try:
+            self._osa.stdin.write((script.strip() + "\n").encode())
+            self._osa.stdin.write(f'"{OSA_SENTINEL}"\n'.encode())
+            self._osa.stdin.flush()
             
-            return recentMessages
-        end tell
+            # Read the raw pipe into our own buffer: a buffered readline could
+            # hold the sentinel back while select waits on an empty pipe
+            stdout_fd = self._osa.stdout.fileno()
+            pending = b""
+            lines = []
+            deadline = time.monotonic() + OSA_READ_TIMEOUT
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                
+                ready, _, _ = select.select([stdout_fd], [], [], remaining)
+                if not ready:
+                    break
+                
+                chunk = os.read(stdout_fd, OSA_READ_SIZE)
+                if not chunk:
+                    break
+                
+                *complete, pending = (pending + chunk).split(b"\n")
+                for raw_line in complete:
+                    line = self._clean_osa_line(raw_line.decode(errors='replace'))
+                    if line == OSA_SENTINEL:
+                        return lines
+                    if line:
+                        lines.append(line)
+            
+            print("AppleScript error: osascript helper stopped responding")
+        except (OSError, ValueError) as e:
+            print(f"AppleScript error: {str(e)}")
+        
+        self.close()
+        return None
+    
+    @staticmethod
+    def _clean_osa_line(line: str) -> str:
+        """
+        Strip interactive prompts and literal quoting from an osascript output line
+        
+        :param line: Raw output line
+        :return: Line text
+        """
+        # Interactive mode prints results as AppleScript literals
+        return _OSA_PROMPT_RE.sub('', line.strip()).strip('"')
+    
+    def _get_messages_from_chatdb(self, provider: Optional[str], since_ns: int) -> List[str]:
+        """
+        Read recent messages from the macOS Messages SQLite database
+        
+        :param provider: Optional provider name to filter messages
+        :param since_ns: Only messages received after this chat.db time are returned
+        :return: List of message texts, newest first
+        :raises sqlite3.Error: If the database can't be opened or queried
         """
+        provider_pattern = f"%{provider}%" if provider else None
+        
+        # Match the provider against the text or the sender (short codes,
+        # e-mail senders), letting SQLite narrow by date first. Messages
+        # with only an attributedBody are matched once it's decoded below
+        connection = sqlite3.connect(f"file:{CHAT_DB_PATH}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(
+                """
+                SELECT m.text, m.attributedBody, h.id LIKE ?
+                FROM message m
+                LEFT JOIN handle h ON m.handle_id = h.ROWID
+                WHERE m.date > ?
+                  AND (m.text IS NOT NULL OR m.attributedBody IS NOT NULL)
+                  AND (? IS NULL OR m.text LIKE ? OR h.id LIKE ? OR m.text IS NULL)
+                ORDER BY m.date DESC
+                LIMIT 25
+                """,
+                (provider_pattern, since_ns, provider_pattern, provider_pattern, provider_pattern)
+            ).fetchall()
+        finally:
+            connection.close()
         
-        return script
+        messages = []
+        for text, attributed_body, sender_matches in rows:
+            if text is None:
+                text = _decode_attributed_body(attributed_body)
+                if text is None:
+                    continue
+                if provider and not sender_matches and provider.lower() not in text.lower():
+                    continue
+            messages.append(text)
+        
+        return messages
+    
+    def _filter_applescript_messages(self, lines: List[str], provider: Optional[str], 
+                                     since: datetime) -> List[str]:
+        """
+        Keep only messages received since the given time
+        
+        :param lines: Output lines from the Messages AppleScript
+        :param provider: Optional provider name to filter messages
+        :param since: Only messages received after this time are kept
+        :return: List of message texts
+        """
+        max_age = (datetime.now() - since).total_seconds()
+        age_line = _compiled(r'(-?\d+)\t(.*)')
+        
+        messages = []
+        keep = False
+        for line in lines:
+            match = age_line.match(line)
+            if match:
+                keep = int(match.group(1)) < max_age
+                if keep:
+                    messages.append(match.group(2))
+            elif keep and messages:
+                # Continuation of a multi-line message
+                messages[-1] += "\n" + line
+        
+        if provider:
+            provider = provider.lower()
+            messages = [message for message in messages if provider in message.lower()]
+        
+        return messages
     
     def _get_otp_manually(self, provider: Optional[str]) -> str:
         """
@@ -163,14 +476,17 @@ class OTPReader:
         """
         provider_str = f" from {provider}" if provider else ""
         
-        while True:
-            otp = input(f"Please enter the OTP code{provider_str}: ").strip()
-            if re.match(r'^\d{4,8}, otp'):
-                return otp
-            else:
-                print("Invalid OTP format. Please enter a numeric code (usually 4-8 digits).")
+        # Keep the console until a valid code is entered, so retries aren't
+        # interleaved with another session's prompt
+        with prompt_lock:
+            while True:
+                otp = input(f"Please enter the OTP code{provider_str}: ").strip()
+                if _compiled(r'\d{4,8}').fullmatch(otp):
+                    return otp
+                else:
+                    print("Invalid OTP format. Please enter a numeric code (usually 4-8 digits).")
     
-    def extract_code_from_text(self, text: str, regex: str = r"(\d{6})") -> Optional[str]:
+    def extract_code_from_text(self, text: str, regex: str = DEFAULT_OTP_REGEX) -> Optional[str]:
         """
         Extract OTP code from text
         
@@ -178,5 +494,20 @@ class OTPReader:
         :param regex: Regular expression pattern to match
         :return: Extracted code
         """
-        match = re.search(regex, text)
+        match = _compiled(regex).search(text)
         return match.group(1) if match else None
+
+
+@functools.lru_cache(maxsize=1)
+def get_shared_otp_reader() -> OTPReader:
+    """
+    Get the OTP reader shared by all extractors in this process
+    
+    Sharing it means one osascript helper serves every bank instead of
+    each extractor starting its own
+    
+    :return: Shared OTPReader instance
+    """
+    reader = OTPReader()
+    atexit.register(reader.close)
+    return reader
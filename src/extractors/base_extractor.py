@@ -5,6 +5,7 @@ Defines an abstract base class for all bank extractors.
 """
 
 import abc
+import asyncio
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import logging
@@ -34,6 +35,7 @@ class BaseExtractor(abc.ABC):
         self.config = config
         self.logger = get_logger(f"extractor.{bank_id}")
         self.mfa_handler = MFAHandler()
+        self.current_account_type = None
         
         # Common config params
         self.base_url = config.get("base_url")
@@ -85,15 +87,32 @@ class BaseExtractor(abc.ABC):
         """
         pass
     
-    def extract(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+    def extract(self, start_date: datetime, end_date: datetime, 
+                account_type: Optional[str] = None) -> List[Transaction]:
         """
         Extract transactions from the bank for the specified date range
         
         :param start_date: Beginning date for transaction extraction
         :param end_date: End date for transaction extraction
+        :param account_type: Optional account type; the extractor's default account if omitted
             
         :return: List of transaction objects
         """
+        return self.extract_accounts(start_date, end_date, [account_type])
+    
+    def extract_accounts(self, start_date: datetime, end_date: datetime, 
+                         account_types: List[Optional[str]]) -> List[Transaction]:
+        """
+        Extract transactions for several accounts in one session
+        
+        Logs in once and downloads each account in turn, so the login
+        (and any MFA challenge) is paid once rather than per account
+        
+        :param start_date: Beginning date for transaction extraction
+        :param end_date: End date for transaction extraction
+        :param account_types: Account types to extract; None for the extractor's default account
+        :return: Combined list of transaction objects
+        """
         self.logger.info(f"Extracting transactions from {self.bank_id} between {start_date.date()} and {end_date.date()}")
         
         transactions = []
@@ -105,20 +124,27 @@ class BaseExtractor(abc.ABC):
                 self.logger.error(f"Failed to login to {self.bank_id}")
                 return transactions
             
-            # Navigate to transactions page
-            nav_success = self.navigate_to_transactions()
-            if not nav_success:
-                self.logger.error(f"Failed to navigate to transactions page for {self.bank_id}")
-                self.logout()
-                return transactions
-            
-            # Download transactions
-            transactions = self.download_transactions(start_date, end_date)
-            self.logger.info(f"Downloaded {len(transactions)} transactions from {self.bank_id}")
-            
-            # Add bank identifier
-            for transaction in transactions:
-                transaction.source = self.bank_id
+            for account_type in account_types:
+                self.current_account_type = account_type
+                
+                # Navigate to transactions page
+                if account_type:
+                    nav_success = self.navigate_to_transactions(account_type)
+                else:
+                    nav_success = self.navigate_to_transactions()
+                if not nav_success:
+                    self.logger.error(f"Failed to navigate to {account_type or 'default'} transactions page for {self.bank_id}")
+                    continue
+                
+                # Download transactions
+                account_transactions = self.download_transactions(start_date, end_date)
+                self.logger.info(f"Downloaded {len(account_transactions)} {account_type or ''} transactions from {self.bank_id}")
+                
+                # Add bank identifier
+                for transaction in account_transactions:
+                    transaction.source = self.bank_id
+                
+                transactions.extend(account_transactions)
             
         except Exception as e:
             self.logger.error(f"Error extracting data from {self.bank_id}: {str(e)}", exc_info=True)
@@ -132,6 +158,41 @@ class BaseExtractor(abc.ABC):
         
         return transactions
     
+    async def extract_many(self, accounts: List[str], start_date: datetime, end_date: datetime,
+                           max_concurrency: int = 3) -> List[Transaction]:
+        """
+        Extract several accounts concurrently, each in its own session
+        
+        :param accounts: Account types to extract
+        :param start_date: Beginning date for transaction extraction
+        :param end_date: End date for transaction extraction
+        :param max_concurrency: Maximum number of accounts extracted at once
+        :return: Combined list of transaction objects
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def extract_account(account_type: str) -> List[Transaction]:
+            async with semaphore:
+                # Sessions hold per-instance state (driver, MFA), so each account gets its own extractor
+                extractor = self._spawn(account_type)
+                return await asyncio.to_thread(extractor.extract, start_date, end_date, account_type)
+        
+        results = await asyncio.gather(*[extract_account(account) for account in accounts])
+        
+        return [transaction for transactions in results for transaction in transactions]
+    
+    def _spawn(self, account_type: Optional[str] = None) -> "BaseExtractor":
+        """
+        Create a fresh extractor for the same bank and config
+        
+        Bank extractors take only their config; subclasses with a different
+        constructor should override this
+        
+        :param account_type: Account type the new extractor will extract
+        :return: New extractor instance
+        """
+        return type(self)(self.config)
+    
     def handle_unexpected_page(self, expected_element: str, timeout: int = 10) -> bool:
         """
         Handle cases where we end up on an unexpected page
@@ -9,17 +9,24 @@ extraction methods specific to Chase's online banking
 import os
 import time
 import re
-import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, TYPE_CHECKING
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 
 from src.extractors.selenium_extractor import SeleniumExtractor
 from src.models.transaction import Transaction
-from src.auth.otp_reader import OTPReader
+from src.auth.otp_reader import get_shared_otp_reader
+from src.utils.prompt import prompt_user
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Date format used in Chase CSV exports
+CSV_DATE_FORMAT = '%m/%d/%Y'
+
+# Rows converted to transactions at a time when processing exports
+CSV_CHUNK_SIZE = 10_000
 
 
 class ChaseExtractor(SeleniumExtractor):
@@ -37,12 +44,14 @@ class ChaseExtractor(SeleniumExtractor):
         :param config: Configuration dictionary for Chase
         """
         super().__init__("chase", config)
-        self.otp_reader = OTPReader()
+        self.otp_reader = get_shared_otp_reader()
         self.account_map = {
             "checking": "CHECKING",
             "savings": "SAVINGS", 
             "credit": "CREDIT_CARD"
         }
+        self._account_tiles = {}
+        self._account_tiles_url = None
     
     def login(self) -> bool:
         """
@@ -53,6 +62,10 @@ class ChaseExtractor(SeleniumExtractor):
         try:
             self.logger.info("Logging in to Chase...")
             
+            # Tiles from a previous session are no longer valid
+            self._account_tiles = {}
+            self._account_tiles_url = None
+            
             # Navigate to Chase homepage
             self.driver.get(self.base_url)
             
@@ -65,34 +78,26 @@ class ChaseExtractor(SeleniumExtractor):
                 return False
             
             # Enter creds
-            self.type_text('#userId-input-field', self.username)
-            self.type_text('#password-input-field', self.password)
-            
-            # Find and click sign-in button
-            signin_button = self.find_element('button[type="submit"]')
-            if not signin_button:
-                self.logger.error("Sign-in button not found")
-                return False
+            self.type_text(username_field, self.username, fallback_selector='#userId-input-field')
+            self.type_text(password_field, self.password, fallback_selector='#password-input-field')
             
             # Click sign in button
-            if not self.click_element(signin_button):
+            if not self.click_element('button[type="submit"]'):
                 self.logger.error("Failed to click sign-in button")
                 return False
             
-            time.sleep(3)
+            # Wait for whichever page the sign-in lands on
+            landing = self.wait_for_any([
+                '//label[contains(text(), "Remember this device")]',
+                '#otpcode_input-input-field',
+                '.account-tile'
+            ], timeout=10)
             
             # Check for "Remember this device" prompt
-            remember_device = self.find_element('//label[contains(text(), "Remember this device")]', by=By.XPATH, timeout=5)
-            if remember_device:
-                # Find checkbox and click it
-                checkbox = self.find_element('#rememberComputer')
-                if checkbox:
-                    self.click_element(checkbox)
-                
-                # Click continue button
-                continue_button = self.find_element('button[data-testid="requestIdentificationCode"]')
-                if continue_button:
-                    self.click_element(continue_button)
+            if landing is not None and landing.tag_name.lower() == 'label':
+                # Tick the checkbox and continue
+                self.click_element('#rememberComputer', timeout=5)
+                self.click_element('button[data-testid="requestIdentificationCode"]', timeout=5)
             
             # Check if we need to handle MFA
             if self.is_otp_required():
@@ -112,8 +117,6 @@ class ChaseExtractor(SeleniumExtractor):
         
         :return: Boolean indicating whether OTP is required
         """
-        time.sleep(3)
-        
         # Check for OTP indicators
         otp_indicators = [
             '#otpcode_input-input-field',
@@ -121,12 +124,7 @@ class ChaseExtractor(SeleniumExtractor):
             '//p[contains(text(), "sent you a code")]'
         ]
         
-        for indicator in otp_indicators:
-            by = By.XPATH if indicator.startswith('//') else By.CSS_SELECTOR
-            if self.find_element(indicator, by=by, timeout=5):
-                return True
-        
-        return False
+        return self.wait_for_any(otp_indicators, timeout=5) is not None
     
     def handle_otp_verification(self) -> bool:
         """
@@ -146,27 +144,22 @@ class ChaseExtractor(SeleniumExtractor):
             otp_code = self.otp_reader.get_latest_code(
                 provider="Chase",
                 timeout=60,
-                regex=r"security code: (\d{6})"
+                regex=r"security\s*code[:\s]+(\d{6})(?!\d)"
             )
             
             if not otp_code:
                 # Prompt user if automated reading fails
                 self.logger.info("Automated OTP reading failed, prompting user...")
-                otp_code = input("Please enter the Chase OTP value: ")
+                otp_code = prompt_user("Please enter the Chase OTP value: ")
             
             # Enter OTP
-            self.type_text('#otpcode_input-input-field', otp_code)
+            self.type_text(otp_field, otp_code, fallback_selector='#otpcode_input-input-field')
             
             # Click Submit button
-            submit_button = self.find_element('button[data-testid="requestIdentificationCodeSubmit"]')
-            if not submit_button:
-                self.logger.error("Submit button not found")
+            if not self.click_element('button[data-testid="requestIdentificationCodeSubmit"]'):
+                self.logger.error("Failed to click submit button")
                 return False
             
-            self.click_element(submit_button)
-
-            time.sleep(5)
-            
             return self.is_login_successful()
             
         except Exception as e:
@@ -186,11 +179,9 @@ class ChaseExtractor(SeleniumExtractor):
             '.account-tile'
         ]
         
-        for indicator in success_indicators:
-            by = By.XPATH if indicator.startswith('//') else By.CSS_SELECTOR
-            if self.find_element(indicator, by=by, timeout=10):
-                self.logger.info("Login successful")
-                return True
+        if self.wait_for_any(success_indicators, timeout=10):
+            self.logger.info("Login successful")
+            return True
         
         self.logger.error("Login unsuccessful - could not find dashboard elements")
         return False
@@ -205,26 +196,28 @@ class ChaseExtractor(SeleniumExtractor):
         try:
             self.logger.info(f"Navigating to {account_type} transactions page...")
             
-            # Wait for accounts
-            self.find_element('.account-tile', timeout=10)
+            # A previous account's download left the dashboard; go back to it
+            if self._account_tiles_url and self.driver.current_url != self._account_tiles_url:
+                self.driver.get(self._account_tiles_url)
+                self._account_tiles = {}
             
             # Click on appropriate account based on account_type
             account_name = self.account_map.get(account_type.lower(), "CHECKING")
-            account_xpath = f'//div[contains(@class, "account-tile") and contains(., "{account_name}")]'
-            
-            account_tile = self.find_element(account_xpath, by=By.XPATH)
+            account_tile = next(
+                (tile for text, tile in self._get_account_tiles().items() if account_name in text),
+                None
+            )
             if not account_tile:
                 self.logger.error(f"Account tile for {account_type} not found")
                 return False
             
             self.click_element(account_tile, by=By.XPATH)
-
-            time.sleep(5)
             
             # Click on Activity & Statements tab/link
-            activity_tab = self.find_element('//a[contains(text(), "See activity")]', by=By.XPATH)
-            if not activity_tab:
-                activity_tab = self.find_element('//a[contains(text(), "Activity & statements")]', by=By.XPATH)
+            activity_tab = self.wait_for_any([
+                '//a[contains(text(), "See activity")]',
+                '//a[contains(text(), "Activity & statements")]'
+            ])
             
             if not activity_tab:
                 self.logger.error("Activity tab not found")
@@ -232,25 +225,38 @@ class ChaseExtractor(SeleniumExtractor):
             
             self.click_element(activity_tab, by=By.XPATH)
             
-            # Wait for activity page to load
-            time.sleep(3)
-            
-            # Look for download link/button
-            download_button = self.find_element('//a[contains(text(), "Download")]', by=By.XPATH)
-            if not download_button:
-                self.logger.error("Download button not found")
+            # Click download link/button once the activity page loads
+            if not self.click_element('//a[contains(text(), "Download")]', by=By.XPATH):
+                self.logger.error("Failed to click download link")
                 return False
             
-            self.click_element(download_button, by=By.XPATH)
-
-            time.sleep(2)
-            
             return True
             
         except Exception as e:
             self.logger.error(f"Error navigating to transactions page: {str(e)}", exc_info=True)
             return False
     
+    def _get_account_tiles(self) -> Dict[str, Any]:
+        """
+        Get the account tiles on the dashboard, keyed by their upper-cased text
+        
+        Tiles are read in one pass and reused until the page URL changes
+        
+        :return: Dictionary mapping tile text to tile element
+        """
+        current_url = self.driver.current_url
+        if self._account_tiles and self._account_tiles_url == current_url:
+            return self._account_tiles
+        
+        # Wait for accounts
+        self.find_element('.account-tile', timeout=10)
+        
+        tiles = self.driver.find_elements(By.CSS_SELECTOR, '.account-tile')
+        self._account_tiles = {tile.text.upper(): tile for tile in tiles}
+        self._account_tiles_url = current_url
+        
+        return self._account_tiles
+    
     def download_transactions(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
         """
         Download transactions for the date range
@@ -261,61 +267,47 @@ class ChaseExtractor(SeleniumExtractor):
         """
         try:
             self.logger.info(f"Downloading transactions from {start_date.date()} to {end_date.date()}...")
-
-            time.sleep(2)
             
-            # Select CSV format
-            format_select = self.find_element('#download-type-select')
-            if not format_select:
+            # Select CSV format once the download dialog opens
+            if not self.click_element('#download-type-select'):
                 self.logger.error("Format selection dropdown not found")
                 return []
             
-            self.click_element(format_select)
-            
             # Select CSV option
-            csv_option = self.find_element('//option[contains(text(), "CSV")]', by=By.XPATH)
-            if not csv_option:
+            if not self.click_element('//option[contains(text(), "CSV")]', by=By.XPATH):
                 self.logger.error("CSV option not found")
                 return []
             
-            self.click_element(csv_option, by=By.XPATH)
-            
-            # Set date range
-            date_range_select = self.find_element('#date-range-select')
-            if date_range_select:
-                self.click_element(date_range_select)
-                
-                # Select custom date range
-                custom_option = self.find_element('//option[contains(text(), "Custom date")]', by=By.XPATH)
-                if custom_option:
-                    self.click_element(custom_option, by=By.XPATH)
+            # Set custom date range, if the dialog offers one
+            if self.click_element('#date-range-select', timeout=5):
+                self.click_element('//option[contains(text(), "Custom date")]', by=By.XPATH, timeout=5)
             
             # Set start date
             start_date_input = self.find_element('#start-date-input-field')
             if start_date_input:
-                self.type_text('#start-date-input-field', start_date.strftime('%m/%d/%Y'), clear_first=True)
+                self.type_text(start_date_input, start_date.strftime('%m/%d/%Y'), 
+                               clear_first=True, fallback_selector='#start-date-input-field')
             
             # Set end date
             end_date_input = self.find_element('#end-date-input-field')
             if end_date_input:
-                self.type_text('#end-date-input-field', end_date.strftime('%m/%d/%Y'), clear_first=True)
+                self.type_text(end_date_input, end_date.strftime('%m/%d/%Y'), 
+                               clear_first=True, fallback_selector='#end-date-input-field')
             
             # Click download button
-            download_button = self.find_element('button[data-testid="download-button"]')
-            if not download_button:
+            existing_downloads = self.snapshot_downloads()
+            if not self.click_element('button[data-testid="download-button"]'):
                 self.logger.error("Download button not found")
                 return []
             
-            self.click_element(download_button)
-            
             # Wait for download to complete
-            downloaded_file = self.wait_for_download(timeout=60)
+            downloaded_file = self.wait_for_download(timeout=60, existing=existing_downloads)
             if not downloaded_file:
                 self.logger.error("Download failed or timed out")
                 return []
             
             # Process downloaded file
-            return self._process_downloaded_file(downloaded_file, account_type="checking")
+            return self._process_downloaded_file(downloaded_file, account_type=self.current_account_type or "checking")
             
         except Exception as e:
             self.logger.error(f"Error downloading transactions: {str(e)}", exc_info=True)
@@ -340,32 +332,10 @@ class ChaseExtractor(SeleniumExtractor):
                 # Checking/savings transactions
                 column_names = ['transaction_date', 'post_date', 'description', 'amount', 'transaction_type', 'balance']
             
-            # Read CSV file
-            df = pd.read_csv(file_path, header=0)
-            
-            # For credit cards, amounts need sign adjustment
-            if account_type == "credit":
-                # Negative amounts for purchases (debits), positive for credits
-                df['amount'] = df['amount'].apply(lambda x: -x if "DEBIT" in str(df['transaction_type']).upper() else x)
-            
-            # Convert data types
-            df['transaction_date'] = pd.to_datetime(df['transaction_date'], errors='coerce')
-            df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-            
-            # Drop rows with invalid dates or amounts
-            df = df.dropna(subset=['transaction_date', 'amount'])
-            
-            # Create transaction objects
+            # Read CSV file in chunks so large exports never sit in one DataFrame
             transactions = []
-            for _, row in df.iterrows():
-                transaction = Transaction(
-                    date=row['transaction_date'],
-                    amount=row['amount'],
-                    description=row['description'],
-                    account_type=account_type,
-                    source='chase'
-                )
-                transactions.append(transaction)
+            for chunk in self._read_csv_chunks(file_path, column_names):
+                transactions.extend(self._chunk_to_transactions(chunk, account_type))
             
             self.logger.info(f"Processed {len(transactions)} transactions")
             return transactions
@@ -373,4 +343,87 @@ class ChaseExtractor(SeleniumExtractor):
         except Exception as e:
             self.logger.error(f"Error processing downloaded file: {str(e)}", exc_info=True)
             return []
-        
\ No newline at end of file
+    
+    def _chunk_to_transactions(self, df: "pd.DataFrame", account_type: str) -> List[Transaction]:
+        """
+        Convert one chunk of a Chase CSV export into transaction objects
+        
+        :param df: DataFrame chunk with the Chase column names
+        :param account_type: Type of account (checking, savings, credit)
+        :return: List of transaction objects
+        """
+        # pandas/numpy are only needed once a file is downloaded, so
+        # importing them here keeps them off the package import path
+        import numpy as np
+        import pandas as pd
+        
+        # Typed parsing leaves a column as object if any row is malformed,
+        # so only fall back to coercion for those chunks
+        if not pd.api.types.is_datetime64_any_dtype(df['transaction_date']):
+            df['transaction_date'] = pd.to_datetime(df['transaction_date'], format=CSV_DATE_FORMAT, errors='coerce')
+        if not pd.api.types.is_numeric_dtype(df['amount']):
+            df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+        
+        # Drop rows with invalid dates or amounts
+        df = df.dropna(subset=['transaction_date', 'amount'])
+        
+        # For credit cards, amounts need sign adjustment
+        if account_type == "credit":
+            # Negative amounts for purchases (debits), positive for credits
+            debit_mask = df['transaction_type'].astype('string').str.contains("DEBIT", case=False, na=False).to_numpy()
+            amounts = df['amount'].to_numpy()
+            df = df.assign(amount=np.where(debit_mask, -amounts, amounts))
+        
+        # Create transaction objects
+        return Transaction.from_columns(
+            df['transaction_date'].tolist(),
+            df['amount'].tolist(),
+            df['description'].tolist(),
+            account_type=account_type,
+            source='chase'
+        )
+    
+    def _read_csv_chunks(self, file_path: str, column_names: List[str]) -> Iterator["pd.DataFrame"]:
+        """
+        Read a Chase CSV export as DataFrame chunks with the given column names
+        
+        Uses pyarrow's multithreaded CSV reader when available, converting
+        its compact columnar table to pandas one batch at a time, and falls
+        back to chunked reads with the pandas parser otherwise
+        
+        :param file_path: Path to the CSV file
+        :param column_names: Names for the leading columns of the file
+        :return: Iterator of DataFrames with one column per name
+        """
+        import pandas as pd
+        
+        try:
+            import pyarrow
+            import pyarrow.csv as pv
+        except ImportError:
+            pv = None
+        
+        if pv is not None:
+            try:
+                table = pv.read_csv(
+                    file_path,
+                    convert_options=pv.ConvertOptions(timestamp_parsers=[CSV_DATE_FORMAT])
+                )
+                table = table.select(list(range(len(column_names)))).rename_columns(column_names)
+            except (pyarrow.ArrowException, IndexError) as e:
+                self.logger.debug(f"pyarrow could not parse {file_path}, using pandas: {str(e)}")
+            else:
+                for batch in table.to_batches(max_chunksize=CSV_CHUNK_SIZE):
+                    yield batch.to_pandas()
+                return
+        
+        yield from pd.read_csv(
+            file_path,
+            header=0,
+            names=column_names,
+            usecols=range(len(column_names)),
+            parse_dates=['transaction_date'],
+            date_format=CSV_DATE_FORMAT,
+            dtype={'description': 'string', 'transaction_type': 'category'},
+            chunksize=CSV_CHUNK_SIZE
+        )
@@ -5,12 +5,13 @@ Factory for creating the appropriate bank extractor
 based on the bank identifier
 """
 
+import threading
 from typing import Dict, Any, Optional
 
 from src.extractors.base_extractor import BaseExtractor
 from src.extractors.wells_fargo_extractor import WellsFargoExtractor
 from src.extractors.chase_extractor import ChaseExtractor
-from src.utils.config import ConfigManager
+from src.utils.config import get_config_manager
 
 
 class ExtractorFactory:
@@ -24,8 +25,9 @@ class ExtractorFactory:
     
     def __init__(self):
         """Initialize the extractor factory with config"""
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.extractors = {} 
+        self._lock = threading.Lock()
     
     def get_extractor(self, bank_id: str) -> BaseExtractor:
         """
@@ -35,15 +37,24 @@ class ExtractorFactory:
         :return: Instance of a BaseExtractor subclass
         :raises ValueError: If bank_id is not supported
         """
-        # Return cached extractor if exists
-        if bank_id in self.extractors:
-            return self.extractors[bank_id]
+        bank_id = bank_id.lower()
         
-        # Load bank-specific config and create extractor
-        bank_config = self.config_manager.get_bank_config(bank_id)
-        extractor = self._create_extractor(bank_id, bank_config)
+        # Return cached extractor if exists
+        extractor = self.extractors.get(bank_id)
+        if extractor is not None:
+            return extractor
         
-        self.extractors[bank_id] = extractor
+        with self._lock:
+            # Another thread may have created it while we waited
+            extractor = self.extractors.get(bank_id)
+            if extractor is not None:
+                return extractor
+            
+            # Load bank-specific config and create extractor
+            bank_config = self.config_manager.get_bank_config(bank_id)
+            extractor = self._create_extractor(bank_id, bank_config)
+            
+            self.extractors[bank_id] = extractor
         
         return extractor
     
@@ -6,10 +6,13 @@ Implements browser interaction patterns used across different bank extractors
 """
 
 import os
+import json
 import time
+import atexit
 import random
+import threading
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple, Union
+from typing import List, Optional, Dict, Any, Tuple, Union, ClassVar, Set
 from pathlib import Path
 
 from selenium import webdriver
@@ -18,18 +21,124 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.remote.command import Command
 from selenium.common.exceptions import (
     TimeoutException, 
     ElementClickInterceptedException,
     NoSuchElementException,
     StaleElementReferenceException
 )
-from webdriver_manager.chrome import ChromeDriverManager
 
 from src.extractors.base_extractor import BaseExtractor
 from src.models.transaction import Transaction
 from src.auth.captcha_solver import CaptchaSolver
 
+# Fonts, media and trackers that bank pages pull in but scraping never needs.
+# Images are left alone because CAPTCHA handling screenshots them
+DEFAULT_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*demdex.net*", "*omtrdc.net*",
+]
+
+
+# Sets input values through the native setter (so framework-controlled inputs
+# notice) and fires the events a user edit would
+_SET_INPUT_VALUES_JS = """
+const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+let count = 0;
+for (const [selector, value] of Object.entries(arguments[0])) {
+    const el = document.querySelector(selector);
+    if (!el) continue;
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    count++;
+}
+return count;
+"""
+
+# Suffixes browsers use for downloads still in progress
+PARTIAL_DOWNLOAD_SUFFIXES = ('.crdownload', '.part', '.tmp')
+
+# Seconds between polls while waiting on several candidate selectors. Shorter
+# than WebDriverWait's 0.5s default so the first hit is picked up promptly;
+# each poll is at most two combined DOM lookups
+SELECTOR_POLL_FREQUENCY = 0.2
+
+# Seconds between checks of the browser's download events
+DOWNLOAD_EVENT_POLL_INTERVAL = 0.25
+
+# Warm drivers kept between extractions, keyed by (bank_id, headless)
+_DRIVER_POOL: Dict[Tuple[str, bool], webdriver.Chrome] = {}
+_DRIVER_POOL_LOCK = threading.Lock()
+
+# Chrome profile directories held by a live driver. Chrome refuses to start
+# two browsers on one profile, so parallel sessions of a bank share it in turn
+_PROFILES_IN_USE: Dict[str, Optional[webdriver.Chrome]] = {}
+
+# Browser features that cost startup time and are never used while scraping
+DISABLED_CHROME_FEATURES = "Translate,BackForwardCache,OptimizationHints"
+
+# Element lookups slow down in long-lived WebDriver sessions, so a driver that
+# has served this many is quit rather than pooled
+DRIVER_RECYCLE_LOOKUPS = 800
+
+# WebDriver commands counted towards DRIVER_RECYCLE_LOOKUPS
+_ELEMENT_LOOKUP_COMMANDS = frozenset({
+    Command.FIND_ELEMENT,
+    Command.FIND_ELEMENTS,
+    Command.FIND_CHILD_ELEMENT,
+    Command.FIND_CHILD_ELEMENTS,
+})
+
+
+def _release_profile_dir(driver: webdriver.Chrome) -> None:
+    """
+    Free the Chrome profile directory held by a driver that has quit
+    
+    :param driver: Driver that quit
+    """
+    with _DRIVER_POOL_LOCK:
+        for profile_dir, holder in list(_PROFILES_IN_USE.items()):
+            if holder is driver:
+                del _PROFILES_IN_USE[profile_dir]
+
+
+def _count_element_lookups(driver: webdriver.Chrome) -> None:
+    """
+    Count the element lookups a driver serves over its whole life
+    
+    Every command, including lookups from elements and from the MFA and
+    CAPTCHA handlers, goes through driver.execute, so that is wrapped
+    
+    :param driver: Newly created driver
+    """
+    driver.element_lookups = 0
+    execute = driver.execute
+    
+    def counting_execute(driver_command: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if driver_command in _ELEMENT_LOOKUP_COMMANDS:
+            driver.element_lookups += 1
+        return execute(driver_command, params)
+    
+    driver.execute = counting_execute
+
+
+@atexit.register
+def _quit_pooled_drivers() -> None:
+    """Quit all pooled drivers when the process exits"""
+    with _DRIVER_POOL_LOCK:
+        drivers = list(_DRIVER_POOL.values())
+        _DRIVER_POOL.clear()
+    
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
 
 class SeleniumExtractor(BaseExtractor):
     """
@@ -51,27 +160,174 @@ class SeleniumExtractor(BaseExtractor):
         
         # Selenium-specific config
         self.headless = config.get("headless", True)
+        self.page_load_strategy = config.get("page_load_strategy", "eager")
+        self.human_typing = config.get("human_typing", False)
+        self.blocked_urls = config.get("blocked_urls", DEFAULT_BLOCKED_URLS)
+        # Off by default because CAPTCHA handling needs images rendered
+        self.disable_images = config.get("disable_images", False)
+        self.selector_cache_path = config.get("selector_cache_path", os.path.join("data", "cache", "selectors.json"))
+        self._selector_cache = self._load_selector_cache()
+        self._selector_cache_dirty = False
         self.download_dir = config.get("download_dir", os.path.join("data", "raw", bank_id))
+        self.profile_dir = config.get(
+            "chrome_profile_dir", 
+            os.path.join(os.path.dirname(os.path.abspath(self.download_dir)), ".chrome_profile", bank_id)
+        )
         self.driver = None
         self.wait = None
-        self.captcha_solver = CaptchaSolver()
+        self._download_events_enabled = False
+        self._download_names: Dict[str, str] = {}
+        self.captcha_solver = CaptchaSolver(bank_id=bank_id)
         
         # Create download dir
         os.makedirs(self.download_dir, exist_ok=True)
     
+    def _spawn(self, account_type: Optional[str] = None) -> "SeleniumExtractor":
+        """
+        Create a fresh extractor for the same bank, downloading into its own directory
+        
+        Sessions running in parallel would otherwise pick up each other's
+        files from the shared download directory. The Chrome profile is
+        still shared, taken in turn by whichever session starts first
+        
+        :param account_type: Account type the new extractor will extract
+        :return: New extractor instance
+        """
+        config = dict(self.config)
+        config["download_dir"] = os.path.join(self.download_dir, account_type or "default")
+        config["chrome_profile_dir"] = self.profile_dir
+        return type(self)(config)
+    
+    # ChromeDriverManager().install() hits the network and filesystem every call, so resolve once
+    _chromedriver_path: ClassVar[Optional[str]] = None
+    _chromedriver_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def _init_driver(self) -> None:
-        """Initialize and configure the WebDriver"""
+        """Initialize and configure the WebDriver, reusing a pooled one if available"""
+        self.driver = self._acquire_pooled_driver()
+        
+        if self.driver is None:
+            self.driver = self._create_driver()
+        else:
+            self.logger.debug("Reusing pooled Selenium WebDriver")
+        
+        self.wait = WebDriverWait(self.driver, 15)
+        
+        self._block_unneeded_requests()
+        self._enable_download_events()
+    
+    def _get_chromedriver_path(self) -> str:
+        """
+        Get the chromedriver executable path, resolving it once per process
+        
+        A 'chromedriver_path' in config skips ChromeDriverManager entirely
+        
+        :return: Path to the chromedriver executable
+        """
+        configured_path = self.config.get("chromedriver_path")
+        if configured_path:
+            return configured_path
+        
+        if SeleniumExtractor._chromedriver_path is None:
+            with SeleniumExtractor._chromedriver_lock:
+                # Parallel sessions may race here; only one resolves the path
+                if SeleniumExtractor._chromedriver_path is None:
+                    # Imported here, as it pulls in requests and is skipped with a configured path
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    
+                    SeleniumExtractor._chromedriver_path = ChromeDriverManager().install()
+        
+        return SeleniumExtractor._chromedriver_path
+    
+    def _acquire_pooled_driver(self) -> Optional[webdriver.Chrome]:
+        """
+        Take a warm driver for this bank out of the pool
+        
+        :return: Live pooled driver, or None if there isn't one
+        """
+        with _DRIVER_POOL_LOCK:
+            driver = _DRIVER_POOL.pop((self.bank_id, self.headless), None)
+        
+        if driver is None:
+            return None
+        
+        try:
+            # Make sure the browser is still alive
+            driver.current_url
+            return driver
+        except Exception:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            _release_profile_dir(driver)
+            return None
+    
+    def _release_driver(self) -> None:
+        """Reset the current driver's session state and return it to the pool"""
+        self._save_selector_cache()
+        
+        if not self.driver:
+            return
+        
+        if getattr(self.driver, "element_lookups", 0) >= DRIVER_RECYCLE_LOOKUPS:
+            self.logger.debug("WebDriver has served too many element lookups, quitting instead of pooling")
+            self._cleanup_driver()
+            return
+        
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+        except Exception as e:
+            self.logger.debug(f"Could not reset WebDriver for reuse: {str(e)}")
+            self._cleanup_driver()
+            return
+        
+        with _DRIVER_POOL_LOCK:
+            previous = _DRIVER_POOL.get((self.bank_id, self.headless))
+            if previous is None:
+                _DRIVER_POOL[(self.bank_id, self.headless)] = self.driver
+        
+        if previous is not None:
+            # Only one warm driver is kept per key
+            self._cleanup_driver()
+            return
+        
+        self.driver = None
+        self.wait = None
+    
+    def _create_driver(self) -> webdriver.Chrome:
+        """
+        Start a new Chrome WebDriver
+        
+        :return: New WebDriver instance
+        """
         self.logger.debug("Initializing Selenium WebDriver...")
         
         # Set up Chrome options
         chrome_options = Options()
         if self.headless:
-            chrome_options.add_argument("--headless")
+            chrome_options.add_argument("--headless=new")
+        
+        # Don't block commands on subresources (analytics, images) finishing
+        chrome_options.page_load_strategy = self.page_load_strategy
         
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument(f"--disable-features={DISABLED_CHROME_FEATURES}")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        
+        if self.disable_images:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        
+        # A persistent profile keeps the HTTP cache warm for the bank's static assets
+        profile_dir = self._claim_profile_dir()
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
         
         # Set up download behavior
         prefs = {
@@ -82,24 +338,191 @@ class SeleniumExtractor(BaseExtractor):
         }
         chrome_options.add_experimental_option("prefs", prefs)
         
+        # Expose page DevTools events (download progress) through the performance log
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": False, "enablePage": True})
+        
         # Initialize chrome driver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+        service = Service(self._get_chromedriver_path())
+        try:
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception:
+            if profile_dir:
+                with _DRIVER_POOL_LOCK:
+                    _PROFILES_IN_USE.pop(profile_dir, None)
+            raise
+        
+        if profile_dir:
+            with _DRIVER_POOL_LOCK:
+                _PROFILES_IN_USE[profile_dir] = driver
+        
+        _count_element_lookups(driver)
         
         self.logger.debug("Selenium WebDriver initialized successfully")
+        return driver
+    
+    def _claim_profile_dir(self) -> Optional[str]:
+        """
+        Reserve this bank's Chrome profile directory for a new driver
+        
+        :return: Profile directory, or None if another live driver is using it
+        """
+        if not self.profile_dir:
+            return None
+        
+        with _DRIVER_POOL_LOCK:
+            if self.profile_dir in _PROFILES_IN_USE:
+                self.logger.debug("Chrome profile in use by another session, starting with a temporary one")
+                return None
+            # Reserved until the driver exists and can be recorded
+            _PROFILES_IN_USE[self.profile_dir] = None
+        
+        os.makedirs(self.profile_dir, exist_ok=True)
+        return self.profile_dir
+    
+    def _block_unneeded_requests(self) -> None:
+        """Block heavy subresources through the DevTools protocol so pages become ready sooner"""
+        if not self.blocked_urls:
+            return
+        
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except Exception as e:
+            self.logger.warning(f"Could not block subresource requests: {str(e)}")
+    
+    def _enable_download_events(self) -> None:
+        """Have the browser report download progress so completion is known without watching the disk"""
+        self._download_names = {}
+        
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": os.path.abspath(self.download_dir),
+                "eventsEnabled": True
+            })
+            # Drop events left over from a previous session on a pooled driver
+            self.driver.get_log("performance")
+            self._download_events_enabled = True
+        except Exception as e:
+            self.logger.debug(f"Download events unavailable, watching the download directory: {str(e)}")
+            self._download_events_enabled = False
+    
+    def _check_download_events(self) -> Optional[Path]:
+        """
+        Check the browser's download events for a finished download
+        
+        :return: Path to the downloaded file, or None if nothing has finished
+        """
+        if not self._download_events_enabled:
+            return None
+        
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            self.logger.debug(f"Could not read download events: {str(e)}")
+            self._download_events_enabled = False
+            return None
+        
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method", "")
+            params = message.get("params", {})
+            
+            if method.endswith(".downloadWillBegin"):
+                self._download_names[params["guid"]] = params.get("suggestedFilename", "")
+            elif method.endswith(".downloadProgress") and params.get("state") == "completed":
+                name = self._download_names.pop(params.get("guid"), "")
+                path = Path(self.download_dir) / name
+                if name and path.is_file():
+                    return path
+                
+                # The browser renamed the file to avoid a clash; take the newest one
+                newest = self._newest_download()
+                if newest:
+                    return newest
+        
+        return None
+    
+    def _newest_download(self, since: float = 0, exclude: Optional[Set[int]] = None) -> Optional[Path]:
+        """
+        Find the most recently modified finished file in the download directory
+        
+        :param since: Ignore files last modified before this timestamp
+        :param exclude: Inodes of files to ignore, from snapshot_downloads
+        :return: Path to the newest file, or None if there isn't one
+        """
+        newest = None
+        newest_mtime = since
+        with os.scandir(self.download_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(PARTIAL_DOWNLOAD_SUFFIXES) or not entry.is_file():
+                    continue
+                if exclude and entry.inode() in exclude:
+                    continue
+                
+                mtime = entry.stat().st_mtime
+                if mtime >= newest_mtime:
+                    newest, newest_mtime = entry.path, mtime
+        
+        return Path(newest) if newest else None
+    
+    def _load_selector_cache(self) -> Dict[str, str]:
+        """
+        Load the last-known-good selectors saved by previous runs
+        
+        :return: Dictionary mapping selector labels to selectors
+        """
+        try:
+            with open(self.selector_cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_selector_cache(self) -> None:
+        """Persist newly learned selectors, merging with what other sessions saved"""
+        if not self._selector_cache_dirty:
+            return
+        
+        try:
+            cache = self._load_selector_cache()
+            cache.update(self._selector_cache)
+            
+            os.makedirs(os.path.dirname(self.selector_cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.selector_cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.selector_cache_path)
+            
+            self._selector_cache_dirty = False
+        except OSError as e:
+            self.logger.warning(f"Could not save selector cache: {str(e)}")
     
     def _cleanup_driver(self) -> None:
         """Clean up and quit WebDriver"""
+        self._save_selector_cache()
+        
         if self.driver:
             try:
                 self.driver.quit()
             except Exception as e:
                 self.logger.error(f"Error quitting WebDriver: {str(e)}")
             finally:
+                _release_profile_dir(self.driver)
                 self.driver = None
                 self.wait = None
     
+    def _backoff(self, attempt: int, base: float = 0.25, cap: float = 4.0) -> float:
+        """
+        Get a jittered exponential backoff delay for a retry
+        
+        :param attempt: Zero-based retry attempt
+        :param base: Delay for the first attempt in seconds
+        :param cap: Maximum delay before jitter in seconds
+        :return: Delay in seconds
+        """
+        return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+    
     def find_element(self, selector: str, by: By = By.CSS_SELECTOR, 
                     timeout: int = 15, retries: int = 3) -> Optional[webdriver.remote.webelement.WebElement]:
         """
@@ -119,7 +542,7 @@ class SeleniumExtractor(BaseExtractor):
             except TimeoutException:
                 if attempt < retries - 1:
                     self.logger.debug(f"Retrying to find element {selector} (attempt {attempt+1}/{retries})")
-                    time.sleep(random.uniform(0.5, 2.0))
+                    time.sleep(self._backoff(attempt))
                 else:
                     self.logger.error(f"Timed out waiting for element: {selector}")
                     return None
@@ -127,9 +550,71 @@ class SeleniumExtractor(BaseExtractor):
                 self.logger.error(f"Error finding element {selector}: {str(e)}")
                 return None
     
+    def find_first_selector(self, label: str, selectors: List[str], 
+                            timeout: int = 5) -> Tuple[Optional[webdriver.remote.webelement.WebElement], Optional[str]]:
+        """
+        Find the first of several candidate selectors that matches
+        
+        All candidates are waited on together, so a missing indicator costs
+        one timeout rather than one per candidate. Once anything matches, the
+        candidates are checked without waiting in priority order, with the
+        selector that worked last time for this label tried first.
+        Selectors starting with '//' are treated as XPath, others as CSS
+        
+        :param label: Stable name for what is being looked up, e.g. 'signin_link'
+        :param selectors: Candidate CSS selectors or XPath expressions, in priority order
+        :param timeout: Timeout in seconds for the whole lookup
+        :return: Tuple of the element found and the selector that matched, or (None, None)
+        """
+        key = f"{self.bank_id}.{label}"
+        cached = self._selector_cache.get(key)
+        candidates = [cached] + [s for s in selectors if s != cached] if cached in selectors else selectors
+        
+        if self.wait_for_any(candidates, timeout=timeout) is None:
+            return None, None
+        
+        for selector in candidates:
+            by = By.XPATH if selector.startswith("//") else By.CSS_SELECTOR
+            elements = self.driver.find_elements(by, selector)
+            if elements:
+                if selector != cached:
+                    self._selector_cache[key] = selector
+                    self._selector_cache_dirty = True
+                return elements[0], selector
+        
+        return None, None
+    
+    def wait_for_any(self, selectors: List[str], timeout: int = 15) -> Optional[webdriver.remote.webelement.WebElement]:
+        """
+        Wait until any one of several elements is present
+        
+        Selectors starting with '//' are treated as XPath, others as CSS.
+        Selectors of each kind are combined into a single query, so each
+        poll costs at most two DOM lookups however many selectors are given
+        
+        :param selectors: CSS selectors or XPath expressions
+        :param timeout: Timeout in seconds
+        :return: The first element found, or None on timeout
+        """
+        xpaths = [selector for selector in selectors if selector.startswith("//")]
+        css_selectors = [selector for selector in selectors if not selector.startswith("//")]
+        
+        conditions = []
+        if css_selectors:
+            conditions.append(EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(css_selectors))))
+        if xpaths:
+            conditions.append(EC.presence_of_element_located((By.XPATH, " | ".join(xpaths))))
+        
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=SELECTOR_POLL_FREQUENCY).until(
+                EC.any_of(*conditions)
+            )
+        except TimeoutException:
+            return None
+    
     def click_element(self, element_or_selector: Union[str, webdriver.remote.webelement.WebElement], 
                      by: By = By.CSS_SELECTOR, timeout: int = 15, 
-                     retry_on_intercept: bool = True) -> bool:
+                     retry_on_intercept: bool = True, retries: int = 1) -> bool:
         """
         Safely click an element
         
@@ -137,108 +622,247 @@ class SeleniumExtractor(BaseExtractor):
         :param by: Selenium By strategy if selector is provided
         :param timeout: Timeout in seconds for element to be clickable
         :param retry_on_intercept: Whether to retry if click is intercepted
+        :param retries: Number of attempts when the element times out or goes stale
         :return: Boolean indicating success or failure
         """
-        try:
-            # Get the element if selector provided
-            if isinstance(element_or_selector, str):
-                element = WebDriverWait(self.driver, timeout).until(
-                    EC.element_to_be_clickable((by, element_or_selector))
-                )
-            else:
-                element = element_or_selector
-                WebDriverWait(self.driver, timeout).until(
-                    EC.element_to_be_clickable((by, element))
-                )
-            
-            # Try regular click first
+        for attempt in range(retries):
             try:
-                element.click()
-                return True
-            except ElementClickInterceptedException:
-                if retry_on_intercept:
-                    self.logger.debug("Click intercepted, trying JavaScript click...")
-                    self.driver.execute_script("arguments[0].click();", element)
-                    return True
+                # Get the element if selector provided
+                if isinstance(element_or_selector, str):
+                    element = WebDriverWait(self.driver, timeout).until(
+                        EC.element_to_be_clickable((by, element_or_selector))
+                    )
                 else:
-                    raise
+                    element = element_or_selector
+                    WebDriverWait(self.driver, timeout).until(
+                        EC.element_to_be_clickable(element)
+                    )
+                
+                # Try regular click first
+                try:
+                    element.click()
+                    return True
+                except ElementClickInterceptedException:
+                    if retry_on_intercept:
+                        self.logger.debug("Click intercepted, trying JavaScript click...")
+                        self.driver.execute_script("arguments[0].click();", element)
+                        return True
+                    else:
+                        raise
+                
+            except TimeoutException:
+                self.logger.error(f"Timed out waiting for element to be clickable")
+            except StaleElementReferenceException:
+                self.logger.error("Element reference is stale")
+            except Exception as e:
+                self.logger.error(f"Error clicking element: {str(e)}")
+                return False
             
-        except TimeoutException:
-            self.logger.error(f"Timed out waiting for element to be clickable")
-        except StaleElementReferenceException:
-            self.logger.error("Element reference is stale")
-        except Exception as e:
-            self.logger.error(f"Error clicking element: {str(e)}")
+            if attempt < retries - 1:
+                time.sleep(self._backoff(attempt))
         
         return False
     
-    def type_text(self, selector: str, text: str, by: By = By.CSS_SELECTOR, 
-                 clear_first: bool = True, timeout: int = 15) -> bool:
+    def type_text(self, element_or_selector: Union[str, webdriver.remote.webelement.WebElement], 
+                 text: str, by: By = By.CSS_SELECTOR, clear_first: bool = True, 
+                 timeout: int = 15, retries: int = 1, fallback_selector: Optional[str] = None) -> bool:
         """
         Type text into an input field
         
-        :param selector: CSS selector or XPath expression
+        Passing an element that was already found skips looking it up again
+        
+        :param element_or_selector: Either a WebElement or a CSS selector/XPath expression
         :param text: Text to type
         :param by: Selenium By strategy
         :param clear_first: Whether to clear the field first
         :param timeout: Timeout in seconds
+        :param retries: Number of attempts when the field times out
+        :param fallback_selector: Selector to find the field again if the given element has gone stale
         :return: Boolean indicating success or failure
         """
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, selector))
-            )
-            
-            if clear_first:
-                element.clear()
-            
-            for char in text:
-                element.send_keys(char)
-                time.sleep(random.uniform(0.01, 0.1)) 
-            
-            return True
+        target = element_or_selector
+        attempt = 0
+        while attempt < retries:
+            try:
+                if isinstance(target, str):
+                    element = WebDriverWait(self.driver, timeout).until(
+                        EC.presence_of_element_located((by, target))
+                    )
+                else:
+                    element = target
+                
+                if clear_first:
+                    element.clear()
+                
+                if self.human_typing:
+                    # A few chunks with short pauses instead of one command per key
+                    chunk_size = max(1, -(-len(text) // 3))
+                    for i in range(0, len(text), chunk_size):
+                        if i:
+                            time.sleep(random.uniform(0.05, 0.2))
+                        element.send_keys(text[i:i + chunk_size])
+                else:
+                    element.send_keys(text)
+                
+                return True
+                
+            except StaleElementReferenceException:
+                if isinstance(target, str) or not fallback_selector:
+                    self.logger.error("Input field reference is stale")
+                    return False
+                
+                # The page re-rendered the field; find it again without using up an attempt
+                self.logger.debug(f"Input field went stale, finding it again: {fallback_selector}")
+                target = fallback_selector
+                continue
+            except TimeoutException:
+                self.logger.error(f"Timed out waiting for input field: {target}")
+            except Exception as e:
+                self.logger.error(f"Error typing text: {str(e)}")
+                return False
             
-        except TimeoutException:
-            self.logger.error(f"Timed out waiting for input field: {selector}")
-        except Exception as e:
-            self.logger.error(f"Error typing text: {str(e)}")
+            attempt += 1
+            if attempt < retries:
+                time.sleep(self._backoff(attempt - 1))
         
         return False
     
-    def wait_for_download(self, timeout: int = 60, check_interval: float = 1.0) -> Optional[Path]:
+    def set_input_values(self, values: Dict[str, str]) -> bool:
+        """
+        Set several input fields in a single script call, without typing
+        
+        :param values: Dictionary mapping CSS selectors to the values to set
+        :return: Boolean indicating whether every field was found and set
+        """
+        try:
+            count = self.driver.execute_script(_SET_INPUT_VALUES_JS, values)
+            return count == len(values)
+        except Exception as e:
+            self.logger.error(f"Error setting input values: {str(e)}")
+            return False
+    
+    def snapshot_downloads(self) -> Set[int]:
+        """
+        Record the files already in the download directory
+        
+        Take this before triggering a download and pass it to
+        wait_for_download, so a file that finishes before the wait starts
+        is still found and earlier downloads are never mistaken for it.
+        Entries are recorded by inode: a finished download keeps the inode
+        of its partial file when the browser renames it
+        
+        :return: Inodes of the current entries
+        """
+        with os.scandir(self.download_dir) as entries:
+            return {entry.inode() for entry in entries}
+    
+    def wait_for_download(self, timeout: int = 60, check_interval: float = 1.0, 
+                          existing: Optional[Set[int]] = None) -> Optional[Path]:
         """
         Wait for a file to be downloaded and return path
         
+        Download events reported by the browser are checked alongside
+        filesystem events when watchdog is installed, or alongside polling
+        the download directory otherwise
+        
         :param timeout: Maximum time to wait in seconds
-        :param check_interval: How often to check for new files
+        :param check_interval: How often to check for new files when polling
+        :param existing: Snapshot from snapshot_downloads taken before the download was triggered
         :return: Path to the downloaded file
         """
         self.logger.debug(f"Waiting for download in {self.download_dir}...")
         
-        # Get initial files
-        before = set(Path(self.download_dir).glob("*"))
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return self._poll_for_download(timeout, check_interval, existing)
+        
+        completed = threading.Event()
+        downloaded = []
+        
+        class DownloadHandler(FileSystemEventHandler):
+            def _check(self, path: str) -> None:
+                if not path.endswith(PARTIAL_DOWNLOAD_SUFFIXES):
+                    downloaded.append(Path(path))
+                    completed.set()
+            
+            def on_created(self, event):
+                if not event.is_directory:
+                    self._check(event.src_path)
+            
+            def on_moved(self, event):
+                # Chrome renames the partial file once the download finishes
+                if not event.is_directory:
+                    self._check(event.dest_path)
+        
+        observer = Observer()
+        observer.schedule(DownloadHandler(), self.download_dir, recursive=False)
+        observer.start()
+        try:
+            # A small file may have finished before the watcher started
+            if existing is not None:
+                newest = self._newest_download(exclude=existing)
+                if newest:
+                    downloaded.append(newest)
+                    completed.set()
+            
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                if completed.wait(DOWNLOAD_EVENT_POLL_INTERVAL):
+                    self.logger.debug(f"Download completed: {downloaded[0]}")
+                    return downloaded[0]
+                
+                path = self._check_download_events()
+                if path:
+                    self.logger.debug(f"Download completed: {path}")
+                    return path
+        finally:
+            observer.stop()
+            observer.join()
+        
+        self.logger.error(f"Download timed out after {timeout} seconds")
+        return None
+    
+    def _poll_for_download(self, timeout: int, check_interval: float, 
+                           existing: Optional[Set[int]] = None) -> Optional[Path]:
+        """
+        Wait for a download by polling the download directory
+        
+        :param timeout: Maximum time to wait in seconds
+        :param check_interval: How often to check for new files
+        :param existing: Snapshot from snapshot_downloads taken before the download was triggered
+        :return: Path to the downloaded file
+        """
+        before = self.snapshot_downloads() if existing is None else existing
         
         # Wait for file to appear
         start_time = time.time()
+        last_scan = start_time
         while time.time() - start_time < timeout:
-            time.sleep(check_interval)
+            time.sleep(DOWNLOAD_EVENT_POLL_INTERVAL if self._download_events_enabled else check_interval)
+            
+            path = self._check_download_events()
+            if path:
+                self.logger.debug(f"Download completed: {path}")
+                return path
+            
+            if time.time() - last_scan < check_interval:
+                continue
+            last_scan = time.time()
             
             # Get current files
-            after = set(Path(self.download_dir).glob("*"))
-            new_files = after - before
+            with os.scandir(self.download_dir) as entries:
+                new_entries = [entry for entry in entries if entry.inode() not in before]
             
             # Check for .crdownload or similar partial files
-            partial_downloads = [f for f in new_files if f.name.endswith('.crdownload') or 
-                                 f.name.endswith('.part') or f.name.endswith('.tmp')]
-            
-            if partial_downloads:
+            if any(entry.name.endswith(PARTIAL_DOWNLOAD_SUFFIXES) for entry in new_entries):
                 self.logger.debug("Download in progress...")
                 continue
                 
             # Look for actual completed downloads
-            completed_downloads = [f for f in new_files if f not in partial_downloads]
-            if completed_downloads:
-                newest_file = max(completed_downloads, key=lambda f: f.stat().st_mtime)
+            if new_entries:
+                newest_file = Path(max(new_entries, key=lambda entry: entry.stat().st_mtime).path)
                 self.logger.debug(f"Download completed: {newest_file}")
                 return newest_file
         
@@ -311,16 +935,14 @@ class SeleniumExtractor(BaseExtractor):
                 "//a[contains(text(), 'Log Out')]", "//a[contains(text(), 'Sign Out')]"
             ]
             
-            # Try each selector
-            for selector in logout_selectors:
-                by = By.XPATH if selector.startswith("//") else By.CSS_SELECTOR
-                logout_element = self.find_element(selector, by=by, timeout=5)
-                
-                if logout_element:
-                    self.click_element(logout_element, by=by)
-                    time.sleep(2) 
-                    self.logger.debug("Logout successful")
-                    return True
+            # Wait on all selectors at once
+            logout_element, _ = self.find_first_selector('logout', logout_selectors, timeout=5)
+            
+            if logout_element:
+                self.click_element(logout_element)
+                time.sleep(2) 
+                self.logger.debug("Logout successful")
+                return True
             
             self.logger.warning("Could not find logout button, closing browser instead")
             return False
@@ -329,16 +951,20 @@ class SeleniumExtractor(BaseExtractor):
             self.logger.error(f"Error during logout: {str(e)}")
             return False
         finally:
-            self._cleanup_driver()
+            # Keep the browser warm for the next extraction
+            self._release_driver()
     
-    def extract(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+    def extract_accounts(self, start_date: datetime, end_date: datetime, 
+                         account_types: List[Optional[str]]) -> List[Transaction]:
         """
-        Implementation of the extract method from BaseExtractor that initializes
-        the Selenium driver before extraction.
+        Implementation of the extract_accounts method from BaseExtractor that
+        initializes the Selenium driver before extraction.
         """
         try:
-            # Initialize web driver and call parent extract
+            # Initialize web driver and call parent extract_accounts
             self._init_driver()
-            return super().extract(start_date, end_date)
+            return super().extract_accounts(start_date, end_date, account_types)
         finally:
+            # Logout returns the driver to the pool; anything left over
+            # is in an unknown state, so quit it
             self._cleanup_driver()
@@ -6,20 +6,44 @@ Handles navigation patterns, authentication flows, and data
 extraction specific to Wells Fargo's online banking.
 """
 
+import io
 import os
-import time
 import re
-import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Union, BinaryIO
 
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 from src.extractors.selenium_extractor import SeleniumExtractor
 from src.models.transaction import Transaction
-from src.auth.otp_reader import OTPReader
+from src.auth.otp_reader import get_shared_otp_reader
+from src.utils.prompt import prompt_user
+
+# Date format used in Wells Fargo CSV exports
+CSV_DATE_FORMAT = '%m/%d/%Y'
+
+# Seconds to wait for a confirmation dialog after clicking download
+CONFIRM_DIALOG_TIMEOUT = 3
+
+# Card payments that show up in the export but aren't spending
+PAYMENT_DESCRIPTION_PATTERN = r'ONLINE PAYMENT THANK YOU|AUTOMATIC PAYMENT - THANK YOU'
+
+# Reads the download form's target and its current field values, as the
+# browser would submit them
+_DOWNLOAD_FORM_JS = """
+const field = document.querySelector('#fromDate');
+const form = field && field.form;
+if (!form || !form.action) return null;
+return {
+    action: form.action,
+    method: (form.method || 'post').toUpperCase(),
+    fields: Array.from(new FormData(form).entries()).filter(e => typeof e[1] === 'string')
+};
+"""
 
 
 class WellsFargoExtractor(SeleniumExtractor):
@@ -37,7 +61,7 @@ class WellsFargoExtractor(SeleniumExtractor):
         :param config: Configuration dictionary for Wells Fargo
         """
         super().__init__("wells_fargo", config)
-        self.otp_reader = OTPReader()
+        self.otp_reader = get_shared_otp_reader()
         self.account_map = {
             "checking": "DDA",
             "savings": "SDA", 
@@ -64,16 +88,9 @@ class WellsFargoExtractor(SeleniumExtractor):
                 '//a[contains(text(), "Sign On")]'
             ]
             
-            signin_clicked = False
-            for selector in signin_selectors:
-                by = By.XPATH if selector.startswith('//') else By.CSS_SELECTOR
-                signin_element = self.find_element(selector, by=by, timeout=5)
-                if signin_element:
-                    signin_clicked = self.click_element(signin_element, by=by)
-                    if signin_clicked:
-                        break
+            signin_element, _ = self.find_first_selector('signin_link', signin_selectors, timeout=10)
             
-            if not signin_clicked:
+            if not signin_element or not self.click_element(signin_element):
                 self.logger.error("Could not find sign-on link")
                 return False
             
@@ -86,8 +103,8 @@ class WellsFargoExtractor(SeleniumExtractor):
                 return False
             
             # Enter creds
-            self.type_text('#j_username', self.username)
-            self.type_text('#j_password', self.password)
+            self.type_text(username_field, self.username, fallback_selector='#j_username')
+            self.type_text(password_field, self.password, fallback_selector='#j_password')
             
             # Find and click sign-on button
             signin_button = self.find_element('[data-testid="signon-button"]')
@@ -96,14 +113,7 @@ class WellsFargoExtractor(SeleniumExtractor):
                 return False
             
             # Click sign on button with retry
-            signin_success = False
-            for _ in range(2):  # Try up to 2 times
-                if self.click_element(signin_button):
-                    signin_success = True
-                    break
-                time.sleep(1)
-            
-            if not signin_success:
+            if not self.click_element(signin_button, retries=2):
                 self.logger.error("Failed to click sign-on button")
                 return False
             
@@ -125,9 +135,6 @@ class WellsFargoExtractor(SeleniumExtractor):
         
         :return: Boolean indicating whether OTP is required
         """
-        # Wait for OTP page to load
-        time.sleep(3)
-        
         # Check for OTP indicators
         otp_indicators = [
             'li.LineItemLinkList__lineItemLinkListItem___HHmyb button.Button__button___Jo8E3',
@@ -136,12 +143,7 @@ class WellsFargoExtractor(SeleniumExtractor):
             '//div[contains(text(), "verification code")]'
         ]
         
-        for indicator in otp_indicators:
-            by = By.XPATH if indicator.startswith('//') else By.CSS_SELECTOR
-            if self.find_element(indicator, by=by, timeout=5):
-                return True
-        
-        return False
+        return self.wait_for_any(otp_indicators, timeout=8) is not None
     
     def handle_otp_verification(self) -> bool:
         """
@@ -166,16 +168,16 @@ class WellsFargoExtractor(SeleniumExtractor):
             otp_code = self.otp_reader.get_latest_code(
                 provider="Wells Fargo",
                 timeout=60,
-                regex=r"verification code: (\d{6})"
+                regex=r"verification\s*code[:\s]+(\d{6})(?!\d)"
             )
             
             if not otp_code:
                 # If automated reading fails, prompt user
                 self.logger.info("Automated OTP reading failed, prompting user...")
-                otp_code = input("Please enter the Wells Fargo OTP value: ")
+                otp_code = prompt_user("Please enter the Wells Fargo OTP value: ")
             
             # Enter OTP
-            self.type_text('#otp', otp_code)
+            self.type_text(otp_field, otp_code, fallback_selector='#otp')
             
             # Click Continue button
             continue_button = self.find_element('//button[span[text()="Continue"]]', by=By.XPATH)
@@ -185,9 +187,7 @@ class WellsFargoExtractor(SeleniumExtractor):
             
             self.click_element(continue_button, by=By.XPATH)
             
-            # Wait for dashboard to load
-            time.sleep(5)
-            
+            # Waits for the dashboard to load
             return self.is_login_successful()
             
         except Exception as e:
@@ -207,11 +207,9 @@ class WellsFargoExtractor(SeleniumExtractor):
             '[data-testid="account-group-DDA"]' 
         ]
         
-        for indicator in success_indicators:
-            by = By.XPATH if indicator.startswith('//') else By.CSS_SELECTOR
-            if self.find_element(indicator, by=by, timeout=10):
-                self.logger.info("Login successful")
-                return True
+        if self.wait_for_any(success_indicators, timeout=10):
+            self.logger.info("Login successful")
+            return True
         
         self.logger.error("Login unsuccessful - could not find dashboard elements")
         return False
@@ -231,10 +229,7 @@ class WellsFargoExtractor(SeleniumExtractor):
             if accounts_element:
                 self.click_element(accounts_element, by=By.XPATH)
             
-            # Wait for page to load
-            time.sleep(3)
-            
-            # Look for "Download Account Activity" link
+            # Look for "Download Account Activity" link once the page loads
             download_link = self.find_element('//*[text()="Download Account Activity"]', by=By.XPATH)
             if not download_link:
                 self.logger.error("Download Account Activity link not found")
@@ -257,7 +252,12 @@ class WellsFargoExtractor(SeleniumExtractor):
                 account_option = self.find_element(f'option[value*="{account_code}"]')
                 if account_option:
                     self.click_element(account_option)
-                    time.sleep(2)  # Wait for selection
+                    
+                    # Wait for selection
+                    try:
+                        WebDriverWait(self.driver, 5).until(EC.element_to_be_selected(account_option))
+                    except TimeoutException:
+                        self.logger.warning(f"Account option {account_code} was not selected")
             
             return True
             
@@ -265,14 +265,18 @@ class WellsFargoExtractor(SeleniumExtractor):
             self.logger.error(f"Error navigating to transactions page: {str(e)}", exc_info=True)
             return False
     
-    def download_transactions(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+    def download_transactions(self, start_date: datetime, end_date: datetime, 
+                              account_type: Optional[str] = None) -> List[Transaction]:
         """
         Download transactions for date range
         
         :param start_date: Beginning date for transaction extraction
         :param end_date: End date for transaction extraction
+        :param account_type: Account type being downloaded; defaults to the current session's
         :return: List of transaction objects
         """
+        account_type = account_type or self.current_account_type or "checking"
+        
         try:
             self.logger.info(f"Downloading transactions from {start_date.date()} to {end_date.date()}...")
             
@@ -288,11 +292,10 @@ class WellsFargoExtractor(SeleniumExtractor):
                 self.logger.error("Date fields not found")
                 return []
             
-            # Clear and enter start and end date
-            self.driver.execute_script('document.querySelector("#fromDate").value = ""')
-            self.type_text('#fromDate', start_date_str)
-            self.driver.execute_script('document.querySelector("#toDate").value = ""')
-            self.type_text('#toDate', end_date_str)
+            # Replace start and end date
+            if not self.set_input_values({'#fromDate': start_date_str, '#toDate': end_date_str}):
+                self.logger.error("Could not set date fields")
+                return []
             
             # Select CSV format
             csv_radio = self.find_element('[data-testid="radio-fileFormat-commaDelimited"]')
@@ -302,77 +305,149 @@ class WellsFargoExtractor(SeleniumExtractor):
             
             self.click_element(csv_radio)
             
+            # Fetch the CSV directly over HTTP when possible
+            transactions = self._download_via_session(account_type)
+            if transactions is not None:
+                return transactions
+            
             # Click download button
             download_button = self.find_element('[data-testid="download-button"]')
             if not download_button:
                 self.logger.error("Download button not found")
                 return []
             
+            existing_downloads = self.snapshot_downloads()
             self.click_element(download_button)
             
-            # Handle confirmation dialogs
+            # Accept a JavaScript confirmation, if the site shows one. The
+            # browser's own download prompt is already disabled through
+            # Browser.setDownloadBehavior when the driver is set up
             try:
-                # Wait a bit for dialog
-                time.sleep(3)
-                
-                # Handle dialog (may be needed multiple times)
-                for _ in range(3):
-                    self.driver.switch_to.active_element.send_keys('\n')
-                    time.sleep(1)
-                
+                WebDriverWait(self.driver, CONFIRM_DIALOG_TIMEOUT).until(EC.alert_is_present()).accept()
+            except TimeoutException:
+                pass
             except Exception as e:
                 self.logger.debug(f"Exception while handling confirmation: {str(e)}")
             
             # Wait for download to complete
-            downloaded_file = self.wait_for_download(timeout=60)
+            downloaded_file = self.wait_for_download(timeout=60, existing=existing_downloads)
             if not downloaded_file:
                 self.logger.error("Download failed or timed out")
                 return []
             
             # Process downloaded file
-            return self._process_downloaded_file(downloaded_file, account_type="checking")
+            return self._process_downloaded_file(downloaded_file, account_type=account_type)
             
         except Exception as e:
             self.logger.error(f"Error downloading transactions: {str(e)}", exc_info=True)
             return []
     
-    def _process_downloaded_file(self, file_path: str, account_type: str) -> List[Transaction]:
+    def _download_via_session(self, account_type: str) -> Optional[List[Transaction]]:
+        """
+        Submit the filled-in download form with the browser's cookies over HTTP
+        
+        Skips the download click, confirmation dialogs and file polling
+        
+        :param account_type: Type of account (checking, savings, credit)
+        :return: List of transaction objects, or None to fall back to the browser download
+        """
+        # Only this download path uses requests, so it stays off the extractor's import path
+        import requests
+        
+        try:
+            form = self.driver.execute_script(_DOWNLOAD_FORM_JS)
+            if not form:
+                self.logger.debug("Download form not found, using browser download")
+                return None
+            
+            with requests.Session() as session:
+                for cookie in self.driver.get_cookies():
+                    session.cookies.set(cookie['name'], cookie['value'], 
+                                        domain=cookie.get('domain'), path=cookie.get('path', '/'))
+                
+                session.headers.update({
+                    'User-Agent': self.driver.execute_script('return navigator.userAgent'),
+                    'Referer': self.driver.current_url
+                })
+                
+                # Stream the body straight into the CSV parser
+                with session.request(form['method'], form['action'], data=form['fields'], 
+                                     timeout=30, stream=True) as response:
+                    content_type = response.headers.get('Content-Type', '')
+                    if response.status_code != 200 or 'html' in content_type:
+                        self.logger.debug(f"Direct download returned {response.status_code} ({content_type}), using browser download")
+                        return None
+                    
+                    response.raw.decode_content = True
+                    transactions = self._process_downloaded_file(response.raw, account_type=account_type)
+            
+            # An unparseable response looks the same as an empty one, so let the browser confirm
+            return transactions or None
+            
+        except Exception as e:
+            self.logger.debug(f"Direct download failed, using browser download: {str(e)}")
+            return None
+    
+    def _process_downloaded_file(self, source: Union[str, Path, bytes, BinaryIO], account_type: str) -> List[Transaction]:
         """
         Process the downloaded CSV file into Transaction objects
         
-        :param file_path: Path to the downloaded file
+        :param source: Path to the downloaded file, its bytes, or a binary file-like object
         :param account_type: Type of account (checking, savings, credit)
         :return: List of transaction objects
         """
+        import pandas as pd
+        
         try:
-            self.logger.info(f"Processing downloaded file: {file_path}")
+            self.logger.info(f"Processing downloaded file: {source if isinstance(source, (str, Path)) else 'HTTP response'}")
             
-            column_names = ['date', 'amount', 'unused1', 'unused2', 'description']
+            if isinstance(source, bytes):
+                source = io.BytesIO(source)
             
-            # Read CSV file
-            df = pd.read_csv(file_path, header=None, names=column_names)
+            # Columns 2 and 3 of the export are unused
+            column_names = ['date', 'amount', 'description']
+            
+            # Read CSV file, with Arrow-backed strings when pyarrow is available
+            # so the description filter runs as a vectorized Arrow kernel
+            try:
+                import pyarrow
+                read_options = {'dtype_backend': 'pyarrow'}
+            except ImportError:
+                read_options = {}
+            
+            df = pd.read_csv(
+                source,
+                header=None,
+                names=column_names,
+                usecols=[0, 1, 4],
+                parse_dates=['date'],
+                date_format=CSV_DATE_FORMAT,
+                **read_options
+            )
             
             # Filter out header rows and irrelevant transactions
-            df = df[~df['description'].str.contains('ONLINE PAYMENT THANK YOU|AUTOMATIC PAYMENT - THANK YOU', na=False)]
+            df = df[~df['description'].str.contains(PAYMENT_DESCRIPTION_PATTERN, na=False)]
             
-            # Convert data types
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
+            # Typed parsing leaves a column as object if any row is malformed,
+            # so only fall back to coercion for those files
+            if not pd.api.types.is_datetime64_any_dtype(df['date']):
+                df['date'] = pd.to_datetime(df['date'], format=CSV_DATE_FORMAT, errors='coerce')
+            if not pd.api.types.is_numeric_dtype(df['amount']):
+                # Arrow-backed columns keep an unparseable amount as a NaN value
+                # rather than a null, so convert to NumPy floats for dropna
+                df['amount'] = pd.to_numeric(df['amount'], errors='coerce').astype('float64')
             
             # Drop rows with invalid dates / amounts
             df = df.dropna(subset=['date', 'amount'])
             
             # Create transaction objects
-            transactions = []
-            for _, row in df.iterrows():
-                transaction = Transaction(
-                    date=row['date'],
-                    amount=row['amount'],
-                    description=row['description'],
-                    account_type=account_type,
-                    source='wells_fargo'
-                )
-                transactions.append(transaction)
+            transactions = Transaction.from_columns(
+                df['date'].tolist(),
+                df['amount'].tolist(),
+                df['description'].tolist(),
+                account_type=account_type,
+                source='wells_fargo'
+            )
             
             self.logger.info(f"Processed {len(transactions)} transactions")
             return transactions
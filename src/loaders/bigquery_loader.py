@@ -6,21 +6,111 @@ for storage and analysis. Handles schema management,
 incremental loading, and data type conversions
 """
 
+import io
 import os
-import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Union
-import pandas as pd
-from pandas import DataFrame
+import functools
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Union, ClassVar, Tuple, Iterable
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 
 from src.models.transaction import Transaction
-from src.utils.config import ConfigManager
+from src.utils.config import get_config_manager
 from src.utils.logger import get_logger
 
 
+# Column types of loaded transactions, in load order
+TRANSACTION_ARROW_SCHEMA = pa.schema([
+    ('transaction_id', pa.string()),
+    ('date', pa.timestamp('us')),
+    ('amount', pa.float64()),
+    ('description', pa.string()),
+    ('source', pa.string()),
+    ('account_type', pa.string()),
+    ('category', pa.string()),
+    ('subcategory', pa.string()),
+    ('is_recurring', pa.bool_()),
+    ('is_transfer', pa.bool_()),
+    ('is_income', pa.bool_()),
+    ('is_reimbursable', pa.bool_()),
+    ('is_ignored', pa.bool_()),
+    ('metadata', pa.string()),
+])
+
+
+# BigQuery column definitions of the transaction fields, in table order
+CORE_SCHEMA_FIELDS = {
+    'transaction_id': bigquery.SchemaField('transaction_id', 'STRING', mode='REQUIRED'),
+    'date': bigquery.SchemaField('date', 'TIMESTAMP', mode='REQUIRED'),
+    'amount': bigquery.SchemaField('amount', 'FLOAT', mode='REQUIRED'),
+    'description': bigquery.SchemaField('description', 'STRING', mode='REQUIRED'),
+    'source': bigquery.SchemaField('source', 'STRING', mode='REQUIRED'),
+    'account_type': bigquery.SchemaField('account_type', 'STRING', mode='REQUIRED'),
+    'category': bigquery.SchemaField('category', 'STRING', mode='NULLABLE'),
+    'subcategory': bigquery.SchemaField('subcategory', 'STRING', mode='NULLABLE'),
+    'is_recurring': bigquery.SchemaField('is_recurring', 'BOOLEAN', mode='NULLABLE'),
+    'is_transfer': bigquery.SchemaField('is_transfer', 'BOOLEAN', mode='NULLABLE'),
+    'is_income': bigquery.SchemaField('is_income', 'BOOLEAN', mode='NULLABLE'),
+    'is_reimbursable': bigquery.SchemaField('is_reimbursable', 'BOOLEAN', mode='NULLABLE'),
+    'is_ignored': bigquery.SchemaField('is_ignored', 'BOOLEAN', mode='NULLABLE'),
+    'metadata': bigquery.SchemaField('metadata', 'STRING', mode='NULLABLE')
+}
+
+# BigQuery schema of TRANSACTION_ARROW_SCHEMA, built once at import
+TRANSACTION_BQ_SCHEMA = [CORE_SCHEMA_FIELDS[name] for name in TRANSACTION_ARROW_SCHEMA.names]
+
+# BigQuery types for any extra Arrow columns; unlisted types load as STRING
+ARROW_TO_BIGQUERY_TYPES = {
+    'int64': 'INTEGER',
+    'double': 'FLOAT',
+    'bool': 'BOOLEAN',
+    'timestamp[us]': 'TIMESTAMP',
+    'string': 'STRING'
+}
+
+# Clustering of the transactions table; transaction_id first so the MERGE on it
+# reads only the blocks that can hold a staged ID
+TRANSACTION_CLUSTERING_FIELDS = ["transaction_id", "source", "account_type"]
+
+# Rows per staging load job, and how many of those jobs run at once
+LOAD_CHUNK_ROWS = 50_000
+MAX_CONCURRENT_LOAD_JOBS = 4
+
+# Batches up to this many rows are staged through the Storage Write API,
+# which has no load-job quota, when google-cloud-bigquery-storage is installed
+STORAGE_WRITE_MAX_ROWS = 1_000_000
+
+# Rows per Storage Write append request; keeps requests well under the 10MB cap
+STORAGE_WRITE_BATCH_ROWS = 10_000
+
+# Staging tables expire on their own if a load dies before dropping them
+STAGING_TABLE_EXPIRATION = timedelta(hours=1)
+
+# Seconds a looked-up latest transaction date is reused within the process
+LATEST_DATE_CACHE_TTL = 300
+
+# Latest transaction date per table, with the time it was looked up
+_LATEST_DATE_CACHE: Dict[str, Tuple[float, Optional[datetime]]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_client(project_id: Optional[str]) -> bigquery.Client:
+    """
+    Get the BigQuery client for a project, shared by all loaders
+    
+    :param project_id: Google Cloud project ID
+    :return: BigQuery client
+    """
+    return bigquery.Client(project=project_id)
+
+
 class BigQueryLoader:
     """
     Class for loading transaction data into BigQuery
@@ -33,22 +123,31 @@ class BigQueryLoader:
     def __init__(self):
         """Initialize BigQuery loader"""
         self.logger = get_logger("bigquery_loader")
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         
         # Load BigQuery config
         config = self.config_manager.get_bigquery_config()
         self.project_id = config.get("project_id")
         self.dataset_id = config.get("dataset_id")
         self.transactions_table = config.get("transactions_table", "transactions")
+        self.storage_write_max_rows = config.get("storage_write_max_rows", STORAGE_WRITE_MAX_ROWS)
         self.client = None
+        self._write_client = None
+        
+        # Metadata checked once per loader rather than on every load
+        self._dataset_checked = False
+        self._table: Optional[bigquery.Table] = None
         
         # Initialize client
         self._init_client()
     
+    # Protobuf message class for Storage Write rows, built once from TRANSACTION_ARROW_SCHEMA
+    _storage_row_class: ClassVar[Optional[type]] = None
+    
     def _init_client(self) -> None:
         """Initialize the BigQuery client"""
         try:
-            self.client = bigquery.Client(project=self.project_id)
+            self.client = _shared_client(self.project_id)
             self.logger.info(f"Initialized BigQuery client for project {self.project_id}")
         except Exception as e:
             self.logger.error(f"Error initializing BigQuery client: {str(e)}")
@@ -58,21 +157,47 @@ class BigQueryLoader:
         """
         Get the latest transaction date from BigQuery
         
+        The newest non-empty partition is found from partition metadata, so
+        only that partition onwards is scanned for the exact timestamp. Rows
+        still in the write buffer are not in any dated partition yet, so the
+        whole table is scanned when there are any
+        
         :return: The latest transaction date
         """
+        table_ref = f"{self.project_id}.{self.dataset_id}.{self.transactions_table}"
+        
+        cached = _LATEST_DATE_CACHE.get(table_ref)
+        if cached and time.monotonic() - cached[0] < LATEST_DATE_CACHE_TTL:
+            return cached[1]
+        
         try:
+            partition_start = self._get_latest_partition_start()
+            
             query = f"""
                 SELECT MAX(date) as max_date
-                FROM `{self.project_id}.{self.dataset_id}.{self.transactions_table}`
+                FROM `{table_ref}`
             """
+            job_config = None
+            
+            if partition_start:
+                # Prune the scan to the newest daily partition and anything after it
+                query += " WHERE date >= @partition_start"
+                job_config = bigquery.QueryJobConfig(
+                    query_parameters=[
+                        bigquery.ScalarQueryParameter("partition_start", "TIMESTAMP", partition_start)
+                    ]
+                )
 
-            query_job = self.client.query(query)
+            query_job = self.client.query(query, job_config=job_config)
             results = query_job.result()
             
+            latest_date = None
             for row in results:
-                return row.max_date
-
-            return None
+                latest_date = row.max_date
+                break
+            
+            _LATEST_DATE_CACHE[table_ref] = (time.monotonic(), latest_date)
+            return latest_date
             
         except NotFound:
             # Table doesn't exist yet
@@ -82,90 +207,164 @@ class BigQueryLoader:
             self.logger.error(f"Error getting latest transaction date: {str(e)}")
             return None
     
-    def load(self, transactions: List[Transaction]) -> bool:
+    def _get_latest_partition_start(self) -> Optional[datetime]:
+        """
+        Get the start of the newest non-empty daily partition
+        
+        :return: Start of the partition, or None when the whole table must be scanned
+        """
+        partition_query = f"""
+            SELECT
+              MAX(IF(partition_id NOT IN ('__NULL__', '__UNPARTITIONED__'), partition_id, NULL)) AS partition_id,
+              COUNTIF(partition_id = '__UNPARTITIONED__') > 0 AS has_unpartitioned
+            FROM `{self.project_id}.{self.dataset_id}.INFORMATION_SCHEMA.PARTITIONS`
+            WHERE table_name = @table_name
+              AND total_rows > 0
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("table_name", "STRING", self.transactions_table)
+            ]
+        )
+        
+        try:
+            row = next(iter(self.client.query(partition_query, job_config=job_config).result()))
+        except Exception as e:
+            self.logger.warning(f"Error reading partition metadata, scanning full table: {str(e)}")
+            return None
+        
+        # Buffered rows can be dated anywhere, including before the newest partition
+        if row.has_unpartitioned or not row.partition_id:
+            return None
+        
+        return datetime.strptime(row.partition_id, "%Y%m%d").replace(tzinfo=timezone.utc)
+    
+    def load(self, transactions: Iterable[Transaction], 
+             assume_new_after: Optional[datetime] = None) -> bool:
         """
         Load transactions into BigQuery
         
-        :param transactions: List of transaction objects to load
+        :param transactions: Transaction objects to load; any iterable, consumed once
+        :param assume_new_after: Latest date already in the table, if known. Transactions
+                                 after it are appended without checking for existing IDs
         :return: Boolean indicating success or failure
         """
-        if not transactions:
-            self.logger.info("No transactions to load")
-            return True
-        
         try:
-            self.logger.info(f"Loading {len(transactions)} transactions into BigQuery")
+            # Convert straight to Arrow columns, one row per transaction ID
+            arrow_table = self._transactions_to_arrow(transactions)
             
-            # Convert to DataFrame
-            df = self._transactions_to_dataframe(transactions)
+            if not arrow_table.num_rows:
+                self.logger.info("No transactions to load")
+                return True
+            
+            self.logger.info(f"Loading {arrow_table.num_rows} transactions into BigQuery")
             
             # Check dataset exists
             self._ensure_dataset_exists()
             
             # Check table exists
-            self._ensure_table_exists(df)
+            table = self._ensure_table_exists(arrow_table.schema)
+            table = self._add_missing_columns(table, arrow_table.schema)
+            
+            # Stage the batch, then let BigQuery insert only the unseen IDs
+            table_ref = f"{self.project_id}.{self.dataset_id}.{self.transactions_table}"
+            staging_ref = f"{table_ref}_stg_{uuid.uuid4().hex}"
+            
+            load_schema = [field for field in table.schema if field.name in arrow_table.column_names]
+            inserted = 0
             
-            # Get existing transaction IDs and filter out
-            existing_ids = self._get_existing_transaction_ids([t.transaction_id for t in transactions])
-            new_transactions = df[~df['transaction_id'].isin(existing_ids)]
+            if assume_new_after is not None:
+                # Nothing after the latest loaded date can be in the table yet
+                new_rows = self._dates_after(arrow_table, assume_new_after)
+                if pc.any(new_rows).as_py() and self._append_new_transactions(
+                    arrow_table.filter(new_rows), table_ref, load_schema
+                ):
+                    inserted = pc.sum(new_rows).as_py()
+                    arrow_table = arrow_table.filter(pc.invert(new_rows))
             
-            if new_transactions.empty:
+            if arrow_table.num_rows:
+                try:
+                    self._stage_transactions(arrow_table, staging_ref, load_schema)
+                    
+                    inserted += self._merge_new_transactions(table_ref, staging_ref, arrow_table.column_names)
+                finally:
+                    self.client.delete_table(staging_ref, not_found_ok=True)
+            
+            if not inserted:
                 self.logger.info("All transactions already exist in BigQuery")
                 return True
             
-            # Load new transactions
-            table_ref = f"{self.project_id}.{self.dataset_id}.{self.transactions_table}"
-            job_config = bigquery.LoadJobConfig(
-                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-                schema_update_options=[
-                    bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION
-                ]
-            )
-            load_job = self.client.load_table_from_dataframe(
-                new_transactions, table_ref, job_config=job_config
-            )
-
-            load_job.result()
+            # New rows may have moved the latest date
+            _LATEST_DATE_CACHE.pop(table_ref, None)
             
-            self.logger.info(f"Successfully loaded {len(new_transactions)} new transactions")
+            self.logger.info(f"Successfully loaded {inserted} new transactions")
             return True
             
         except Exception as e:
             self.logger.error(f"Error loading transactions to BigQuery: {str(e)}", exc_info=True)
+            # The cached metadata may be what's wrong; check again next time
+            self._dataset_checked = False
+            self._table = None
             return False
     
-    def _transactions_to_dataframe(self, transactions: List[Transaction]) -> DataFrame:
+    def _transactions_to_arrow(self, transactions: Iterable[Transaction]) -> pa.Table:
         """
-        Convert transaction objects to a BigQuery-compatible DataFrame
+        Convert transaction objects to a BigQuery-compatible Arrow table
         
-        :param transactions: List of transaction objects
-        :return: DataFrame with BigQuery-compatible data types
+        Transactions are consumed LOAD_CHUNK_ROWS at a time, so a generator
+        is never held in memory as Python objects all at once. Only the
+        first transaction seen for each ID is kept
+        
+        :param transactions: Transaction objects to convert
+        :return: Arrow table with TRANSACTION_ARROW_SCHEMA
         """
-        # Convert to dictionaries
-        rows = [t.to_bigquery_row() for t in transactions]
+        seen_ids = set()
+        batches = []
+        chunk = []
         
-        df = pd.DataFrame(rows)
+        for t in transactions:
+            if t.transaction_id in seen_ids:
+                continue
+            seen_ids.add(t.transaction_id)
+            
+            chunk.append(t)
+            if len(chunk) == LOAD_CHUNK_ROWS:
+                batches.append(self._to_record_batch(chunk))
+                chunk = []
         
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
+        if chunk:
+            batches.append(self._to_record_batch(chunk))
         
-        bool_columns = ['is_recurring', 'is_transfer', 'is_income', 
-                        'is_reimbursable', 'is_ignored']
-        for col in bool_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(bool)
+        return pa.Table.from_batches(batches, schema=TRANSACTION_ARROW_SCHEMA)
+    
+    def _to_record_batch(self, transactions: List[Transaction]) -> pa.RecordBatch:
+        """
+        Convert a chunk of transactions to an Arrow record batch
         
-        numeric_columns = ['amount']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(float)
+        Columns are built directly from the objects, without going through
+        per-row dictionaries or a DataFrame
         
-        if 'metadata' in df.columns:
-            df['metadata'] = df['metadata'].apply(
-                lambda x: json.dumps(x) if isinstance(x, dict) else x
-            )
+        :param transactions: Transaction objects to convert
+        :return: Record batch with TRANSACTION_ARROW_SCHEMA
+        """
+        columns = {
+            'transaction_id': [t.transaction_id for t in transactions],
+            'date': [t.date for t in transactions],
+            'amount': [t.amount for t in transactions],
+            'description': [t.description for t in transactions],
+            'source': [t.source for t in transactions],
+            'account_type': [t.account_type for t in transactions],
+            'category': [t.category for t in transactions],
+            'subcategory': [t.subcategory for t in transactions],
+            'is_recurring': [t.is_recurring for t in transactions],
+            'is_transfer': [t.is_transfer for t in transactions],
+            'is_income': [t.is_income for t in transactions],
+            'is_reimbursable': [t.is_reimbursable for t in transactions],
+            'is_ignored': [t.is_ignored for t in transactions],
+            'metadata': [t.metadata_json() for t in transactions],
+        }
         
-        return df
+        return pa.RecordBatch.from_pydict(columns, schema=TRANSACTION_ARROW_SCHEMA)
     
     def _ensure_dataset_exists(self) -> None:
         """
@@ -173,6 +372,9 @@ class BigQueryLoader:
 
         :raises Exception: If dataset creation fails
         """
+        if self._dataset_checked:
+            return
+        
         try:
             dataset_ref = self.client.dataset(self.dataset_id)
             
@@ -185,122 +387,349 @@ class BigQueryLoader:
                 dataset.location = "US"
                 self.client.create_dataset(dataset)
                 self.logger.info(f"Created dataset {self.dataset_id}")
+            
+            self._dataset_checked = True
         except Exception as e:
             self.logger.error(f"Error ensuring dataset exists: {str(e)}")
             raise
     
-    def _ensure_table_exists(self, df: DataFrame) -> None:
+    def _ensure_table_exists(self, arrow_schema: pa.Schema) -> bigquery.Table:
         """
         Ensure BigQuery table exists, creating it if necessary
         
-        :param df: DataFrame with the schema to use for table creation
+        :param arrow_schema: Arrow schema of the data to use for table creation
+        :return: The existing or newly created table
         :raises Exception: If table creation fails
         """
+        if self._table is not None:
+            return self._table
+        
         try:
             table_ref = f"{self.project_id}.{self.dataset_id}.{self.transactions_table}"
             
             try:
-                self.client.get_table(table_ref)
+                self._table = self.client.get_table(table_ref)
                 self.logger.debug(f"Table {self.transactions_table} already exists")
+                
+                if self._table.clustering_fields != TRANSACTION_CLUSTERING_FIELDS:
+                    # Only applies to data written from now on; see the README to recluster old rows
+                    self._table.clustering_fields = TRANSACTION_CLUSTERING_FIELDS
+                    self._table = self.client.update_table(self._table, ["clustering_fields"])
+                    self.logger.info(f"Updated clustering of {self.transactions_table} to {TRANSACTION_CLUSTERING_FIELDS}")
+                
+                return self._table
             except NotFound:
-                schema = self._generate_schema_from_dataframe(df)
+                schema = self._generate_schema(arrow_schema)
                 table = bigquery.Table(table_ref, schema=schema)
 
                 table.time_partitioning = bigquery.TimePartitioning(
                     type_=bigquery.TimePartitioningType.DAY,
                     field="date"
                 )
-                table.clustering_fields = ["source", "category", "account_type"]
+                table.clustering_fields = TRANSACTION_CLUSTERING_FIELDS
                 
-                self.client.create_table(table)
+                self._table = self.client.create_table(table)
                 self.logger.info(f"Created table {self.transactions_table}")
+                return self._table
                 
         except Exception as e:
             self.logger.error(f"Error ensuring table exists: {str(e)}")
             raise
     
-    def _generate_schema_from_dataframe(self, df: DataFrame) -> List[bigquery.SchemaField]:
+    def _generate_schema(self, arrow_schema: pa.Schema) -> List[bigquery.SchemaField]:
         """
-        Generate BigQuery schema from DataFrame
+        Generate BigQuery schema from an Arrow schema
         
-        :param df: DataFrame to generate schema from
+        :param arrow_schema: Arrow schema to generate schema from
         :return: List of BigQuery SchemaField objects
         """
-        schema = []
-        
-        dtype_map = {
-            'int64': 'INTEGER',
-            'float64': 'FLOAT',
-            'bool': 'BOOLEAN',
-            'datetime64[ns]': 'TIMESTAMP',
-            'object': 'STRING'
-        }
-        
-        core_fields = {
-            'transaction_id': bigquery.SchemaField('transaction_id', 'STRING', mode='REQUIRED'),
-            'date': bigquery.SchemaField('date', 'TIMESTAMP', mode='REQUIRED'),
-            'amount': bigquery.SchemaField('amount', 'FLOAT', mode='REQUIRED'),
-            'description': bigquery.SchemaField('description', 'STRING', mode='REQUIRED'),
-            'source': bigquery.SchemaField('source', 'STRING', mode='REQUIRED'),
-            'account_type': bigquery.SchemaField('account_type', 'STRING', mode='REQUIRED'),
-            'category': bigquery.SchemaField('category', 'STRING', mode='NULLABLE'),
-            'subcategory': bigquery.SchemaField('subcategory', 'STRING', mode='NULLABLE'),
-            'is_recurring': bigquery.SchemaField('is_recurring', 'BOOLEAN', mode='NULLABLE'),
-            'is_transfer': bigquery.SchemaField('is_transfer', 'BOOLEAN', mode='NULLABLE'),
-            'is_income': bigquery.SchemaField('is_income', 'BOOLEAN', mode='NULLABLE'),
-            'is_reimbursable': bigquery.SchemaField('is_reimbursable', 'BOOLEAN', mode='NULLABLE'),
-            'is_ignored': bigquery.SchemaField('is_ignored', 'BOOLEAN', mode='NULLABLE'),
-            'metadata': bigquery.SchemaField('metadata', 'STRING', mode='NULLABLE')
-        }
+        # Loads always use the transaction schema, which maps to a fixed list
+        if arrow_schema.equals(TRANSACTION_ARROW_SCHEMA):
+            return list(TRANSACTION_BQ_SCHEMA)
         
         # Add core fields that exist
-        for field_name, schema_field in core_fields.items():
-            if field_name in df.columns:
-                schema.append(schema_field)
+        schema = [
+            schema_field for field_name, schema_field in CORE_SCHEMA_FIELDS.items()
+            if field_name in arrow_schema.names
+        ]
         
         # Add any additional fields
-        for col in df.columns:
-            if col not in core_fields:
-                col_type = str(df[col].dtype)
-                bq_type = dtype_map.get(col_type, 'STRING')
-                schema.append(bigquery.SchemaField(col, bq_type, mode='NULLABLE'))
+        for arrow_field in arrow_schema:
+            if arrow_field.name not in CORE_SCHEMA_FIELDS:
+                bq_type = ARROW_TO_BIGQUERY_TYPES.get(str(arrow_field.type), 'STRING')
+                schema.append(bigquery.SchemaField(arrow_field.name, bq_type, mode='NULLABLE'))
         
         return schema
     
-    def _get_existing_transaction_ids(self, transaction_ids: List[str]) -> List[str]:
+    @staticmethod
+    def _dates_after(arrow_table: pa.Table, cursor: datetime) -> pa.ChunkedArray:
         """
-        Get list of transaction IDs that already exist in BigQuery
+        Mark the transactions dated after a cursor
         
-        :param transaction_ids: List of transaction IDs to check
-        :return: List of transaction IDs that already exist
+        :param arrow_table: Transactions to check
+        :param cursor: Cutoff date; aware datetimes are compared in UTC
+        :return: Boolean mask over the table's rows
+        """
+        # Loaded dates are naive UTC, as BigQuery reads them
+        if cursor.tzinfo is not None:
+            cursor = cursor.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        return pc.greater(arrow_table.column('date'), pa.scalar(cursor, pa.timestamp('us')))
+    
+    def _append_new_transactions(self, arrow_table: pa.Table, table_ref: str, 
+                                 schema: List[bigquery.SchemaField]) -> bool:
         """
-        if not transaction_ids:
-            return []
+        Append transactions known to be new straight to the target table
+        
+        Only all-or-nothing writes are used here: a failed Storage Write
+        may leave some rows behind, but the caller's MERGE skips those
+        
+        :param arrow_table: Transactions that aren't in the table yet
+        :param table_ref: Fully qualified target table
+        :param schema: BigQuery schema of the loaded columns
+        :return: True if appended, False if the rows should be merged instead
+        """
+        if arrow_table.num_rows <= self.storage_write_max_rows:
+            try:
+                self._stage_via_storage_write(arrow_table, table_ref)
+                return True
+            except ImportError:
+                pass
+            except Exception as e:
+                self.logger.warning(f"Storage Write API failed, merging new transactions instead: {str(e)}")
+                return False
+        
+        # A single load job either lands completely or not at all
+        if arrow_table.num_rows > LOAD_CHUNK_ROWS:
+            return False
         
         try:
-            query = f"""
-                SELECT transaction_id
-                FROM `{self.project_id}.{self.dataset_id}.{self.transactions_table}`
-                WHERE transaction_id IN UNNEST(@transaction_ids)
-            """
-
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ArrayQueryParameter("transaction_ids", "STRING", transaction_ids)
-                ]
-            )
-
-            query_job = self.client.query(query, job_config=job_config)
-            results = query_job.result()
-            existing_ids = [row.transaction_id for row in results]
-            
-            self.logger.debug(f"Found {len(existing_ids)} existing transactions in BigQuery")
-            return existing_ids
-            
-        except NotFound:
-            # Table doesn't exist yet
-            self.logger.debug(f"Table {self.transactions_table} not found, no existing transactions")
-            return []
+            self._load_chunk(arrow_table, table_ref, schema)
+            return True
         except Exception as e:
-            self.logger.error(f"Error checking existing transaction IDs: {str(e)}")
-            return []
+            self.logger.warning(f"Appending new transactions failed, merging them instead: {str(e)}")
+            return False
+    
+    def _stage_transactions(self, arrow_table: pa.Table, staging_ref: str, 
+                            schema: List[bigquery.SchemaField]) -> None:
+        """
+        Load transactions into a new staging table
+        
+        Large batches are split into several Parquet load jobs that run
+        concurrently, rather than one job holding the whole batch
+        
+        :param arrow_table: Transactions to stage
+        :param staging_ref: Fully qualified staging table to create
+        :param schema: BigQuery schema of the staging table
+        """
+        self._create_staging_table(staging_ref, schema)
+        
+        if arrow_table.num_rows <= self.storage_write_max_rows:
+            try:
+                self._stage_via_storage_write(arrow_table, staging_ref)
+                return
+            except ImportError:
+                self.logger.debug("google-cloud-bigquery-storage not installed, staging with load jobs")
+            except Exception as e:
+                self.logger.warning(f"Storage Write API failed, staging with load jobs: {str(e)}")
+                # Start over so rows that made it in aren't staged twice
+                self.client.delete_table(staging_ref, not_found_ok=True)
+                self._create_staging_table(staging_ref, schema)
+        
+        chunks = [
+            arrow_table.slice(offset, LOAD_CHUNK_ROWS)
+            for offset in range(0, arrow_table.num_rows, LOAD_CHUNK_ROWS)
+        ]
+        
+        if len(chunks) == 1:
+            self._load_chunk(chunks[0], staging_ref, schema)
+            return
+        
+        self.logger.debug(f"Staging {arrow_table.num_rows} transactions in {len(chunks)} load jobs")
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_LOAD_JOBS, len(chunks))) as executor:
+            futures = [executor.submit(self._load_chunk, chunk, staging_ref, schema) for chunk in chunks]
+            for future in futures:
+                future.result()
+    
+    def _create_staging_table(self, staging_ref: str, schema: List[bigquery.SchemaField]) -> None:
+        """
+        Create an empty staging table that expires on its own
+        
+        :param staging_ref: Fully qualified staging table to create
+        :param schema: BigQuery schema of the staging table
+        """
+        staging_table = bigquery.Table(staging_ref, schema=schema)
+        staging_table.expires = datetime.now(timezone.utc) + STAGING_TABLE_EXPIRATION
+        self.client.create_table(staging_table)
+    
+    def _stage_via_storage_write(self, arrow_table: pa.Table, staging_ref: str) -> None:
+        """
+        Stream transactions into a table through the Storage Write API
+        
+        Rows are appended to the table's default stream as protobuf messages,
+        avoiding load jobs and their per-table daily quota
+        
+        :param arrow_table: Transactions to write
+        :param staging_ref: Fully qualified table to append to
+        :raises ImportError: If google-cloud-bigquery-storage isn't installed
+        """
+        from google.cloud import bigquery_storage_v1
+        from google.cloud.bigquery_storage_v1 import types, writer
+        
+        if self._write_client is None:
+            self._write_client = bigquery_storage_v1.BigQueryWriteClient()
+        
+        row_class = self._get_storage_row_class()
+        
+        # The Storage Write API takes timestamps as microseconds since the epoch
+        date_index = arrow_table.schema.get_field_index('date')
+        arrow_table = arrow_table.set_column(
+            date_index, 'date', arrow_table.column('date').cast(pa.int64())
+        )
+        
+        project_id, dataset_id, table_id = staging_ref.split(".")
+        request_template = types.AppendRowsRequest()
+        request_template.write_stream = (
+            f"{self._write_client.table_path(project_id, dataset_id, table_id)}/streams/_default"
+        )
+        proto_schema = types.ProtoSchema()
+        row_class.DESCRIPTOR.CopyToProto(proto_schema.proto_descriptor)
+        proto_data = types.AppendRowsRequest.ProtoData()
+        proto_data.writer_schema = proto_schema
+        request_template.proto_rows = proto_data
+        
+        append_rows_stream = writer.AppendRowsStream(self._write_client, request_template)
+        try:
+            futures = []
+            for batch in arrow_table.to_batches(max_chunksize=STORAGE_WRITE_BATCH_ROWS):
+                proto_rows = types.ProtoRows()
+                proto_rows.serialized_rows.extend(
+                    # None values are left unset, which BigQuery reads as NULL
+                    row_class(**{k: v for k, v in row.items() if v is not None}).SerializeToString()
+                    for row in batch.to_pylist()
+                )
+                
+                request = types.AppendRowsRequest()
+                proto_data = types.AppendRowsRequest.ProtoData()
+                proto_data.rows = proto_rows
+                request.proto_rows = proto_data
+                futures.append(append_rows_stream.send(request))
+            
+            for future in futures:
+                future.result()
+        finally:
+            append_rows_stream.close()
+        
+        self.logger.debug(f"Staged {arrow_table.num_rows} transactions through the Storage Write API")
+    
+    @classmethod
+    def _get_storage_row_class(cls) -> type:
+        """
+        Get the protobuf message class matching TRANSACTION_ARROW_SCHEMA
+        
+        :return: Generated message class
+        """
+        if cls._storage_row_class is not None:
+            return cls._storage_row_class
+        
+        from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+        
+        proto_types = {
+            pa.string(): descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+            pa.timestamp('us'): descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+            pa.float64(): descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+            pa.bool_(): descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+        }
+        
+        file_proto = descriptor_pb2.FileDescriptorProto(
+            name="transaction_row.proto", package="transacttap", syntax="proto2"
+        )
+        message_proto = file_proto.message_type.add(name="TransactionRow")
+        for number, arrow_field in enumerate(TRANSACTION_ARROW_SCHEMA, start=1):
+            message_proto.field.add(
+                name=arrow_field.name,
+                number=number,
+                type=proto_types[arrow_field.type],
+                label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+            )
+        
+        pool = descriptor_pool.DescriptorPool()
+        pool.Add(file_proto)
+        descriptor = pool.FindMessageTypeByName("transacttap.TransactionRow")
+        
+        if hasattr(message_factory, "GetMessageClass"):
+            cls._storage_row_class = message_factory.GetMessageClass(descriptor)
+        else:
+            cls._storage_row_class = message_factory.MessageFactory(pool).GetPrototype(descriptor)
+        
+        return cls._storage_row_class
+    
+    def _load_chunk(self, chunk: pa.Table, table_ref: str, schema: List[bigquery.SchemaField]) -> None:
+        """
+        Append a chunk of transactions to a table with a Parquet load job
+        
+        :param chunk: Transactions to load
+        :param table_ref: Fully qualified table to append to
+        :param schema: BigQuery schema of the table
+        """
+        buffer = io.BytesIO()
+        pq.write_table(chunk, buffer, compression='snappy')
+        buffer.seek(0)
+        
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            schema=schema
+        )
+        load_job = self.client.load_table_from_file(
+            buffer, table_ref, job_config=job_config
+        )
+        load_job.result()
+    
+    def _add_missing_columns(self, table: bigquery.Table, arrow_schema: pa.Schema) -> bigquery.Table:
+        """
+        Add columns the table doesn't have yet
+        
+        :param table: Target table
+        :param arrow_schema: Arrow schema of the data about to be loaded
+        :return: Table with the updated schema
+        """
+        existing = {field.name for field in table.schema}
+        missing = [
+            bigquery.SchemaField(field.name, field.field_type, mode='NULLABLE')
+            for field in self._generate_schema(arrow_schema)
+            if field.name not in existing
+        ]
+        
+        if not missing:
+            return table
+        
+        table.schema = list(table.schema) + missing
+        self.logger.info(f"Adding columns to {self.transactions_table}: {[field.name for field in missing]}")
+        self._table = self.client.update_table(table, ["schema"])
+        return self._table
+    
+    def _merge_new_transactions(self, table_ref: str, staging_ref: str, columns: List[str]) -> int:
+        """
+        Insert staged transactions whose IDs aren't in the target table yet
+        
+        :param table_ref: Fully qualified target table
+        :param staging_ref: Fully qualified staging table
+        :param columns: Columns to insert
+        :return: Number of transactions inserted
+        """
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        value_list = ", ".join(f"S.`{column}`" for column in columns)
+        
+        query = f"""
+            MERGE `{table_ref}` T
+            USING `{staging_ref}` S
+            ON T.transaction_id = S.transaction_id
+            WHEN NOT MATCHED THEN
+                INSERT ({column_list}) VALUES ({value_list})
+        """
+        
+        query_job = self.client.query(query)
+        query_job.result()
+        
+        return query_job.num_dml_affected_rows or 0
@@ -11,18 +11,22 @@ This script orchestrates the pipeline process:
 """
 
 import os
+import asyncio
+import itertools
 import argparse
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, TYPE_CHECKING
 
-from src.utils.config import ConfigManager
+from src.utils.config import get_config_manager
 from src.utils.logger import setup_logger
-from src.extractors.extractor_factory import ExtractorFactory
-from src.processors.transaction_processor import TransactionProcessor
-from src.loaders.bigquery_loader import BigQueryLoader
 from src.models.transaction import Transaction
 
+# Extraction, processing and loading pull in Selenium, pandas and the BigQuery
+# client, so each is imported only when its phase runs
+if TYPE_CHECKING:
+    from src.loaders.bigquery_loader import BigQueryLoader
+
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -62,38 +66,93 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def extract_data(banks: List[str], start_date: datetime, end_date: datetime) -> Dict[str, List[Transaction]]:
+def extract_data(banks: List[str], start_date: datetime, end_date: datetime,
+                 max_parallel_sessions: int = 1, 
+                 max_account_sessions: int = 1) -> Dict[str, List[Transaction]]:
     """
     Extract transaction data
     
+    Each bank runs in its own browser session, so login and MFA waits
+    for different banks can overlap
+    
     :param banks: List of bank identifiers to extract data from
     :param start_date Beginning date for transaction extraction
     :param end_date: End date for transaction extraction
+    :param max_parallel_sessions: Maximum number of banks extracted concurrently
+    :param max_account_sessions: Maximum number of accounts per bank extracted concurrently;
+                                 above 1, every configured account gets its own session
     :return: Dictionary mapping bank names to lists of transaction objects
     """
     logger.info(f"Starting data extraction for {len(banks)} banks from {start_date.date()} to {end_date.date()}")
     
+    from src.extractors.extractor_factory import ExtractorFactory
+    
     extractor_factory = ExtractorFactory()
-    all_transactions = {}
     
-    # Extract data from each bank
+    # Create extractors up front, one per bank
+    extractors = {}
     for bank in banks:
         try:
-            logger.info(f"Extracting data from {bank}...")
-            
-            # Get appropriate extractor
-            extractor = extractor_factory.get_extractor(bank)
-            
-            # Extract transactions
-            transactions = extractor.extract(start_date, end_date)
-            all_transactions[bank] = transactions
-            
-            logger.info(f"Successfully extracted {len(transactions)} transactions from {bank}")
-            
+            extractors[bank] = extractor_factory.get_extractor(bank)
         except Exception as e:
             logger.error(f"Error extracting data from {bank}: {str(e)}", exc_info=True)
     
-    return all_transactions
+    return asyncio.run(
+        _extract_all(extractors, start_date, end_date, max(1, max_parallel_sessions), max_account_sessions)
+    )
+
+
+async def _extract_all(extractors: Dict[str, Any], start_date: datetime, end_date: datetime,
+                       max_parallel_sessions: int, 
+                       max_account_sessions: int = 1) -> Dict[str, List[Transaction]]:
+    """
+    Run extractors concurrently with bounded parallelism
+    
+    :param extractors: Dictionary mapping bank names to extractor instances
+    :param start_date: Beginning date for transaction extraction
+    :param end_date: End date for transaction extraction
+    :param max_parallel_sessions: Maximum number of concurrent browser sessions
+    :param max_account_sessions: Maximum number of concurrent sessions per bank
+    :return: Dictionary mapping bank names to lists of transaction objects
+    """
+    semaphore = asyncio.Semaphore(max_parallel_sessions)
+    
+    async def extract_bank(bank: str, extractor: Any) -> Optional[List[Transaction]]:
+        async with semaphore:
+            try:
+                logger.info(f"Extracting data from {bank}...")
+                
+                accounts = extractor.get_account_types()
+                
+                if max_account_sessions > 1 and len(accounts) > 1:
+                    # Fan out one session per account
+                    transactions = await extractor.extract_many(
+                        accounts, start_date, end_date, max_account_sessions
+                    )
+                elif len(accounts) > 1:
+                    # Download every account in one logged-in session
+                    transactions = await asyncio.to_thread(
+                        extractor.extract_accounts, start_date, end_date, accounts
+                    )
+                else:
+                    # Extract transactions in a worker thread
+                    transactions = await asyncio.to_thread(extractor.extract, start_date, end_date)
+                
+                logger.info(f"Successfully extracted {len(transactions)} transactions from {bank}")
+                return transactions
+                
+            except Exception as e:
+                logger.error(f"Error extracting data from {bank}: {str(e)}", exc_info=True)
+                return None
+    
+    banks = list(extractors)
+    results = await asyncio.gather(*[extract_bank(bank, extractors[bank]) for bank in banks])
+    
+    return {
+        bank: transactions
+        for bank, transactions in zip(banks, results)
+        if transactions is not None
+    }
 
 
 def process_data(all_transactions: Dict[str, List[Transaction]]) -> List[Transaction]:
@@ -105,12 +164,13 @@ def process_data(all_transactions: Dict[str, List[Transaction]]) -> List[Transac
     """
     logger.info("Starting data processing...")
     
-    # Flatten transactions
-    flattened_transactions = []
-    for bank, transactions in all_transactions.items():
-        flattened_transactions.extend(transactions)
+    # Flatten transactions, dropping the per-bank lists once they're copied
+    flattened_transactions = list(itertools.chain.from_iterable(all_transactions.values()))
+    all_transactions.clear()
     
     # Process
+    from src.processors.transaction_processor import TransactionProcessor
+    
     processor = TransactionProcessor()
     processed_transactions = processor.process(flattened_transactions)
     
@@ -118,21 +178,28 @@ def process_data(all_transactions: Dict[str, List[Transaction]]) -> List[Transac
     return processed_transactions
 
 
-def load_data(transactions: List[Transaction]) -> bool:
+def load_data(transactions: Iterable[Transaction], 
+              assume_new_after: Optional[datetime] = None,
+              loader: Optional['BigQueryLoader'] = None) -> bool:
     """
     Load processed transaction data to BigQuery
     
-    :param transactions: List of processed Transaction objects
+    :param transactions: Processed Transaction objects; any iterable, consumed once
+    :param assume_new_after: Latest transaction date already in BigQuery, if known
+    :param loader: Optional existing loader to reuse
     :return: Success status as boolean
     """
     logger.info("Starting data loading to BigQuery...")
     
     # Load transactions
-    loader = BigQueryLoader()
-    success = loader.load(transactions)
+    if loader is None:
+        from src.loaders.bigquery_loader import BigQueryLoader
+        
+        loader = BigQueryLoader()
+    success = loader.load(transactions, assume_new_after=assume_new_after)
     
     if success:
-        logger.info(f"Successfully loaded {len(transactions)} transactions to BigQuery")
+        logger.info("Successfully loaded transactions to BigQuery")
     else:
         logger.error("Failed to load transactions to BigQuery")
     
@@ -149,7 +216,7 @@ def main():
     logger.info("Starting Personal Finance Data Pipeline")
     
     # Load config
-    config_manager = ConfigManager()
+    config_manager = get_config_manager()
     config = config_manager.load_config()
     
     # Determine which banks to process
@@ -157,14 +224,18 @@ def main():
     
     # Get start date from arguments or config
     start_date = args.start_date
+    latest_date = None
+    bq_loader = None
     if start_date is None:
         if not args.skip_extraction:
             try:
+                from src.loaders.bigquery_loader import BigQueryLoader
+                
                 bq_loader = BigQueryLoader()
-                start_date = bq_loader.get_latest_transaction_date()
+                latest_date = bq_loader.get_latest_transaction_date()
                 # Add one day to avoid dupes
-                if start_date:
-                    start_date = start_date + timedelta(days=1)
+                if latest_date:
+                    start_date = latest_date + timedelta(days=1)
             except Exception as e:
                 logger.warning(f"Could not fetch latest transaction date: {str(e)}")
                 
@@ -176,7 +247,14 @@ def main():
     # Extract data
     all_transactions = {}
     if not args.skip_extraction:
-        all_transactions = extract_data(banks_to_process, start_date, args.end_date)
+        app_config = config.get("app", {})
+        all_transactions = extract_data(
+            banks_to_process, 
+            start_date, 
+            args.end_date, 
+            app_config.get("max_parallel_sessions", 1),
+            app_config.get("max_account_sessions", 1)
+        )
     else:
         logger.info("Skipping data extraction phase")
     
@@ -187,7 +265,7 @@ def main():
     
     # Load data
     if not args.skip_loading and processed_transactions:
-        load_success = load_data(processed_transactions)
+        load_success = load_data(processed_transactions, assume_new_after=latest_date, loader=bq_loader)
         if load_success:
             logger.info("Data pipeline completed successfully")
         else:
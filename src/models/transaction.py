@@ -6,15 +6,151 @@ from a source. Includes methods for working with transaction data, like
 serialization, categorization, and comparison
 """
 
+import sys
 import uuid
-from datetime import datetime
-from typing import Optional, Dict, Any, List, Union
-from dataclasses import dataclass, field, asdict
+import functools
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Union, Iterable, FrozenSet, Tuple, Callable, TYPE_CHECKING
+from dataclasses import dataclass, field
 import json
 import re
 
+if TYPE_CHECKING:
+    import numpy as np
 
-@dataclass
+
+# Candidate CSV column names for each transaction field, in priority order
+CSV_FIELD_MAPPINGS = {
+    'date': ['date', 'transaction_date', 'post_date', 'Date'],
+    'amount': ['amount', 'transaction_amount', 'Amount'],
+    'description': ['description', 'merchant', 'memo', 'Description']
+}
+
+# Serialized form of a transaction without metadata
+EMPTY_METADATA_JSON = "{}"
+
+# Slots cut per-instance memory and attribute access cost (Python 3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 date or datetime string
+    
+    Plain dates take a fast path, and since many transactions share a
+    date, results are cached per string
+    
+    :param value: ISO 8601 string, optionally ending in 'Z'
+    :return: Parsed datetime
+    """
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    
+    # fromisoformat only accepts a 'Z' suffix from Python 3.11
+    if value[-1:] == 'Z':
+        return datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+    
+    return datetime.fromisoformat(value)
+
+
+@functools.lru_cache(maxsize=4096)
+def _description_tokens(description: str) -> FrozenSet[str]:
+    """
+    Split a description into lower-cased words, once per distinct description
+    
+    :param description: Transaction description
+    :return: Set of words
+    """
+    return frozenset(description.lower().split())
+
+
+# Compiled union of category patterns, and the (category, subcategory) of each
+# branch indexed by the number of its marker group
+CategoryMatcher = Tuple[Optional[re.Pattern], List[Optional[Tuple[Optional[str], Optional[str]]]]]
+
+_CATEGORY_GROUP = "_category"
+
+
+def compile_category_matcher(category_mappings: Dict[str, Dict[str, str]]) -> CategoryMatcher:
+    """
+    Compile category patterns into a single regex, once per set of mappings
+    
+    Each pattern becomes a lookahead branch tried in mapping order, so the
+    first matching pattern wins exactly as when searching them one by one,
+    but in a single regex call. Patterns with numbered backreferences can't
+    be combined, and leave the matcher's pattern as None, as do empty mappings
+    
+    :param category_mappings: Dictionary mapping regex patterns to categories/subcategories
+    :return: Tuple of the combined pattern (or None) and the results per marker group
+    """
+    patterns = [pattern.lower() for pattern in category_mappings]
+    
+    # An empty alternation would match every description with no marker group
+    if not patterns:
+        return None, []
+    
+    if any(re.search(r'\\[1-9]', pattern) for pattern in patterns):
+        return None, []
+    
+    # The empty marker group closes last in its branch, so it is the match's lastindex
+    branches = [
+        f"(?=[\\s\\S]*?(?:{pattern}))(?P<{_CATEGORY_GROUP}{i}>)"
+        for i, pattern in enumerate(patterns)
+    ]
+    
+    try:
+        compiled = re.compile("(?:" + "|".join(branches) + ")")
+    except re.error:
+        return None, []
+    
+    # Resolve each branch's result up front, so a match is a single list lookup
+    results: List[Optional[Tuple[Optional[str], Optional[str]]]] = [None] * (compiled.groups + 1)
+    for i, category_info in enumerate(category_mappings.values()):
+        results[compiled.groupindex[f"{_CATEGORY_GROUP}{i}"]] = (
+            category_info.get('category'), category_info.get('subcategory')
+        )
+    
+    return compiled, results
+
+
+def match_category(description: str, category_mappings: Dict[str, Dict[str, str]], 
+                   matcher: Optional[CategoryMatcher] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Find the category of a transaction description
+    
+    :param description: Transaction description
+    :param category_mappings: Dictionary mapping regex patterns to categories/subcategories
+    :param matcher: Optional result of compile_category_matcher for the same mappings
+    :return: Tuple of category and subcategory
+    """
+    desc_lower = description.lower()
+    
+    if matcher is not None and matcher[0] is not None:
+        match = matcher[0].match(desc_lower)
+        if match:
+            # lastindex is the marker group of the first matching branch
+            return matcher[1][match.lastindex]
+    else:
+        for pattern, category_info in category_mappings.items():
+            if re.search(pattern.lower(), desc_lower):
+                return category_info.get('category'), category_info.get('subcategory')
+    
+    # Default categorization
+    return "Uncategorized", None
+
+
+def _amount_key(amount: float) -> int:
+    """
+    Get the amount index bucket of an amount, in whole cents
+    
+    :param amount: Transaction amount
+    :return: Bucket key
+    """
+    return round(amount * 100)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Transaction:
     """
     Represents a financial transaction
@@ -43,10 +179,15 @@ class Transaction:
     is_reimbursable: bool = False
     is_ignored: bool = False
     
+    # Encoded metadata and the dict it was encoded from; see metadata_json
+    _metadata_json: Optional[Tuple[Dict[str, Any], str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
     def __post_init__(self):
         """Validate and process fields after initialization"""
         if isinstance(self.date, str):
-            self.date = datetime.fromisoformat(self.date.replace('Z', '+00:00'))
+            self.date = _parse_iso_datetime(self.date)
         
         self.amount = float(self.amount)
         
@@ -55,6 +196,17 @@ class Transaction:
             self.is_income = True
         
         self.description = self.description.strip()
+        
+        # These take only a handful of values; share one string object per value.
+        # sys.intern only accepts exact str, so None and other values are left as-is
+        if type(self.source) is str:
+            self.source = sys.intern(self.source)
+        if type(self.account_type) is str:
+            self.account_type = sys.intern(self.account_type)
+        if type(self.category) is str:
+            self.category = sys.intern(self.category)
+        if type(self.subcategory) is str:
+            self.subcategory = sys.intern(self.subcategory)
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -62,10 +214,7 @@ class Transaction:
         
         :return: Dictionary of transaction
         """
-        result = asdict(self)
-        result['date'] = self.date.isoformat()
-        
-        return result
+        return self._as_row(dict(self.metadata))
     
     def to_json(self) -> str:
         """
@@ -81,13 +230,62 @@ class Transaction:
         
         :return: Dictionary formatted for BigQuery insertion
         """
-        row = self.to_dict()
-        row['date'] = self.date.isoformat()
+        # Always a JSON string, matching the STRING column it's loaded into
+        return self._as_row(self.metadata_json())
+    
+    def metadata_json(self) -> str:
+        """
+        Get the metadata encoded as JSON
+        
+        The encoding is reused until metadata is replaced or changed through
+        update_metadata, so change it that way rather than in place
+        
+        :return: JSON string of the metadata
+        """
+        # Most transactions have no metadata; skip encoding an empty dict for each
+        if not self.metadata:
+            return EMPTY_METADATA_JSON
+        
+        if self._metadata_json is None or self._metadata_json[0] is not self.metadata:
+            self._metadata_json = (self.metadata, json.dumps(self.metadata))
+        
+        return self._metadata_json[1]
+    
+    def update_metadata(self, values: Dict[str, Any]) -> None:
+        """
+        Add or overwrite metadata entries
+        
+        :param values: Entries to set
+        """
+        self.metadata.update(values)
+        self._metadata_json = None
+    
+    def _as_row(self, metadata: Any) -> Dict[str, Any]:
+        """
+        Build the field dictionary shared by to_dict and to_bigquery_row
         
-        if self.metadata:
-            row['metadata'] = json.dumps(self.metadata)
+        Spelled out rather than using dataclasses.asdict, which deep-copies
+        every field through recursive introspection
         
-        return row
+        :param metadata: Value to use for the metadata field
+        :return: Dictionary of transaction fields in declaration order
+        """
+        return {
+            'date': self.date.isoformat(),
+            'amount': self.amount,
+            'description': self.description,
+            'transaction_id': self.transaction_id,
+            'account_type': self.account_type,
+            'source': self.source,
+            'category': self.category,
+            'subcategory': self.subcategory,
+            'metadata': metadata,
+            'is_recurring': self.is_recurring,
+            'is_transfer': self.is_transfer,
+            'is_income': self.is_income,
+            'is_reimbursable': self.is_reimbursable,
+            'is_ignored': self.is_ignored,
+        }
     
     def matches(self, other: 'Transaction', fuzzy: bool = False) -> bool:
         """
@@ -115,47 +313,58 @@ class Transaction:
             (self.description in other.description or other.description in self.description)
         )
     
-    def categorize(self, category_mappings: Dict[str, Dict[str, str]]) -> None:
+    def categorize(self, category_mappings: Dict[str, Dict[str, str]], 
+                   matcher: Optional[CategoryMatcher] = None) -> None:
         """
         Categorize transaction based on mappings
         
         :param category_mappings: Dictionary mapping regex patterns to categories/subcategories
+        :param matcher: Optional result of compile_category_matcher for the same mappings
         """
         if self.category and self.subcategory:
             return
         
-        desc_lower = self.description.lower()
-        
-        for pattern, category_info in category_mappings.items():
-            if re.search(pattern.lower(), desc_lower):
-                self.category = category_info.get('category')
-                self.subcategory = category_info.get('subcategory')
-                return
-        
-        # Default categorization
-        self.category = "Uncategorized"
-        self.subcategory = None
+        self.category, self.subcategory = match_category(self.description, category_mappings, matcher)
     
-    def detect_recurring(self, transactions: List['Transaction']) -> bool:
+    def detect_recurring(self, transactions: List['Transaction'], 
+                         amount_index: Optional[Dict[int, List['Transaction']]] = None,
+                         similar_cache: Optional[Dict[Tuple[str, float], List['Transaction']]] = None) -> bool:
         """
         Detect if a recurring transaction using transaction history
         
         :param transactions: List of historical transactions to analyze
+        :param amount_index: Optional index from build_amount_index over the same
+            transactions; only same-amount candidates are compared when given
+        :param similar_cache: Optional dictionary shared between calls over the same
+            transactions, so those with the same description and amount are
+            compared against the history only once
         :return: Boolean indicating whether this is recurring
         """
-        # Look for similar transactions
-        similar_transactions = []
-        
-        for tx in transactions:
-            if tx.transaction_id == self.transaction_id:
-                continue
+        cache_key = (self.description, self.amount)
+        all_similar = similar_cache.get(cache_key) if similar_cache is not None else None
+        
+        if all_similar is None:
+            if amount_index is not None:
+                # Neighbouring buckets cover amounts within a cent across a bucket edge
+                key = _amount_key(self.amount)
+                candidates = [tx for k in (key - 1, key, key + 1) for tx in amount_index.get(k, ())]
+            else:
+                candidates = transactions
             
-            # Check for similar amount and description
-            if (abs(tx.amount - self.amount) < 0.01 and
-                self._description_similarity(tx.description, self.description) > 0.8):
-                similar_transactions.append(tx)
+            # Look for similar transactions, by date; this depends only on the cache key
+            all_similar = sorted(
+                (
+                    tx for tx in candidates
+                    if abs(tx.amount - self.amount) < 0.01 and
+                    self._description_similarity(tx.description, self.description) > 0.8
+                ),
+                key=lambda x: x.date
+            )
+            
+            if similar_cache is not None:
+                similar_cache[cache_key] = all_similar
         
-        similar_transactions.sort(key=lambda x: x.date)
+        similar_transactions = [tx for tx in all_similar if tx.transaction_id != self.transaction_id]
         
         # If we have at least 2 similar transactions, check for patterns
         if len(similar_transactions) >= 2:
@@ -181,16 +390,29 @@ class Transaction:
         :return: Similarity score between 0 and 1
         """
         # Basic word overlap ratio
-        words1 = set(desc1.lower().split())
-        words2 = set(desc2.lower().split())
+        words1 = _description_tokens(desc1)
+        words2 = _description_tokens(desc2)
         
         if not words1 or not words2:
             return 0.0
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        intersection = len(words1 & words2)
+        
+        return intersection / (len(words1) + len(words2) - intersection)
+    
+    @staticmethod
+    def build_amount_index(transactions: List['Transaction']) -> Dict[int, List['Transaction']]:
+        """
+        Group transactions by amount for detect_recurring
+        
+        :param transactions: Transactions to index
+        :return: Dictionary mapping amount buckets to transactions
+        """
+        index: Dict[int, List['Transaction']] = {}
+        for tx in transactions:
+            index.setdefault(_amount_key(tx.amount), []).append(tx)
         
-        return len(intersection) / len(union)
+        return index
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Transaction':
@@ -201,40 +423,145 @@ class Transaction:
         :return: Transaction instance
         """
         if 'date' in data and isinstance(data['date'], str):
-            data['date'] = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
+            data['date'] = _parse_iso_datetime(data['date'])
         
         if 'metadata' in data and isinstance(data['metadata'], str):
             data['metadata'] = json.loads(data['metadata'])
         
         return cls(**data)
     
+    @classmethod
+    def from_columns(cls, dates: Iterable[datetime], amounts: Iterable[float], 
+                     descriptions: Iterable[str], account_type: str, source: str) -> List['Transaction']:
+        """
+        Create transactions from parallel columns of values
+        
+        :param dates: Transaction dates
+        :param amounts: Transaction amounts
+        :param descriptions: Transaction descriptions
+        :param account_type: Type of account shared by all transactions
+        :param source: Source identifier shared by all transactions
+        :return: List of Transaction instances
+        """
+        return [
+            cls(date, amount, description, account_type=account_type, source=source)
+            for date, amount, description in zip(dates, amounts, descriptions)
+        ]
+    
     @classmethod
     def from_csv_row(cls, row: Dict[str, Any], source: str, account_type: str) -> 'Transaction':
         """
         Create transaction from CSV row
         
+        For many rows with the same columns, use csv_row_mapper instead
+        
         :param row: Dictionary representing a CSV row
         :param source: Source identifier (e.g., 'chase', 'wells_fargo')
         :param account_type: Type of account (e.g., 'checking', 'credit')
         :return: Transaction instance
         """
-        # Common CSV fields
-        field_mappings = {
-            'date': ['date', 'transaction_date', 'post_date', 'Date'],
-            'amount': ['amount', 'transaction_amount', 'Amount'],
-            'description': ['description', 'merchant', 'memo', 'Description']
+        return cls.csv_row_mapper(row.keys(), source, account_type)(row)
+    
+    @classmethod
+    def csv_row_mapper(cls, columns: Iterable[str], source: str, 
+                       account_type: str) -> Callable[[Dict[str, Any]], 'Transaction']:
+        """
+        Resolve which CSV columns hold each field, once per file
+        
+        :param columns: Column names of the CSV, e.g. csv.DictReader.fieldnames
+        :param source: Source identifier (e.g., 'chase', 'wells_fargo')
+        :param account_type: Type of account (e.g., 'checking', 'credit')
+        :return: Function creating a Transaction from a row with those columns
+        :raises ValueError: If no column matches a required field
+        """
+        columns = set(columns)
+        resolved = {
+            field_name: next((c for c in candidates if c in columns), None)
+            for field_name, candidates in CSV_FIELD_MAPPINGS.items()
         }
         
-        data = {}
+        missing = [field_name for field_name, column in resolved.items() if column is None]
+        if missing:
+            raise ValueError(f"No CSV column found for {', '.join(missing)}")
+        
+        date_column = resolved['date']
+        amount_column = resolved['amount']
+        description_column = resolved['description']
+        
+        def mapper(row: Dict[str, Any]) -> 'Transaction':
+            return cls(
+                row[date_column], 
+                row[amount_column], 
+                row[description_column], 
+                account_type=account_type, 
+                source=source
+            )
         
-        for field, csv_fields in field_mappings.items():
-            for csv_field in csv_fields:
-                if csv_field in row:
-                    data[field] = row[csv_field]
-                    break
+        return mapper
+    
 
-        data['source'] = source
-        data['account_type'] = account_type
+# Pairs compared per block in match_batches, bounding its temporary arrays
+MATCH_BLOCK_PAIRS = 1_000_000
+
+
+def match_batches(a: List[Transaction], b: List[Transaction], fuzzy: bool = False) -> 'np.ndarray':
+    """
+    Check every transaction in one list against every transaction in another
+    
+    Gives the same result as calling Transaction.matches on each pair, with
+    dates and amounts compared as arrays. Descriptions are only compared for
+    pairs whose dates and amounts already match
+    
+    :param a: Transactions for the rows of the result
+    :param b: Transactions for the columns of the result
+    :param fuzzy: Whether to use fuzzy matching criteria
+    :return: Boolean NumPy array where [i, j] is a[i].matches(b[j], fuzzy)
+    """
+    # numpy is only needed here, so plain Transaction use doesn't pay for importing it
+    import numpy as np
+    
+    result = np.zeros((len(a), len(b)), dtype=bool)
+    if not a or not b:
+        return result
+    
+    # Ordinals compare calendar dates the same way date() does
+    a_days = np.fromiter((t.date.toordinal() for t in a), dtype=np.int64, count=len(a))
+    b_days = np.fromiter((t.date.toordinal() for t in b), dtype=np.int64, count=len(b))
+    a_amounts = np.fromiter((t.amount for t in a), dtype=np.float64, count=len(a))
+    b_amounts = np.fromiter((t.amount for t in b), dtype=np.float64, count=len(b))
+    
+    if not fuzzy:
+        # Equal descriptions share a code, so they compare as integers
+        codes: Dict[str, int] = {}
+        a_codes = np.fromiter((codes.setdefault(t.description, len(codes)) for t in a), dtype=np.int64, count=len(a))
+        b_codes = np.fromiter((codes.setdefault(t.description, len(codes)) for t in b), dtype=np.int64, count=len(b))
+    
+    block_rows = max(1, MATCH_BLOCK_PAIRS // len(b))
+    for start in range(0, len(a), block_rows):
+        stop = min(start + block_rows, len(a))
+        days = a_days[start:stop, None]
+        amounts = a_amounts[start:stop, None]
         
-        return cls(**data)
-    
\ No newline at end of file
+        if not fuzzy:
+            result[start:stop] = (
+                (days == b_days[None, :]) &
+                (np.abs(amounts - b_amounts[None, :]) < 0.01) &
+                (a_codes[start:stop, None] == b_codes[None, :])
+            )
+            continue
+        
+        # A zero amount has no percentage difference, so it never matches
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amount_diff_pct = np.abs((amounts - b_amounts[None, :]) / amounts)
+        candidates = (
+            (np.abs(days - b_days[None, :]) <= 2) &
+            (amounts != 0) &
+            (amount_diff_pct < 0.05)
+        )
+        
+        for i, j in zip(*np.nonzero(candidates)):
+            a_desc = a[start + i].description
+            b_desc = b[j].description
+            result[start + i, j] = a_desc in b_desc or b_desc in a_desc
+    
+    return result
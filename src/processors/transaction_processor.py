@@ -6,16 +6,91 @@ data. Handles categorization, deduplication, and enrichment
 """
 
 import os
+import re
+import sys
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+from typing import List, Dict, Any, Optional, Set, Callable, Tuple
+import numpy as np
 import pandas as pd
 
-from src.models.transaction import Transaction
-from src.utils.config import ConfigManager
+from src.models.transaction import Transaction, CategoryMatcher, compile_category_matcher, match_category
+from src.utils.config import get_config_manager
 from src.utils.logger import get_logger
 
 
+# Bank boilerplate removed from the start of descriptions, in the order it's stripped
+DESCRIPTION_PREFIXES = [
+    "DEBIT PURCHASE -", "CREDIT -", "ACH CREDIT -", 
+    "ACH DEBIT -", "POS PURCHASE -"
+]
+
+# Strips every prefix present in a single pass, each with the whitespace after it
+_DESCRIPTION_PREFIX_RE = re.compile(
+    "^" + "".join(f"(?:{re.escape(prefix)} ?)?" for prefix in DESCRIPTION_PREFIXES)
+)
+
+# Description substrings of subscription services and the metadata they add, first match wins
+SUBSCRIPTION_PATTERNS = {
+    'netflix': {'service_type': 'streaming', 'company': 'Netflix'},
+    'spotify': {'service_type': 'streaming', 'company': 'Spotify'},
+    'apple.com/bill': {'service_type': 'digital', 'company': 'Apple'},
+    'amazon prime': {'service_type': 'shopping', 'company': 'Amazon'},
+    'hulu': {'service_type': 'streaming', 'company': 'Hulu'},
+    'disney+': {'service_type': 'streaming', 'company': 'Disney'},
+}
+
+# Description substrings of food delivery services, first match wins
+FOOD_DELIVERY_PATTERNS = {
+    'doordash': 'DoorDash',
+    'uber eats': 'Uber Eats',
+    'grubhub': 'GrubHub',
+    'postmates': 'Postmates',
+}
+
+# Categories whose transactions are flagged as reimbursable
+REIMBURSABLE_CATEGORIES = frozenset({'Healthcare', 'Education', 'Charity'})
+
+# Time that cleaned transaction dates are floored to
+MIDNIGHT = time()
+
+# Batches smaller than this are deduplicated without building a DataFrame
+SMALL_DEDUP_BATCH = 128
+
+# Fewer uncategorized transactions than this are categorized in-process, as
+# starting worker processes would cost more than it saves
+PARALLEL_CATEGORIZE_MIN_ROWS = 50_000
+
+# Descriptions sent to a categorization worker at a time
+CATEGORIZE_CHUNK_ROWS = 10_000
+
+# Category matcher of a categorization worker process, set by _init_category_worker
+_WORKER_MAPPINGS: Dict[str, Dict[str, str]] = {}
+_WORKER_MATCHER: Optional[CategoryMatcher] = None
+
+
+def _init_category_worker(category_mappings: Dict[str, Dict[str, str]]) -> None:
+    """
+    Compile the category matcher once in a categorization worker process
+    
+    :param category_mappings: Dictionary mapping regex patterns to categories/subcategories
+    """
+    global _WORKER_MAPPINGS, _WORKER_MATCHER
+    _WORKER_MAPPINGS = category_mappings
+    _WORKER_MATCHER = compile_category_matcher(category_mappings)
+
+
+def _categorize_descriptions(descriptions: List[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Categorize a chunk of descriptions in a worker process
+    
+    :param descriptions: Transaction descriptions
+    :return: Category and subcategory of each description
+    """
+    return [match_category(description, _WORKER_MAPPINGS, _WORKER_MATCHER) for description in descriptions]
+
+
 class TransactionProcessor:
     """
     Class for processing financial transaction data
@@ -27,10 +102,15 @@ class TransactionProcessor:
     def __init__(self):
         """Initialize the transaction processor"""
         self.logger = get_logger("transaction_processor")
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         
         # Load category mappings
         self.category_mappings = self._load_category_mappings()
+        self.category_matcher = compile_category_matcher(self.category_mappings)
+        
+        # Worker processes for categorizing large batches; 1 keeps it in-process
+        app_config = self.config_manager.load_config().get("app", {})
+        self.max_processing_workers = app_config.get("max_processing_workers", 1)
     
     def _load_category_mappings(self) -> Dict[str, Dict[str, str]]:
         """
@@ -83,36 +163,58 @@ class TransactionProcessor:
         :param transactions: List of transaction objects
         :return: Cleaned list of transaction objects
         """
-        cleaned = []
+        cleaned = [transaction for transaction in transactions if transaction.amount != 0]
         
-        for transaction in transactions:
+        failed = self._apply_each(cleaned, self._clean_transaction, "cleaning")
+        if failed:
+            cleaned = [transaction for i, transaction in enumerate(cleaned) if i not in failed]
+        
+        return cleaned
+    
+    def _clean_transaction(self, transaction: Transaction) -> None:
+        """
+        Clean and standardize a single transaction in place
+        
+        :param transaction: Transaction to clean
+        """
+        # Clean description
+        if transaction.description:
+            transaction.description = _DESCRIPTION_PREFIX_RE.sub(
+                '', ' '.join(transaction.description.split()), count=1
+            )
+        
+        # Most exports only have dates, already at naive midnight; leave those as they are
+        date = transaction.date
+        if date and (date.tzinfo is not None or date.time() != MIDNIGHT):
+            transaction.date = datetime.combine(date.date(), MIDNIGHT)
+    
+    def _apply_each(self, transactions: List[Transaction], 
+                    action: Callable[[Transaction], None], description: str) -> Set[int]:
+        """
+        Apply an action to each transaction, logging and skipping any it fails on
+        
+        The loop sits in a single try block that is only re-entered after a
+        failure, so transactions that succeed pay no per-row exception setup
+        
+        :param transactions: Transactions to act on
+        :param action: Function applied to each transaction
+        :param description: What the action does, for error messages (e.g. 'cleaning')
+        :return: Positions of the transactions the action failed on
+        """
+        failed = set()
+        position = 0
+        
+        while position < len(transactions):
             try:
-                if transaction.amount == 0:
-                    continue
-                
-                # Clean description
-                if transaction.description:
-                    transaction.description = ' '.join(transaction.description.split())
-                    prefixes_to_remove = [
-                        "DEBIT PURCHASE -", "CREDIT -", "ACH CREDIT -", 
-                        "ACH DEBIT -", "POS PURCHASE -"
-                    ]
-                    for prefix in prefixes_to_remove:
-                        if transaction.description.startswith(prefix):
-                            transaction.description = transaction.description[len(prefix):].strip()
-                
-                if transaction.date:
-                    transaction.date = datetime.combine(
-                        transaction.date.date(), 
-                        datetime.min.time()
-                    )
-                
-                cleaned.append(transaction)
-                
+                for position in range(position, len(transactions)):
+                    action(transactions[position])
+                break
             except Exception as e:
-                self.logger.error(f"Error cleaning transaction: {str(e)}")
+                self.logger.error(f"Error {description} transaction: {str(e)}")
+                failed.add(position)
+                position += 1
         
-        return cleaned
+        return failed
     
     def _deduplicate_transactions(self, transactions: List[Transaction]) -> List[Transaction]:
         """
@@ -124,51 +226,99 @@ class TransactionProcessor:
         if not transactions:
             return []
         
-        # Convert to DataFrame
-        df_rows = [t.to_dict() for t in transactions]
-        df = pd.DataFrame(df_rows)
+        if len(transactions) < SMALL_DEDUP_BATCH:
+            return self._deduplicate_small(transactions)
         
-        df['date_str'] = df['date'].apply(lambda x: x.split('T')[0] if isinstance(x, str) else x.strftime('%Y-%m-%d'))
-        df['amount_rounded'] = df['amount'].round(2)
+        # Convert the compared fields to a DataFrame, one row per transaction;
+        # calendar days are compared as ordinals rather than formatted strings,
+        # and descriptions and account types as integer codes
+        count = len(transactions)
+        amounts = np.fromiter((t.amount for t in transactions), dtype=np.float64, count=count)
+        descriptions = np.array([t.description for t in transactions], dtype=object)
+        df = pd.DataFrame({
+            'day': np.fromiter((t.date.toordinal() for t in transactions), dtype=np.int64, count=count),
+            'amount_rounded': np.round(amounts, 2),
+            'description': pd.factorize(descriptions)[0],
+            'account_type': pd.Categorical([t.account_type for t in transactions]),
+            'transaction_id': [t.transaction_id for t in transactions],
+        })
         
-        # Deduplicate based on date, amount, and description
-        df_dedup = df.drop_duplicates(subset=['date_str', 'amount_rounded', 'description'])
+        # Deduplicate based on date, amount, and description, as a mask over the rows
+        keep = ~df.duplicated(subset=['day', 'amount_rounded', 'description'], keep='first').to_numpy()
         
         # Filter out payment transfers between accounts when both sides are present
         # (e.g., credit card payments from checking account)
-        transfer_pairs = []
         
-        # Find potential transfer pairs (same date, opposite amounts)
-        for account in df_dedup['account_type'].unique():
-            df_account = df_dedup[df_dedup['account_type'] == account]
+        # Find transfer pairs (same date, opposite amounts) with one hash join;
+        # whole cents make the opposite amount an exact key. Only integer
+        # columns go through the join, with rows referenced by position
+        keys = pd.DataFrame({
+            'day': df['day'].to_numpy()[keep],
+            'cents': np.round(df['amount_rounded'].to_numpy()[keep] * 100).astype(np.int64),
+            'account_type': df['account_type'].cat.codes.to_numpy()[keep],
+        })
+        keys['row'] = np.arange(len(keys))
+        opposite = keys.assign(cents=-keys['cents'])
+        pairs = keys.merge(opposite, on=['day', 'cents'], suffixes=('_a', '_b'))
+        pairs = pairs[pairs['account_type_a'] != pairs['account_type_b']]
+        
+        # Transfers are marked by ID, so every kept row sharing a paired row's ID is marked
+        id_codes, unique_ids = pd.factorize(df['transaction_id'].to_numpy()[keep])
+        paired_ids = np.zeros(len(unique_ids), dtype=bool)
+        paired_ids[id_codes[pairs['row_a'].to_numpy()]] = True
+        paired_ids[id_codes[pairs['row_b'].to_numpy()]] = True
+        in_pair = paired_ids[id_codes]
+        
+        # Keep the surviving transactions themselves and mark transfers
+        result = []
+        for position, is_transfer in zip(np.flatnonzero(keep).tolist(), in_pair.tolist()):
+            transaction = transactions[position]
+            if is_transfer:
+                transaction.is_transfer = True
+            result.append(transaction)
+        
+        return result
+    
+    def _deduplicate_small(self, transactions: List[Transaction]) -> List[Transaction]:
+        """
+        Remove duplicate transactions with plain dictionaries
+        
+        Gives the same result as the DataFrame path in _deduplicate_transactions,
+        without its fixed setup cost, which dominates for small batches
+        
+        :param transactions: List of transaction objects
+        :return: Deduplicated list of transaction objects
+        """
+        kept = []
+        seen = set()
+        by_day_amount: Dict[Tuple[int, int], List[Transaction]] = {}
+        
+        for transaction in transactions:
+            # Rounds half to even like np.round, so both paths agree on cents
+            day = transaction.date.toordinal()
+            cents = round(transaction.amount * 100)
+            
+            key = (day, cents, transaction.description)
+            if key in seen:
+                continue
+            seen.add(key)
             
-            for _, row in df_account.iterrows():
-                potential_matches = df_dedup[
-                    (df_dedup['date_str'] == row['date_str']) & 
-                    (abs(df_dedup['amount_rounded'] + row['amount_rounded']) < 0.01) &
-                    (df_dedup['account_type'] != row['account_type'])
-                ]
-                
-                if len(potential_matches) > 0:
-                    for _, match_row in potential_matches.iterrows():
-                        if row['transaction_id'] < match_row['transaction_id']:
-                            transfer_pairs.append((row['transaction_id'], match_row['transaction_id']))
-                        else:
-                            transfer_pairs.append((match_row['transaction_id'], row['transaction_id']))
-        
-        # Mark transfers
-        for tx_id1, tx_id2 in transfer_pairs:
-            df_dedup.loc[df_dedup['transaction_id'] == tx_id1, 'is_transfer'] = True
-            df_dedup.loc[df_dedup['transaction_id'] == tx_id2, 'is_transfer'] = True
-        
-        # Convert back to transaction objects
+            kept.append((transaction, day, cents))
+            by_day_amount.setdefault((day, cents), []).append(transaction)
+        
+        # Transfers have an opposite amount on the same day in another account
+        transfer_ids = {
+            transaction.transaction_id
+            for transaction, day, cents in kept
+            if any(other.account_type != transaction.account_type
+                   for other in by_day_amount.get((day, -cents), ()))
+        }
+        
         result = []
-        for _, row in df_dedup.iterrows():
-            row_dict = row.to_dict()
-            row_dict.pop('date_str', None)
-            row_dict.pop('amount_rounded', None)
-          
-            result.append(Transaction.from_dict(row_dict))
+        for transaction, _, _ in kept:
+            if transaction.transaction_id in transfer_ids:
+                transaction.is_transfer = True
+            result.append(transaction)
         
         return result
     
@@ -183,18 +333,52 @@ class TransactionProcessor:
             self.logger.warning("No category mappings available, skipping categorization")
             return transactions
         
-        for transaction in transactions:
+        uncategorized = [transaction for transaction in transactions if not transaction.category]
+        
+        if self.max_processing_workers > 1 and len(uncategorized) >= PARALLEL_CATEGORIZE_MIN_ROWS:
             try:
-                if transaction.category:
-                    continue
-
-                transaction.categorize(self.category_mappings)
-                
+                self._categorize_in_workers(uncategorized)
+                return transactions
             except Exception as e:
-                self.logger.error(f"Error categorizing transaction: {str(e)}")
+                self.logger.warning(f"Parallel categorization failed, categorizing in-process: {str(e)}")
+        
+        self._apply_each(
+            uncategorized,
+            lambda transaction: transaction.categorize(self.category_mappings, self.category_matcher),
+            "categorizing"
+        )
         
         return transactions
     
+    def _categorize_in_workers(self, transactions: List[Transaction]) -> None:
+        """
+        Categorize transactions across worker processes
+        
+        Only descriptions are sent to the workers and only categories come
+        back; the transactions themselves stay in this process
+        
+        :param transactions: Uncategorized transactions
+        """
+        descriptions = [transaction.description for transaction in transactions]
+        chunks = [
+            descriptions[start:start + CATEGORIZE_CHUNK_ROWS]
+            for start in range(0, len(descriptions), CATEGORIZE_CHUNK_ROWS)
+        ]
+        
+        self.logger.debug(f"Categorizing {len(transactions)} transactions in {len(chunks)} chunks")
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_processing_workers, len(chunks)),
+            initializer=_init_category_worker,
+            initargs=(self.category_mappings,)
+        ) as executor:
+            results = [result for chunk_results in executor.map(_categorize_descriptions, chunks)
+                       for result in chunk_results]
+        
+        for transaction, (category, subcategory) in zip(transactions, results):
+            # Categories come back as new strings; share them again like categorize() does
+            transaction.category = sys.intern(category) if category else category
+            transaction.subcategory = sys.intern(subcategory) if subcategory else subcategory
+    
     def _enrich_transactions(self, transactions: List[Transaction]) -> List[Transaction]:
         """
         Enrich transactions with info and flags
@@ -202,19 +386,21 @@ class TransactionProcessor:
         :param transactions: List of transaction objects
         :return: List of enriched transaction objects
         """
-        # Detect recurring transactions
-        for transaction in transactions:
-            try:
-                if not transaction.is_recurring:
-                    transaction.detect_recurring(transactions)
+        # Only transactions with the same amount can be recurring matches
+        amount_index = Transaction.build_amount_index(transactions)
+        similar_cache = {}
+        
+        def enrich(transaction: Transaction) -> None:
+            # Detect recurring transactions
+            if not transaction.is_recurring:
+                transaction.detect_recurring(transactions, amount_index, similar_cache)
 
-                self._add_merchant_metadata(transaction)
+            self._add_merchant_metadata(transaction)
 
-                if transaction.category in ['Healthcare', 'Education', 'Charity']:
-                    transaction.is_reimbursable = True
-                
-            except Exception as e:
-                self.logger.error(f"Error enriching transaction: {str(e)}")
+            if transaction.category in REIMBURSABLE_CATEGORIES:
+                transaction.is_reimbursable = True
+        
+        self._apply_each(transactions, enrich, "enriching")
         
         return transactions
     
@@ -227,30 +413,14 @@ class TransactionProcessor:
         desc_lower = transaction.description.lower()
         
         # Subscription services
-        subscription_patterns = {
-            'netflix': {'service_type': 'streaming', 'company': 'Netflix'},
-            'spotify': {'service_type': 'streaming', 'company': 'Spotify'},
-            'apple.com/bill': {'service_type': 'digital', 'company': 'Apple'},
-            'amazon prime': {'service_type': 'shopping', 'company': 'Amazon'},
-            'hulu': {'service_type': 'streaming', 'company': 'Hulu'},
-            'disney+': {'service_type': 'streaming', 'company': 'Disney'},
-        }
-        
-        for pattern, metadata in subscription_patterns.items():
+        for pattern, metadata in SUBSCRIPTION_PATTERNS.items():
             if pattern in desc_lower:
-                transaction.metadata.update(metadata)
+                transaction.update_metadata(metadata)
                 transaction.is_recurring = True
                 break
         
         # Food delivery
-        food_delivery_patterns = {
-            'doordash': 'DoorDash',
-            'uber eats': 'Uber Eats',
-            'grubhub': 'GrubHub',
-            'postmates': 'Postmates',
-        }
-        
-        for pattern, service in food_delivery_patterns.items():
+        for pattern, service in FOOD_DELIVERY_PATTERNS.items():
             if pattern in desc_lower:
-                transaction.metadata['delivery_service'] = service
+                transaction.update_metadata({'delivery_service': service})
                 break
@@ -4,12 +4,21 @@ Utilities package
 Mdules used throughout application
 """
 
-from src.utils.config import ConfigManager
+from src.utils.config import ConfigManager, get_config_manager
 from src.utils.logger import get_logger, setup_logger, set_global_log_level
+from src.utils.dom import detect_first_match, has_blocking_page_load, snapshot_text
+from src.utils.prompt import prompt_lock, prompt_user, prompt_with_timeout
 
 __all__ = [
     'ConfigManager',
+    'get_config_manager',
     'get_logger',
     'setup_logger',
     'set_global_log_level',
+    'detect_first_match',
+    'has_blocking_page_load',
+    'snapshot_text',
+    'prompt_lock',
+    'prompt_user',
+    'prompt_with_timeout',
 ]
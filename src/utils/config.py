@@ -7,15 +7,27 @@ env variables, and provides access to specific config sections
 """
 
 import os
+import functools
 import yaml
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 from src.utils.logger import get_logger
 
+# libyaml's parser when PyYAML was built with it, otherwise the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson parses JSON faster when installed (the "fast-json" extra); json otherwise
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 
 class ConfigManager:
     """
@@ -41,8 +53,40 @@ class ConfigManager:
             self.config_dir = Path(__file__).parents[2] / "config"
         
         self._config_cache = {}
-        self._bank_configs = {}
-        self._category_mappings = None
+        # Parsed config files with the modification time they were parsed at
+        self._file_cache: Dict[Path, Tuple[int, Any]] = {}
+        # Merged bank configs with the parsed file and credentials they were merged from
+        self._bank_configs: Dict[str, Tuple[Any, Tuple[Optional[str], Optional[str]], Dict[str, Any]]] = {}
+    
+    def _read_file(self, path: Path, parse: Callable[[bytes], Any]) -> Any:
+        """
+        Read a config file, reusing the parsed result while the file is unchanged
+        
+        :param path: Path of the file
+        :param parse: Function parsing the file's contents
+        :return: Parsed file contents
+        :raises FileNotFoundError: If the file doesn't exist
+        """
+        mtime_ns = path.stat().st_mtime_ns
+        
+        cached = self._file_cache.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        
+        data = parse(path.read_bytes())
+        
+        self._file_cache[path] = (mtime_ns, data)
+        return data
+    
+    def _read_yaml(self, path: Path) -> Any:
+        """
+        Read a YAML file, reusing the parsed result while the file is unchanged
+        
+        :param path: Path of the YAML file
+        :return: Parsed file contents
+        :raises FileNotFoundError: If the file doesn't exist
+        """
+        return self._read_file(path, lambda data: yaml.load(data, Loader=_YamlLoader))
     
     def load_config(self) -> Dict[str, Any]:
         """
@@ -50,26 +94,22 @@ class ConfigManager:
         
         :return: Dictionary of configuration settings
         """
-        if "main" in self._config_cache:
-            return self._config_cache["main"]
-        
         try:
             # Load main settings
             settings_file = self.config_dir / "settings.yaml"
+            config = self._read_yaml(settings_file)
             
-            if not settings_file.exists():
-                self.logger.warning(f"Settings file not found: {settings_file}")
-                self._config_cache["main"] = {}
-                return {}
-            
-            with open(settings_file, "r") as f:
-                config = yaml.safe_load(f)
+            if self._config_cache.get("main") is not config:
+                self.logger.debug("Loaded main configuration")
             
             self._config_cache["main"] = config
-            
-            self.logger.debug("Loaded main configuration")
             return config
             
+        except FileNotFoundError:
+            if "main" not in self._config_cache:
+                self.logger.warning(f"Settings file not found: {settings_file}")
+            self._config_cache["main"] = {}
+            return {}
         except Exception as e:
             self.logger.error(f"Error loading configuration: {str(e)}")
             self._config_cache["main"] = {}
@@ -82,37 +122,37 @@ class ConfigManager:
         :param bank_id: Identifier for the bank
         :return: Dictionary of bank-specific configuration settings
         """
-        if bank_id in self._bank_configs:
-            return self._bank_configs[bank_id]
+        username_env = f"{bank_id.upper()}_USERNAME"
+        password_env = f"{bank_id.upper()}_PASSWORD"
+        credentials = (os.environ.get(username_env), os.environ.get(password_env))
         
         try:
             bank_config_file = self.config_dir / "banks" / f"{bank_id.lower()}.yaml"
+            file_config = self._read_yaml(bank_config_file)
             
-            if not bank_config_file.exists():
-                self.logger.warning(f"Config file not found for bank: {bank_id}")
-                self._bank_configs[bank_id] = {}
-                return {}
-            
-            with open(bank_config_file, "r") as f:
-                config = yaml.safe_load(f)
+            # Reuse the merged config unless the file or the credentials changed
+            cached = self._bank_configs.get(bank_id)
+            if cached is not None and cached[0] is file_config and cached[1] == credentials:
+                return cached[2]
             
-            username_env = f"{bank_id.upper()}_USERNAME"
-            password_env = f"{bank_id.upper()}_PASSWORD"
+            config = dict(file_config)
             
-            if username_env in os.environ:
-                config["username"] = os.environ[username_env]
+            if credentials[0] is not None:
+                config["username"] = credentials[0]
             
-            if password_env in os.environ:
-                config["password"] = os.environ[password_env]
+            if credentials[1] is not None:
+                config["password"] = credentials[1]
             
-            self._bank_configs[bank_id] = config
+            self._bank_configs[bank_id] = (file_config, credentials, config)
             
             self.logger.debug(f"Loaded configuration for bank: {bank_id}")
             return config
             
+        except FileNotFoundError:
+            self.logger.warning(f"Config file not found for bank: {bank_id}")
+            return {}
         except Exception as e:
             self.logger.error(f"Error loading bank configuration for {bank_id}: {str(e)}")
-            self._bank_configs[bank_id] = {}
             return {}
     
     def get_category_mappings(self) -> Dict[str, Dict[str, str]]:
@@ -121,28 +161,24 @@ class ConfigManager:
         
         :return: Dictionary mapping patterns to category information
         """
-        if self._category_mappings is not None:
-            return self._category_mappings
-        
         try:
             mappings_file = self.config_dir / "mappings.json"
+            mappings = self._read_file(mappings_file, _json_loads)
             
-            if not mappings_file.exists():
-                self.logger.warning(f"Mappings file not found: {mappings_file}")
-                self._category_mappings = {}
-                return {}
-            
-            with open(mappings_file, "r") as f:
-                mappings = json.load(f)
+            if self._config_cache.get("mappings") is not mappings:
+                self.logger.debug(f"Loaded {len(mappings)} category mappings")
             
-            self._category_mappings = mappings
-            
-            self.logger.debug(f"Loaded {len(mappings)} category mappings")
+            self._config_cache["mappings"] = mappings
             return mappings
             
+        except FileNotFoundError:
+            if "mappings" not in self._config_cache:
+                self.logger.warning(f"Mappings file not found: {mappings_file}")
+            self._config_cache["mappings"] = {}
+            return {}
         except Exception as e:
             self.logger.error(f"Error loading category mappings: {str(e)}")
-            self._category_mappings = {}
+            self._config_cache["mappings"] = {}
             return {}
     
     def get_bigquery_config(self) -> Dict[str, Any]:
@@ -153,7 +189,8 @@ class ConfigManager:
             Dictionary of BigQuery configuration settings
         """
         config = self.load_config()
-        bq_config = config.get("bigquery", {})
+        # A copy, as the loaded settings are shared with every other caller
+        bq_config = dict(config.get("bigquery") or {})
         
         if "BIGQUERY_PROJECT_ID" in os.environ:
             bq_config["project_id"] = os.environ["BIGQUERY_PROJECT_ID"]
@@ -189,4 +226,14 @@ class ConfigManager:
         except Exception as e:
             self.logger.error(f"Error getting bank list: {str(e)}")
             return []
+
+
+@functools.lru_cache(maxsize=1)
+def get_config_manager() -> ConfigManager:
+    """
+    Get the process-wide config manager, so config files are read once
+    
+    :return: Shared ConfigManager for the default config directory
+    """
+    return ConfigManager()
         
\ No newline at end of file
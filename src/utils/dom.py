@@ -0,0 +1,83 @@
+"""
+DOM Utilities Module
+
+Helpers for probing the browser DOM in a single WebDriver round trip
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Evaluates groups of CSS selectors / XPath expressions in the browser and
+# returns the name of the first group with a matching element
+_DETECT_FIRST_MATCH_SCRIPT = """
+const groups = arguments[0];
+for (const [name, selectors] of groups) {
+    for (const selector of selectors) {
+        const found = selector.startsWith('//')
+            ? document.evaluate(selector, document, null,
+                  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : document.querySelector(selector);
+        if (found) {
+            return name;
+        }
+    }
+}
+return null;
+"""
+
+# Returns the visible text of the first element matching each named selector
+_SNAPSHOT_TEXT_SCRIPT = """
+const selectors = arguments[0];
+const snapshot = {};
+for (const [name, selector] of Object.entries(selectors)) {
+    const found = selector.startsWith('//')
+        ? document.evaluate(selector, document, null,
+              XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    snapshot[name] = found ? found.innerText : null;
+}
+return snapshot;
+"""
+
+
+def detect_first_match(driver: Any, groups: Sequence[Tuple[str, Sequence[str]]]) -> Optional[str]:
+    """
+    Find the first group of selectors with an element present on the page
+    
+    Selectors starting with '//' are treated as XPath, all others as CSS.
+    All selectors are evaluated in one execute_script call instead of one
+    find_elements call per selector
+    
+    :param driver: Selenium WebDriver instance
+    :param groups: Ordered sequence of (name, selectors) pairs
+    :return: Name of the first matching group
+    """
+    payload: List[List[Any]] = [[name, list(selectors)] for name, selectors in groups]
+    return driver.execute_script(_DETECT_FIRST_MATCH_SCRIPT, payload)
+
+
+def has_blocking_page_load(driver: Any) -> bool:
+    """
+    Check whether the driver waits for full page loads before commands
+    
+    Detection probes only need the current DOM, so drivers should be
+    created with the 'eager' or 'none' page load strategy
+    
+    :param driver: Selenium WebDriver instance
+    :return: Boolean indicating whether the 'normal' strategy is in use
+    """
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return capabilities.get("pageLoadStrategy", "normal") == "normal"
+
+
+def snapshot_text(driver: Any, selectors: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """
+    Read the text of several elements in one WebDriver round trip
+    
+    Selectors starting with '//' are treated as XPath, all others as CSS
+    
+    :param driver: Selenium WebDriver instance
+    :param selectors: Dictionary mapping names to selectors
+    :return: Dictionary mapping names to element text, or None if not found
+    """
+    return driver.execute_script(_SNAPSHOT_TEXT_SCRIPT, selectors) or {}
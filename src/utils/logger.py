@@ -7,11 +7,32 @@ Standardized logging functionality for the application
 import os
 import sys
 import logging
+import functools
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Optional
 
 _LOGGERS: Dict[str, logging.Logger] = {}
+_LOGGERS_LOCK = threading.Lock()
+
+# Format shared by every handler
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _log_dir() -> Path:
+    """
+    Get the log file directory, creating it on first use
+    
+    :return: Path of the log directory
+    """
+    log_dir = Path(__file__).parents[2] / "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
 
 
 def setup_logger(name: str, level: int = logging.INFO, 
@@ -24,9 +45,27 @@ def setup_logger(name: str, level: int = logging.INFO,
     :param log_to_file: Whether to log to file in addition to console
     :return: Configured logging.Logger instance
     """
-    if name in _LOGGERS:
+    logger = _LOGGERS.get(name)
+    if logger is not None:
+        return logger
+    
+    # Configure each logger once, even when threads ask for it at the same time
+    with _LOGGERS_LOCK:
+        if name not in _LOGGERS:
+            _LOGGERS[name] = _create_logger(name, level, log_to_file)
+        
         return _LOGGERS[name]
+
+
+def _create_logger(name: str, level: int, log_to_file: bool) -> logging.Logger:
+    """
+    Create a logger with console and optional file handlers
     
+    :param name: Name for the logger
+    :param level: Logging level (e.g., logging.INFO, logging.DEBUG)
+    :param log_to_file: Whether to log to file in addition to console
+    :return: Configured logging.Logger instance
+    """
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -40,30 +79,21 @@ def setup_logger(name: str, level: int = logging.INFO,
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
     
     # Add file handler
     if log_to_file:
-        log_dir = Path(__file__).parents[2] / "logs"
-        os.makedirs(log_dir, exist_ok=True)
-        
         date_str = datetime.now().strftime('%Y%m%d')
-        log_file = log_dir / f"{date_str}_{name}.log"
+        log_file = _log_dir() / f"{date_str}_{name}.log"
 
-        file_handler = logging.FileHandler(log_file)
+        # The file is only opened once the logger writes something
+        file_handler = logging.FileHandler(log_file, delay=True)
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_FORMATTER)
 
         logger.addHandler(file_handler)
     
-    _LOGGERS[name] = logger
-    
     return logger
 
 
@@ -74,10 +104,11 @@ def get_logger(name: str) -> logging.Logger:
     :param name: Name of the logger
     :return: Logger instance
     """
-    if name in _LOGGERS:
-        return _LOGGERS[name]
-    else:
-        return setup_logger(name)
+    logger = _LOGGERS.get(name)
+    if logger is not None:
+        return logger
+    
+    return setup_logger(name)
 
 
 def set_global_log_level(level: int) -> None:
@@ -86,7 +117,8 @@ def set_global_log_level(level: int) -> None:
     
     :param level: Logging level (e.g., logging.INFO, logging.DEBUG)
     """
-    for logger_name, logger in _LOGGERS.items():
+    # Copied, as another thread may be adding a logger
+    for logger in list(_LOGGERS.values()):
         logger.setLevel(level)
         for handler in logger.handlers:
             handler.setLevel(level)
@@ -0,0 +1,52 @@
+"""
+Prompt Utilities Module
+
+Console prompts that give up after a timeout instead of blocking forever,
+taken one at a time so concurrent bank sessions never read each other's input
+"""
+
+import os
+import sys
+import select
+import threading
+from typing import Optional
+
+# Held while a prompt is shown and answered; re-entrant so a caller holding it
+# across several prints and reads can still use the helpers below
+prompt_lock = threading.RLock()
+
+
+def prompt_with_timeout(prompt: str, timeout: float) -> Optional[str]:
+    """
+    Prompt the user for a line of input, waiting at most timeout seconds
+    
+    On Windows, where select() does not support stdin, this falls back
+    to a blocking input() call
+    
+    :param prompt: Prompt text to display
+    :param timeout: Maximum time to wait for input in seconds
+    :return: Line entered by the user, or None on timeout
+    """
+    with prompt_lock:
+        if os.name == "nt":
+            return input(prompt)
+        
+        print(prompt, end="", flush=True)
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        
+        if not ready:
+            print()
+            return None
+        
+        return sys.stdin.readline().rstrip("\n")
+
+
+def prompt_user(prompt: str) -> str:
+    """
+    Prompt the user for a line of input, waiting as long as it takes
+    
+    :param prompt: Prompt text to display
+    :return: Line entered by the user
+    """
+    with prompt_lock:
+        return input(prompt)
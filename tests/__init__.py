@@ -0,0 +1,5 @@
+"""
+Test package
+
+Unit tests for the finance data pipeline
+"""
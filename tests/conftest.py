@@ -0,0 +1,23 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from src.utils import logger as logger_module
+
+
+@pytest.fixture(scope="session", autouse=True)
+def log_dir(tmp_path_factory):
+    """
+    Send log files to a temporary directory instead of the repo's logs/
+    
+    Session-scoped so it is in place before any other fixture creates a logger
+    
+    :return: Path of the temporary log directory
+    """
+    path = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(logger_module, "_log_dir", lambda: path)
+        patch.setattr(logger_module, "_LOGGERS", {})
+        yield path
@@ -0,0 +1,80 @@
+"""
+Tests for CAPTCHA solution submission and OCR gating
+"""
+
+import string
+
+from selenium.common.exceptions import NoSuchElementException
+
+from src.auth.captcha_solver import CaptchaSolver, _OCR_CHAR_WHITELIST
+
+
+class _FakeElement:
+    """Element that records input and clicks"""
+    
+    def __init__(self, attributes=None, on_click=None):
+        self.attributes = attributes or {}
+        self.on_click = on_click
+        self.keys = ""
+    
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+    
+    def clear(self):
+        self.keys = ""
+    
+    def send_keys(self, keys):
+        self.keys += keys
+    
+    def click(self):
+        if self.on_click:
+            self.on_click()
+
+
+class _FakeDriver:
+    """Driver with a CAPTCHA form that either navigates or shows an error on submit"""
+    
+    def __init__(self, accept: bool, input_attributes=None):
+        self.current_url = "https://bank.example/captcha"
+        self.error_shown = False
+        self.accept = accept
+        self.input = _FakeElement(input_attributes or {"type": "text"})
+        self.submit = _FakeElement(on_click=self._submitted)
+    
+    def _submitted(self):
+        if self.accept:
+            self.current_url = "https://bank.example/accounts"
+        else:
+            self.error_shown = True
+    
+    def find_element(self, by, selector):
+        if "captcha" in selector:
+            return self.input
+        if "submit" in selector:
+            return self.submit
+        if self.error_shown:
+            return _FakeElement()
+        raise NoSuchElementException(selector)
+    
+    def find_elements(self, by, selector):
+        return [self.input] if "captcha" in selector else []
+
+
+def test_submit_solution_accepted_on_navigation():
+    driver = _FakeDriver(accept=True)
+    
+    assert CaptchaSolver()._submit_solution(driver, "ab12") is True
+    assert driver.input.keys == "ab12"
+
+
+def test_submit_solution_rejected_when_error_appears():
+    assert CaptchaSolver()._submit_solution(_FakeDriver(accept=False), "wrong") is False
+
+
+def test_ocr_whitelist_follows_input_type():
+    solver = CaptchaSolver()
+    
+    assert solver._ocr_whitelist(_FakeDriver(True, {"type": "text"})) == _OCR_CHAR_WHITELIST
+    assert solver._ocr_whitelist(_FakeDriver(True, {"type": "tel"})) == string.digits
+    assert solver._ocr_whitelist(_FakeDriver(True, {"type": "text", "inputmode": "numeric"})) == string.digits
+    assert solver._ocr_whitelist(_FakeDriver(True, {"type": "checkbox"})) is None
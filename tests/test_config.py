@@ -0,0 +1,59 @@
+"""
+Tests for the configuration manager's cached file reads
+"""
+
+import os
+import json
+
+from src.utils.config import ConfigManager
+
+
+def test_category_mappings_missing_file(tmp_path):
+    assert ConfigManager(str(tmp_path)).get_category_mappings() == {}
+
+
+def test_category_mappings_reread_when_file_changes(tmp_path):
+    mappings_file = tmp_path / "mappings.json"
+    mappings_file.write_text(json.dumps({"coffee": {"category": "Food"}}))
+    manager = ConfigManager(str(tmp_path))
+    
+    first = manager.get_category_mappings()
+    assert first == {"coffee": {"category": "Food"}}
+    assert manager.get_category_mappings() is first
+    
+    mappings_file.write_text(json.dumps({"rent": {"category": "Housing"}}))
+    stat = mappings_file.stat()
+    os.utime(mappings_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    
+    assert manager.get_category_mappings() == {"rent": {"category": "Housing"}}
+    
+    mappings_file.unlink()
+    assert manager.get_category_mappings() == {}
+
+
+def test_yaml_settings_cached_until_modified(tmp_path):
+    settings_file = tmp_path / "settings.yaml"
+    settings_file.write_text("app:\n  max_processing_workers: 2\n")
+    manager = ConfigManager(str(tmp_path))
+    
+    config = manager.load_config()
+    assert config["app"]["max_processing_workers"] == 2
+    assert manager.load_config() is config
+
+
+def test_bigquery_env_overrides_leave_cached_settings_untouched(tmp_path, monkeypatch):
+    (tmp_path / "settings.yaml").write_text("bigquery:\n  project_id: from-file\n")
+    monkeypatch.setenv("BIGQUERY_PROJECT_ID", "from-env")
+    monkeypatch.setenv("BIGQUERY_DATASET_ID", "dataset")
+    manager = ConfigManager(str(tmp_path))
+    
+    assert manager.get_bigquery_config() == {"project_id": "from-env", "dataset_id": "dataset"}
+    assert manager.load_config()["bigquery"] == {"project_id": "from-file"}
+    
+    no_section_dir = tmp_path / "no_section"
+    no_section_dir.mkdir()
+    (no_section_dir / "settings.yaml").write_text("app:\n  log_level: INFO\n")
+    manager = ConfigManager(str(no_section_dir))
+    
+    assert manager.get_bigquery_config() == {"project_id": "from-env", "dataset_id": "dataset"}
+    assert "bigquery" not in manager.load_config()
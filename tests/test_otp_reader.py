@@ -0,0 +1,274 @@
+"""
+Tests for the OTP reader's osascript helper and message parsing
+"""
+
+import os
+import re
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.auth import otp_reader
+from src.auth.otp_reader import OTPReader, OSA_SENTINEL
+
+
+class _FakeStdin:
+    """Stdin of the fake helper; writes its whole reply to stdout on flush"""
+    
+    def __init__(self, stdout_fd: int, reply: bytes):
+        self._stdout_fd = stdout_fd
+        self._reply = reply
+        self.written = b""
+    
+    def write(self, data: bytes) -> None:
+        self.written += data
+    
+    def flush(self) -> None:
+        # One write, so the result and the sentinel arrive in a single read
+        os.write(self._stdout_fd, self._reply)
+    
+    def close(self) -> None:
+        pass
+
+
+class _FakeStdout:
+    """Read end of the pipe the fake helper replies on"""
+    
+    def __init__(self, fd: int):
+        self._fd = fd
+    
+    def fileno(self) -> int:
+        return self._fd
+
+
+class _FakePopen:
+    """Stand-in for an `osascript -i` process"""
+    
+    reply = b""
+    
+    def __init__(self, *args, **kwargs):
+        read_fd, self._write_fd = os.pipe()
+        self.stdout = _FakeStdout(read_fd)
+        self.stdin = _FakeStdin(self._write_fd, self.reply)
+    
+    def poll(self):
+        return None
+    
+    def terminate(self) -> None:
+        os.close(self.stdout.fileno())
+        os.close(self._write_fd)
+    
+    def wait(self, timeout=None) -> int:
+        return 0
+    
+    def kill(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_osascript(monkeypatch):
+    def install(reply: bytes):
+        monkeypatch.setattr(_FakePopen, "reply", reply)
+        monkeypatch.setattr(otp_reader.subprocess, "Popen", _FakePopen)
+        monkeypatch.setattr(otp_reader, "OSA_READ_TIMEOUT", 2)
+    
+    return install
+
+
+def test_result_and_sentinel_in_one_chunk(fake_osascript):
+    fake_osascript(f'"12\tYour code is 123456"\n"{OSA_SENTINEL}"\n'.encode())
+    reader = OTPReader()
+    
+    assert reader._run_applescript("return 1") == ["12\tYour code is 123456"]
+    assert reader._osa is not None
+    reader.close()
+
+
+def test_interactive_prompt_prefixes_are_ignored(fake_osascript):
+    fake_osascript(f'>> => "5\tcode 654321"\n=> "{OSA_SENTINEL}"\n'.encode())
+    reader = OTPReader()
+    
+    assert reader._run_applescript("return 1") == ["5\tcode 654321"]
+    reader.close()
+
+
+def test_line_split_across_chunks(fake_osascript, monkeypatch):
+    fake_osascript(f'"7\tcode 111222"\n"{OSA_SENTINEL}"\n'.encode())
+    monkeypatch.setattr(otp_reader, "OSA_READ_SIZE", 3)
+    reader = OTPReader()
+    
+    assert reader._run_applescript("return 1") == ["7\tcode 111222"]
+    reader.close()
+
+
+def test_missing_sentinel_returns_none(fake_osascript, monkeypatch):
+    fake_osascript(b'"partial output"\n')
+    monkeypatch.setattr(otp_reader, "OSA_READ_TIMEOUT", 0.2)
+    reader = OTPReader()
+    
+    assert reader._run_applescript("return 1") is None
+    assert reader._osa is None
+
+
+def test_filter_applescript_messages_by_age_and_provider():
+    reader = OTPReader()
+    since = datetime.now() - timedelta(seconds=60)
+    lines = [
+        "30\tChase: your code is 123456",
+        "continued line",
+        "600\tChase: old code 999999",
+        "10\tWells Fargo code 222333",
+    ]
+    
+    assert reader._filter_applescript_messages(lines, "chase", since) == [
+        "Chase: your code is 123456\ncontinued line"
+    ]
+    assert len(reader._filter_applescript_messages(lines, None, since)) == 2
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Your code is 123456.", "123456"),
+    ("Ref 1234567 code 654321", "654321"),
+    ("Call 555-1234", None),
+])
+def test_extract_code_from_text(text, expected):
+    assert OTPReader().extract_code_from_text(text) == expected
+
+
+def make_chatdb(path, messages):
+    """
+    Create a minimal chat.db with one short-code sender
+    
+    :param path: Database path
+    :param messages: (text, attributedBody, date) rows
+    """
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE handle (ROWID INTEGER PRIMARY KEY, id TEXT);
+        CREATE TABLE message (ROWID INTEGER PRIMARY KEY, handle_id INTEGER, text TEXT,
+                              attributedBody BLOB, date INTEGER);
+        INSERT INTO handle VALUES (1, '24273');
+    """)
+    connection.executemany("INSERT INTO message (handle_id, text, attributedBody, date) VALUES (1, ?, ?, ?)",
+                           messages)
+    connection.commit()
+    connection.close()
+
+
+def attributed_body(text):
+    """
+    Archive text the way Messages stores it in attributedBody
+    
+    :param text: Message text
+    :return: typedstream bytes
+    """
+    data = text.encode()
+    length = bytes([len(data)]) if len(data) < 0x80 else b"\x81" + len(data).to_bytes(2, "little")
+    return (b"\x04\x0bstreamtyped\x81\xe8\x03\x84\x01@\x84\x84\x84\x12NSAttributedString\x00"
+            b"\x84\x84\x08NSObject\x00\x85\x92\x84\x84\x84\x08NSString\x01\x94\x84\x01+"
+            + length + data + b"\x86\x84\x02iI\x01\x05\x92\x84\x84\x84\x0cNSDictionary\x00")
+
+
+def test_chatdb_messages_since_precomputed_time(tmp_path, monkeypatch):
+    db_path = tmp_path / "chat.db"
+    since = datetime.now() - timedelta(minutes=1)
+    since_ns = otp_reader._to_chatdb_time(since)
+    make_chatdb(db_path, [
+        ("Chase code 111111", None, since_ns - 1),
+        ("Chase code 222222", None, since_ns + 1),
+        ("Other code 333333", None, since_ns + 2),
+    ])
+    monkeypatch.setattr(otp_reader, "CHAT_DB_PATH", str(db_path))
+    
+    reader = OTPReader()
+    
+    assert reader._read_recent_messages("Chase", since, since_ns) == ["Chase code 222222"]
+    assert reader._read_recent_messages(None, since) == ["Other code 333333", "Chase code 222222"]
+
+
+def test_chatdb_messages_stored_only_in_attributed_body(tmp_path, monkeypatch):
+    db_path = tmp_path / "chat.db"
+    since = datetime.now() - timedelta(minutes=1)
+    since_ns = otp_reader._to_chatdb_time(since)
+    long_text = "Chase security code: 444444. " + "Never share this code. " * 8
+    make_chatdb(db_path, [
+        (None, attributed_body("Chase code 111111"), since_ns - 1),
+        (None, attributed_body("Chase code 222222"), since_ns + 1),
+        (None, attributed_body("Other code 333333"), since_ns + 2),
+        (None, attributed_body(long_text), since_ns + 3),
+        (None, b"not an archive", since_ns + 4),
+    ])
+    monkeypatch.setattr(otp_reader, "CHAT_DB_PATH", str(db_path))
+    
+    reader = OTPReader()
+    
+    assert reader._read_recent_messages("Chase", since, since_ns) == [long_text, "Chase code 222222"]
+    assert reader._read_recent_messages("24273", since, since_ns) == [
+        long_text, "Other code 333333", "Chase code 222222"
+    ]
+    assert reader.extract_code_from_text(reader._read_recent_messages("Chase", since, since_ns)[0]) == "444444"
+
+
+def baseline_find_otp(messages, regex=r"(\d{6})"):
+    """
+    Reference copy of the original OTP search over a batch of messages
+    
+    :param messages: Message texts
+    :param regex: Regular expression pattern with the code in group 1
+    :return: First code found, or None
+    """
+    for message in messages:
+        match = re.search(regex, message)
+        if match:
+            return match.group(1)
+    return None
+
+
+def make_messages(seed: int):
+    """
+    Build random messages whose digit runs are at most six long, the inputs
+    on which the original and the digit-bounded patterns must agree
+    
+    :param seed: Random seed
+    :return: List of message texts
+    """
+    rng = random.Random(seed)
+    words = ["Your", "Chase", "code", "is", "Wells", "Fargo", "call", "ref", "Expires", "in", "min"]
+    messages = []
+    for _ in range(rng.randrange(1, 6)):
+        parts = []
+        for _ in range(rng.randrange(1, 10)):
+            kind = rng.random()
+            if kind < 0.15:
+                parts.append("".join(rng.choice("0123456789") for _ in range(rng.randrange(1, 7))))
+            elif kind < 0.2:
+                parts.append(f"{rng.randrange(100, 999)}-{rng.randrange(1000, 9999)}")
+            else:
+                parts.append(rng.choice(words))
+        messages.append(" ".join(parts))
+    return messages
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_otp_search_matches_baseline(monkeypatch, seed):
+    messages = make_messages(seed)
+    reader = OTPReader()
+    monkeypatch.setattr(reader, "_read_recent_messages", lambda *args: messages)
+    monkeypatch.setattr(reader, "_get_messages_db_mtime", lambda: None)
+    monkeypatch.setattr(otp_reader.time, "sleep", lambda seconds: None)
+    
+    found = reader._get_otp_from_macos_messages(None, timeout=0.01, regex=otp_reader.DEFAULT_OTP_REGEX,
+                                                check_interval=0)
+    
+    assert found == baseline_find_otp(messages)
+
+
+def test_otp_search_skips_codes_inside_longer_numbers():
+    # The one intended difference: the original pattern took six digits out of any longer number
+    messages = ["Account 1234567890 ending", "Your code is 246810"]
+    
+    assert baseline_find_otp(messages) == "123456"
+    assert OTPReader().extract_code_from_text(messages[0]) is None
+    assert OTPReader().extract_code_from_text(messages[1]) == "246810"
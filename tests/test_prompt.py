@@ -0,0 +1,34 @@
+"""
+Tests for console prompts shared by concurrent bank sessions
+"""
+
+import builtins
+import threading
+
+from src.utils.prompt import prompt_lock, prompt_user
+
+
+def test_prompts_wait_for_the_session_holding_the_console(monkeypatch):
+    answers = iter(["111111", "222222"])
+    asked = []
+    
+    def fake_input(prompt):
+        asked.append(prompt)
+        return next(answers)
+    
+    monkeypatch.setattr(builtins, "input", fake_input)
+    
+    received = {}
+    waiting = threading.Thread(target=lambda: received.setdefault("wells_fargo", prompt_user("Wells Fargo: ")))
+    
+    with prompt_lock:
+        waiting.start()
+        waiting.join(timeout=0.2)
+        # The other session can't read while this one holds the console
+        assert waiting.is_alive() and asked == []
+        received["chase"] = prompt_user("Chase: ")
+    
+    waiting.join(timeout=5)
+    
+    assert asked == ["Chase: ", "Wells Fargo: "]
+    assert received == {"chase": "111111", "wells_fargo": "222222"}
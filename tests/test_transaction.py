@@ -0,0 +1,28 @@
+"""
+Tests for the Transaction model
+"""
+
+from datetime import datetime
+
+from src.models.transaction import Transaction
+
+
+def test_post_init_interns_string_fields():
+    first = Transaction(date=datetime(2024, 1, 2), amount=-5, description=" Coffee ",
+                        source="".join(["ch", "ase"]), category="".join(["Fo", "od"]))
+    second = Transaction(date=datetime(2024, 1, 3), amount=-6, description="Tea",
+                         source="chase", category="Food")
+    
+    assert first.description == "Coffee"
+    assert first.source is second.source
+    assert first.category is second.category
+
+
+def test_post_init_accepts_non_string_fields():
+    transaction = Transaction(date="2024-01-02", amount="12.5", description="Refund",
+                              source=None, account_type=None, category=0)
+    
+    assert transaction.source is None
+    assert transaction.account_type is None
+    assert transaction.category == 0
+    assert transaction.is_income
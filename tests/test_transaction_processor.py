@@ -0,0 +1,240 @@
+"""
+Equivalence tests for the transaction processor
+
+Each optimized path is checked against a reference copy of the original
+implementation it replaced, over seeded random transactions
+"""
+
+import random
+import re
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.models.transaction import Transaction, compile_category_matcher, match_category
+from src.processors.transaction_processor import SMALL_DEDUP_BATCH, TransactionProcessor
+from src.utils.config import get_config_manager
+
+
+DESCRIPTIONS = ["NETFLIX.COM", "Payment Thank You", "TRANSFER TO SAVINGS", "Coffee Shop", "UBER TRIP"]
+ACCOUNT_TYPES = ["checking", "savings", "credit"]
+AMOUNTS = [12.5, 100.0, 250.25, 15.99, 0.01]
+
+
+def make_transactions(seed: int, count: int):
+    """
+    Build a reproducible batch with many duplicates and opposite-amount pairs
+    
+    :param seed: Random seed
+    :param count: Number of transactions
+    :return: List of transaction objects
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for i in range(count):
+        transactions.append(Transaction(
+            date=start + timedelta(days=rng.randrange(60), hours=rng.randrange(24)),
+            amount=rng.choice(AMOUNTS) * rng.choice([1, -1]),
+            description=rng.choice(DESCRIPTIONS),
+            account_type=rng.choice(ACCOUNT_TYPES),
+            # A few repeated IDs, which transfers are marked by
+            transaction_id=f"tx{rng.randrange(count) if i % 17 == 0 else i}",
+        ))
+    return transactions
+
+
+def baseline_deduplicate(transactions):
+    """
+    Reference copy of the original DataFrame deduplication
+    
+    :param transactions: List of transaction objects
+    :return: List of (transaction_id, is_transfer) of the kept rows
+    """
+    df = pd.DataFrame([t.to_dict() for t in transactions])
+    
+    df['date_str'] = df['date'].apply(lambda x: x.split('T')[0] if isinstance(x, str) else x.strftime('%Y-%m-%d'))
+    df['amount_rounded'] = df['amount'].round(2)
+    
+    df_dedup = df.drop_duplicates(subset=['date_str', 'amount_rounded', 'description'])
+    
+    transfer_pairs = []
+    for account in df_dedup['account_type'].unique():
+        df_account = df_dedup[df_dedup['account_type'] == account]
+        
+        for _, row in df_account.iterrows():
+            potential_matches = df_dedup[
+                (df_dedup['date_str'] == row['date_str']) &
+                (abs(df_dedup['amount_rounded'] + row['amount_rounded']) < 0.01) &
+                (df_dedup['account_type'] != row['account_type'])
+            ]
+            for _, match_row in potential_matches.iterrows():
+                transfer_pairs.append((row['transaction_id'], match_row['transaction_id']))
+    
+    df_dedup = df_dedup.copy()
+    for tx_id1, tx_id2 in transfer_pairs:
+        df_dedup.loc[df_dedup['transaction_id'] == tx_id1, 'is_transfer'] = True
+        df_dedup.loc[df_dedup['transaction_id'] == tx_id2, 'is_transfer'] = True
+    
+    return [(row['transaction_id'], bool(row['is_transfer'])) for _, row in df_dedup.iterrows()]
+
+
+def baseline_categorize(description, category_mappings):
+    """
+    Reference copy of the original pattern-by-pattern categorization
+    
+    :param description: Transaction description
+    :param category_mappings: Dictionary mapping regex patterns to categories/subcategories
+    :return: Tuple of category and subcategory
+    """
+    desc_lower = description.lower()
+    for pattern, category_info in category_mappings.items():
+        if re.search(pattern.lower(), desc_lower):
+            return category_info.get('category'), category_info.get('subcategory')
+    return "Uncategorized", None
+
+
+def baseline_detect_recurring(transaction, transactions):
+    """
+    Reference copy of the original recurring detection
+    
+    :param transaction: Transaction to check
+    :param transactions: Transaction history
+    :return: Boolean indicating whether the transaction is recurring
+    """
+    def similarity(desc1, desc2):
+        words1 = set(desc1.lower().split())
+        words2 = set(desc2.lower().split())
+        if not words1 or not words2:
+            return 0.0
+        return len(words1 & words2) / len(words1 | words2)
+    
+    similar = sorted(
+        (
+            tx for tx in transactions
+            if tx.transaction_id != transaction.transaction_id and
+            abs(tx.amount - transaction.amount) < 0.01 and
+            similarity(tx.description, transaction.description) > 0.8
+        ),
+        key=lambda x: x.date
+    )
+    
+    if len(similar) >= 2:
+        intervals = [(similar[i].date - similar[i - 1].date).days for i in range(1, len(similar))]
+        return all(27 <= interval <= 33 for interval in intervals)
+    
+    return False
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return TransactionProcessor()
+
+
+def summarize(transactions):
+    return [(t.transaction_id, t.is_transfer) for t in transactions]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("count", [SMALL_DEDUP_BATCH // 2, SMALL_DEDUP_BATCH * 4])
+def test_deduplicate_matches_baseline(processor, seed, count):
+    expected = baseline_deduplicate(make_transactions(seed, count))
+    
+    assert summarize(processor._deduplicate_transactions(make_transactions(seed, count))) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_small_and_dataframe_dedup_agree(processor, seed):
+    count = SMALL_DEDUP_BATCH * 4
+    
+    assert (summarize(processor._deduplicate_small(make_transactions(seed, count))) ==
+            summarize(processor._deduplicate_transactions(make_transactions(seed, count))))
+
+
+CATEGORY_MAPPINGS = {
+    "^ACH": {"category": "Transfers", "subcategory": "ACH"},
+    "NETFLIX|HULU": {"category": "Entertainment", "subcategory": "Streaming"},
+    "COFFEE\\s+SHOP": {"category": "Food", "subcategory": "Coffee"},
+    "SHOP": {"category": "Shopping"},
+    "UBER(?! EATS)": {"category": "Transportation", "subcategory": "Rideshare"},
+    "UBER EATS": {"category": "Food", "subcategory": "Delivery"},
+    "[0-9]{4}$": {"category": "Card"},
+}
+
+SAMPLE_DESCRIPTIONS = [
+    "ACH PAYROLL", "PAYROLL ACH", "netflix.com", "Coffee   Shop #12", "SHOPRITE",
+    "Uber Eats order", "UBER TRIP", "CARD 1234", "CARD 1234 X", "", "Direct dep salary",
+    "Interest paid", "Spotify premium", "multi\nline uber",
+]
+
+
+@pytest.mark.parametrize("mappings", [CATEGORY_MAPPINGS, "config"])
+def test_compiled_category_matcher_matches_baseline(mappings):
+    # Read inside the test so the config manager logs to the test log directory
+    if mappings == "config":
+        mappings = get_config_manager().get_category_mappings()
+    matcher = compile_category_matcher(mappings)
+    assert matcher[0] is not None
+    
+    descriptions = SAMPLE_DESCRIPTIONS + [pattern.replace("|", " ") for pattern in mappings]
+    for description in descriptions:
+        assert match_category(description, mappings, matcher) == baseline_categorize(description, mappings)
+
+
+def test_category_matcher_falls_back_on_backreferences():
+    mappings = {"(AB)\\1": {"category": "Repeat"}, "AB": {"category": "Single"}}
+    matcher = compile_category_matcher(mappings)
+    
+    assert matcher[0] is None
+    for description in ["ABAB", "AB", "X"]:
+        assert match_category(description, mappings, matcher) == baseline_categorize(description, mappings)
+
+
+def test_category_matcher_with_no_mappings():
+    matcher = compile_category_matcher({})
+    
+    assert matcher[0] is None
+    for description in ["coffee", ""]:
+        assert match_category(description, {}, matcher) == baseline_categorize(description, {})
+
+
+def make_history(seed: int):
+    """
+    Build a reproducible history with monthly, irregular and one-off transactions
+    
+    :param seed: Random seed
+    :return: List of transaction objects
+    """
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 15)
+    history = [
+        Transaction(date=start + timedelta(days=30 * month), amount=-9.99, description="MUSIC STREAMING")
+        for month in range(4)
+    ]
+    for description, amount in [("NETFLIX COM", -15.99), ("GYM MEMBERSHIP", -40.0), ("RENT PAYMENT", -1500.0)]:
+        day = start
+        for _ in range(rng.randrange(1, 8)):
+            history.append(Transaction(date=day, amount=amount + rng.choice([0, 0, 0.005, 1.0]),
+                                       description=description))
+            day += timedelta(days=rng.choice([28, 30, 31, 31, 45]))
+    for _ in range(30):
+        history.append(Transaction(date=start + timedelta(days=rng.randrange(200)),
+                                   amount=-rng.choice([4.5, 12.0, 15.99]),
+                                   description=rng.choice(["COFFEE", "NETFLIX COM", "LUNCH SPOT"])))
+    rng.shuffle(history)
+    return history
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_detect_recurring_matches_baseline(seed):
+    # Only is_recurring is set, which none of the checks read, so one history serves all
+    history = make_history(seed)
+    expected = [baseline_detect_recurring(t, history) for t in history]
+    
+    assert [t.detect_recurring(history) for t in history] == expected
+    
+    amount_index = Transaction.build_amount_index(history)
+    similar_cache = {}
+    assert [t.detect_recurring(history, amount_index, similar_cache) for t in history] == expected
+    assert any(expected) and not all(expected)